@@ -40,6 +40,166 @@ class TetPoint:
         return (self.vertex + other.vertex) / 2
 
 
+@dataclass
+class CatArrays:
+    """The CAT faces of all objects in dense arrays, ordered by object id.
+
+    Within an object the faces are in the same order as they would be added by
+    processing the relevant cells one by one."""
+
+    normals: np.ndarray
+    """shape: (n_normals, 3, 3) with [vertex, face point, unit face normal] per entry."""
+    normal_objs: np.ndarray
+    """shape: (n_normals,) the object id of every normal."""
+    normal_points: np.ndarray
+    """shape: (n_normals,) the tetmesh point id of the vertex of every normal."""
+    faces: np.ndarray
+    """shape: (n_faces, 4, 3) the vertices of the CAT faces, triangles are padded."""
+    face_sizes: np.ndarray
+    """shape: (n_faces,) the number of vertices of every face (3 or 4)."""
+    face_objs: np.ndarray
+    """shape: (n_faces,) the object id of every face."""
+
+    @property
+    def n_normals(self) -> int:
+        return len(self.normals)
+
+    @property
+    def n_faces(self) -> int:
+        return len(self.faces)
+
+
+class CsrArray:
+    """Rows of a contiguous buffer grouped by offsets (CSR layout). Indexing returns a
+    view of the rows of group `i`, i.e. `data[offsets[i]:offsets[i + 1]]`."""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        return self.data[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def copy(self) -> "CsrArray":
+        """A copy of the buffers, read-only buffers (e.g. of a `CatResult`) are shared."""
+        if not self.data.flags.writeable and not self.offsets.flags.writeable:
+            return self
+        return CsrArray(self.data.copy(), self.offsets.copy())
+
+    def take(self, ids: np.ndarray) -> "CsrArray":
+        """The groups `ids` in a new contiguous buffer."""
+        ids = np.asarray(ids, dtype=np.int64)
+        starts, sizes = self.offsets[ids], self.offsets[ids + 1] - self.offsets[ids]
+        offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        rows = np.repeat(starts - offsets[:-1], sizes) + np.arange(offsets[-1])
+        return CsrArray(self.data[rows], offsets)
+
+
+class CatCells:
+    """The CAT cell (list of faces) per object, backed by the padded face buffer of a
+    `CatResult`. Faces are trimmed to their number of vertices when accessed."""
+
+    def __init__(self, faces: CsrArray, face_sizes: CsrArray):
+        self.faces = faces
+        self.face_sizes = face_sizes
+
+    def __len__(self) -> int:
+        return len(self.faces)
+
+    def __getitem__(self, obj_id: int) -> list[np.ndarray]:
+        return [face[:size] for face, size in zip(self.faces[obj_id], self.face_sizes[obj_id])]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def copy(self) -> "CatCells":
+        """A copy of the buffers, read-only buffers (e.g. of a `CatResult`) are shared."""
+        return CatCells(self.faces.copy(), self.face_sizes.copy())
+
+
+@dataclass
+class CatResult:
+    """The CAT faces and face normals of all objects in contiguous read-only buffers.
+
+    The normals are sorted by the tetmesh point id of their vertex. Because the points
+    of an object have consecutive ids, both the normals per point and the normals per
+    object are contiguous ranges of the buffer, given by `point_offsets` and
+    `obj_offsets`. The cat cell faces are sorted by object, given by `face_offsets`."""
+
+    normals: np.ndarray
+    """shape: (n_normals, 3, 3) with [vertex, face point, unit face normal] per entry."""
+    obj_offsets: np.ndarray
+    """shape: (n_objs + 1,) the start of the normals of every object."""
+    point_offsets: np.ndarray
+    """shape: (n_points + 1,) the start of the normals of every point."""
+    faces: np.ndarray
+    """shape: (n_faces, 4, 3) the vertices of the CAT faces, triangles are padded."""
+    face_sizes: np.ndarray
+    """shape: (n_faces,) the number of vertices of every face (3 or 4)."""
+    face_offsets: np.ndarray
+    """shape: (n_objs + 1,) the start of the cat cell faces of every object."""
+
+    @staticmethod
+    def from_arrays(cat_arrays: CatArrays, objects_npoints: list[int]) -> "CatResult":
+        n_points = int(np.sum(objects_npoints))
+        point_order = np.argsort(cat_arrays.normal_points, kind="stable")
+        point_offsets = np.zeros(n_points + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cat_arrays.normal_points, minlength=n_points), out=point_offsets[1:])
+        obj_offsets = point_offsets[np.concatenate(([0], np.cumsum(objects_npoints)))].astype(np.int64)
+
+        face_offsets = np.zeros(len(objects_npoints) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cat_arrays.face_objs, minlength=len(objects_npoints)), out=face_offsets[1:])
+
+        result = CatResult(
+            normals=np.ascontiguousarray(cat_arrays.normals[point_order]),
+            obj_offsets=obj_offsets,
+            point_offsets=point_offsets,
+            faces=cat_arrays.faces,
+            face_sizes=cat_arrays.face_sizes,
+            face_offsets=face_offsets,
+        )
+        for array in (result.normals, result.faces, result.face_sizes):
+            array.flags.writeable = False
+        return result
+
+    @property
+    def n_objs(self) -> int:
+        return len(self.obj_offsets) - 1
+
+    @property
+    def n_points(self) -> int:
+        return len(self.point_offsets) - 1
+
+    @property
+    def normals_per_obj(self) -> CsrArray:
+        return CsrArray(self.normals, self.obj_offsets)
+
+    @property
+    def normals_per_point(self) -> CsrArray:
+        return CsrArray(self.normals, self.point_offsets)
+
+    @property
+    def cat_cells(self) -> CatCells:
+        return CatCells(CsrArray(self.faces, self.face_offsets), CsrArray(self.face_sizes, self.face_offsets))
+
+    def obj_normals(self, obj_id: int) -> np.ndarray:
+        """The (n, 3, 3) normals of an object, a view of the buffer."""
+        return self.normals[self.obj_offsets[obj_id]:self.obj_offsets[obj_id + 1]]
+
+    def point_normals(self, p_id: int) -> np.ndarray:
+        """The (n, 3, 3) normals of a tetmesh point, a view of the buffer."""
+        return self.normals[self.point_offsets[p_id]:self.point_offsets[p_id + 1]]
+
+
 class CatData:
     """A class to hold the data for the CAT algorithm."""
 
@@ -11,17 +11,27 @@
 # %%
 import io
 from contextlib import redirect_stdout
+from dataclasses import dataclass
 
 import numpy as np
 import pyvista as pv
 import tetgen
 
+from irregular_object_packing.cat.cat_data import CatArrays, CatResult
 from irregular_object_packing.cat.tetra_cell import TetraCell
+from irregular_object_packing.cat.tetrahedral_split import (
+    SPLIT_BATCH_FUNCS,
+    split_template_layout,
+)
 from irregular_object_packing.cat.utils import (
+    OCCURRENCE_CASES,
+    SINGLE_OBJECT_CASE,
     create_face_normal,
-    get_cell_arrays,
-    n_related_objects,
+    get_tetmesh_cell_arrays,
+    point_object_ids,
+    sort_cells_by_occurrance,
 )
+from irregular_object_packing.mesh.transform import TransformedMeshBatch
 
 CDT_DEFAULTS = {
     # "nobisect": True,
@@ -34,28 +44,79 @@ CDT_DEFAULTS = {
 }
 
 
-def compute_cdt(meshes: list[pv.PolyData], tetgen_kwargs=None) -> pv.UnstructuredGrid:
-    """Compute the constrained Delaunay triangulation of the meshes
+@dataclass
+class CdtInput:
+    """The input of the tetrahedralization, the points and faces of all meshes."""
 
-    Args:
-        meshes (list[pv.PolyData]): list of meshes
+    points: np.ndarray
+    """shape: (n_points, 3) the points of all meshes, mesh after mesh."""
+    faces: np.ndarray
+    """shape: (n_faces, 3) the triangles of all meshes, indexing into points."""
+    point_offsets: np.ndarray
+    """shape: (n_meshes + 1,) the start of the points of every mesh."""
 
-    Returns:
-        pv.PolyData: constrained Delaunay triangulation
+    @property
+    def n_points_per_object(self) -> np.ndarray:
+        return np.diff(self.point_offsets)
+
+
+def mesh_triangles(mesh: pv.PolyData) -> np.ndarray:
+    """The (n_faces, 3) triangles of an all triangular mesh."""
+    if not mesh.is_all_triangles:
+        raise RuntimeError("Invalid mesh. Must be an all triangular mesh")
+    return mesh.faces.reshape(-1, 4)[:, 1:]
+
+
+def assemble_cdt_input(meshes: list[pv.PolyData | TransformedMeshBatch]) -> CdtInput:
+    """Concatenate the points and faces of the meshes, in the order of the meshes. A
+    `TransformedMeshBatch` adds all its copies, without creating their PolyData.
+
+    The result is the same as merging the meshes into a single PolyData without merging
+    points, without reallocating a VTK dataset for every mesh.
     """
-    tetgen_kwargs = tetgen_kwargs or CDT_DEFAULTS
-    mesh_sum = pv.PolyData()
+    points, triangles, n_points = [], [], []
     for mesh in meshes:
-        mesh_sum.merge(mesh, merge_points=False, inplace=True)
+        if isinstance(mesh, TransformedMeshBatch):
+            points.append(mesh.points.reshape(-1, 3))
+            triangles.extend([mesh_triangles(mesh.shape)] * len(mesh))
+            n_points.extend([mesh.points.shape[1]] * len(mesh))
+        else:
+            points.append(mesh.points)
+            triangles.append(mesh_triangles(mesh))
+            n_points.append(mesh.n_points)
 
+    point_offsets = np.zeros(len(n_points) + 1, dtype=np.int64)
+    np.cumsum(n_points, out=point_offsets[1:])
+    faces = np.concatenate([
+        tri + offset for tri, offset in zip(triangles, point_offsets[:-1], strict=True)
+    ]) if triangles else np.zeros((0, 3), dtype=np.int64)
+    points = np.concatenate(points).astype(np.float64, copy=False) if points else np.zeros((0, 3))
+    return CdtInput(points, faces.astype(np.int32), point_offsets)
+
+
+def tetrahedralize(cdt_input: CdtInput, tetgen_kwargs=None) -> pv.UnstructuredGrid:
+    """Tetrahedralize the points and faces of the input with TetGen (see `compute_cdt`)."""
+    tetgen_kwargs = tetgen_kwargs or CDT_DEFAULTS
     # mitigate the annoying output of tetgen generated by the -D flag
     f = io.StringIO()
     with redirect_stdout(f):
-        mesh = tetgen.TetGen(mesh_sum)
+        mesh = tetgen.TetGen(cdt_input.points, cdt_input.faces)
         mesh.tetrahedralize(order=1, **tetgen_kwargs)
 
     return mesh.grid
 
+
+def compute_cdt(meshes: list[pv.PolyData], tetgen_kwargs=None) -> pv.UnstructuredGrid:
+    """Compute the constrained Delaunay triangulation of the meshes
+
+    Args:
+        meshes (list[pv.PolyData]): list of meshes, see `assemble_cdt_input`
+
+    Returns:
+        pv.PolyData: constrained Delaunay triangulation
+    """
+    return tetrahedralize(assemble_cdt_input(meshes), tetgen_kwargs)
+
 def split_and_process(cell: TetraCell, tetmesh_points: np.ndarray, normals: list[list[np.ndarray]], cat_cells: list[list[np.ndarray]], normals_per_points):
     """Splits the cell into faces and processes them."""
     # 0. split the cell into faces
@@ -89,10 +150,12 @@ def filter_relevant_cells(cells: list[int], objects_npoints: list[int]):
     """
     relevant_cells: list[TetraCell] = []
     skipped_cells = []
+    if len(cells) == 0:
+        return relevant_cells, skipped_cells
 
+    cells_objs = point_object_ids(objects_npoints)[np.asarray(cells, dtype=np.int64)]
     for i, cell in enumerate(cells):
-        rel_objs = n_related_objects(objects_npoints, cell=cell)
-        cell = TetraCell(cell, rel_objs, i)
+        cell = TetraCell(cell, cells_objs[i], i)
         if cell.nobjs == 1:
             skipped_cells.append(cell)
         else:
@@ -101,6 +164,27 @@ def filter_relevant_cells(cells: list[int], objects_npoints: list[int]):
     return relevant_cells, skipped_cells
 
 
+def filter_relevant_cell_ids(cells: np.ndarray, objects_npoints: list[int]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized version of `filter_relevant_cells`, which does not create an object per cell.
+
+    parameters:
+    cells (ndarray): an array of shape (n_cells, 4) with the indices of the points in the cell. shape: [id0, id1, id2, id3]
+    objects_npoints (List[int]): A list of the number of points for each object.
+
+    returns:
+    - the indices of the relevant cells. shape: (n_relevant,)
+    - the point ids of the relevant cells sorted by occurrance. shape: (n_relevant, 4)
+    - the object ids of the relevant cells sorted by occurrance. shape: (n_relevant, 4)
+    - the case codes of the relevant cells, see `OCCURRENCE_CASES`. shape: (n_relevant,)
+    """
+    cells = np.asarray(cells, dtype=np.int64).reshape(-1, 4)
+    cells_objs = point_object_ids(objects_npoints)[cells]
+    s_cells, s_objs, case_codes = sort_cells_by_occurrance(cells, cells_objs)
+
+    rel_ids = np.flatnonzero(case_codes != SINGLE_OBJECT_CASE)
+    return rel_ids, s_cells[rel_ids], s_objs[rel_ids], case_codes[rel_ids]
+
+
 def process_cells_to_normals(tetmesh_points: np.ndarray, rel_cells: list[TetraCell], n_objs: int) -> tuple[list[np.ndarray], list[np.ndarray]]:
     # initialize face normals list
     face_normals = []
@@ -122,20 +206,115 @@ def process_cells_to_normals(tetmesh_points: np.ndarray, rel_cells: list[TetraCe
 
     return face_normals, cat_cells, face_normals_pp
 
+def compute_cat_arrays(tetmesh_points: np.ndarray, cells: np.ndarray, objects_npoints: list[int]) -> CatArrays:
+    """Compute the CAT faces and face normals of all relevant cells at once.
+
+    The cells are classified by occurrence case in a single pass, after which the
+    faces and normals of all cells of the same case are generated together.
+
+    parameters:
+    tetmesh_points (ndarray): the points of the tetrahedron mesh. shape: (n_points, 3)
+    cells (ndarray): an array of shape (n_cells, 4) with the indices of the points in the cell.
+    objects_npoints (List[int]): A list of the number of points for each object.
+    """
+    rel_ids, s_cells, s_objs, case_codes = filter_relevant_cell_ids(cells, objects_npoints)
+
+    normals, normal_objs, normal_points, normal_keys = [], [], [], []
+    faces, face_sizes, face_objs, face_keys = [], [], [], []
+    for code, case in enumerate(OCCURRENCE_CASES):
+        case_ids = np.flatnonzero(case_codes == code)
+        if len(case_ids) == 0:
+            continue
+        cell_ids = rel_ids[case_ids]
+        _, sizes, positions, local_ids = split_template_layout(case)
+        case_points = s_cells[case_ids]
+        case_objs = s_objs[case_ids]
+
+        case_faces = np.empty((len(case_ids), len(sizes), 4, 3), dtype=np.float64)
+        case_normals = np.empty((len(case_ids), len(sizes), 3, 3), dtype=np.float64)
+        SPLIT_BATCH_FUNCS[case](np.ascontiguousarray(tetmesh_points[case_points]), case_faces, case_normals)
+
+        face_points = case_points[:, positions]  # (n, F)
+        # order of the faces when processing the cells one by one
+        keys = cell_ids[:, None] * 32 + positions * 8 + local_ids
+
+        normals.append(case_normals.reshape(-1, 3, 3))
+        normal_objs.append(case_objs[:, positions].ravel())
+        normal_points.append(face_points.ravel())
+        normal_keys.append(keys.ravel())
+
+        # only the first position of an object adds the faces to its cat cell
+        first = np.zeros(4, dtype=bool)
+        first[np.cumsum((0,) + case[:-1])] = True
+        cat_face_mask = first[positions]
+        faces.append(case_faces[:, cat_face_mask].reshape(-1, 4, 3))
+        face_sizes.append(np.broadcast_to(sizes[cat_face_mask], (len(cell_ids), cat_face_mask.sum())).ravel())
+        face_objs.append(case_objs[:, positions[cat_face_mask]].ravel())
+        face_keys.append(keys[:, cat_face_mask].ravel())
+
+    def _concat(arrays, shape, dtype):
+        return np.concatenate(arrays) if len(arrays) > 0 else np.empty(shape, dtype=dtype)
+
+    normal_objs = _concat(normal_objs, (0,), np.int64)
+    face_objs = _concat(face_objs, (0,), np.int64)
+    normal_order = np.lexsort((_concat(normal_keys, (0,), np.int64), normal_objs))
+    face_order = np.lexsort((_concat(face_keys, (0,), np.int64), face_objs))
+
+    return CatArrays(
+        normals=_concat(normals, (0, 3, 3), np.float64)[normal_order],
+        normal_objs=normal_objs[normal_order],
+        normal_points=_concat(normal_points, (0,), np.int64)[normal_order],
+        faces=_concat(faces, (0, 4, 3), np.float64)[face_order],
+        face_sizes=_concat(face_sizes, (0,), np.int64)[face_order],
+        face_objs=face_objs[face_order],
+    )
+
+
+def cat_arrays_to_lists(cat_arrays: CatArrays, n_objs: int, n_points: int) -> tuple[list, list, list]:
+    """Convert the dense CAT arrays to lists of face normals and cat cells per object
+    and face normals per point, as returned by `process_cells_to_normals`."""
+    normal_splits = np.cumsum(np.bincount(cat_arrays.normal_objs, minlength=n_objs))[:-1]
+    face_normals = [list(obj_normals) for obj_normals in np.split(cat_arrays.normals, normal_splits)]
+
+    face_splits = np.cumsum(np.bincount(cat_arrays.face_objs, minlength=n_objs))[:-1]
+    cat_cells = [
+        [face[:size] for face, size in zip(obj_faces, obj_sizes)]
+        for obj_faces, obj_sizes in zip(
+            np.split(cat_arrays.faces, face_splits),
+            np.split(cat_arrays.face_sizes, face_splits),
+        )
+    ]
+
+    point_order = np.argsort(cat_arrays.normal_points, kind="stable")
+    point_splits = np.cumsum(np.bincount(cat_arrays.normal_points, minlength=n_points))[:-1]
+    face_normals_pp = [list(p_normals) for p_normals in np.split(cat_arrays.normals[point_order], point_splits)]
+
+    return face_normals, cat_cells, face_normals_pp
+
+
 def compute_cat_faces(tetmesh: pv.UnstructuredGrid, npoints_per_object, obj_coords: list[np.ndarray]) -> tuple[list[np.ndarray], list[np.ndarray]]:
     """Compute the CAT faces of the objects in the list and the container. The n_points_per_object is a list of the number of points for each object and should be added in the same order as the objects provided to the compute_cdt() function."""
 
     # assert (tetmesh.celltypes == 10).all(), "Tetmesh must be of type tetrahedron"
     # [ ] TODO: add the obj_coords substraction to the computation here so that the optimisation becomes easier
 
-    # filter tetrahedron mesh to only contain tetrahedrons with points from more than one object
-    cells = get_cell_arrays(tetmesh.cells)
-
-    rel_cells, _ = filter_relevant_cells(cells, npoints_per_object)
+    # only tetrahedrons with points from more than one object are used
+    cells = get_tetmesh_cell_arrays(tetmesh)
+    cat_arrays = compute_cat_arrays(tetmesh.points, cells, npoints_per_object)
 
-    face_normals, cat_cells, normalspp = process_cells_to_normals(tetmesh.points, rel_cells, len(npoints_per_object))
+    face_normals, cat_cells, normalspp = cat_arrays_to_lists(cat_arrays, len(npoints_per_object), tetmesh.n_points)
 
     return face_normals, cat_cells, normalspp
+
+
+def compute_cat_result(tetmesh: pv.UnstructuredGrid, npoints_per_object) -> CatResult:
+    """Compute the CAT faces of the objects and the container (see `compute_cat_faces`)
+    as a `CatResult`, where the faces and normals per object are views of contiguous buffers."""
+    cells = get_tetmesh_cell_arrays(tetmesh)
+    cat_arrays = compute_cat_arrays(tetmesh.points, cells, npoints_per_object)
+    return CatResult.from_arrays(cat_arrays, npoints_per_object)
+
+
 def compute_cat_cells(
     object_meshes: list[pv.PolyData],
     container: pv.PolyData,
@@ -0,0 +1,211 @@
+"""Reuse of the constrained Delaunay tetrahedralization between optimisation iterations.
+
+Instead of tetrahedralizing all objects and the container every iteration, the
+tetmesh of the previous iteration is updated:
+1. Objects of which no vertex moved more than a tolerance keep their tetrahedrons,
+   their points are moved in place as long as none of their tetrahedrons inverts.
+2. For the other objects a cavity is cut out of the previous tetmesh, consisting of
+   all tetrahedrons that overlap the bounds of the object before and after moving.
+   Only this cavity is tetrahedralized again, with its boundary faces and the object
+   surfaces inside of it as constraints.
+
+If the cavity can not be re-meshed without changing its boundary, the full CDT is
+computed instead.
+"""
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+import pyvista as pv
+import tetgen
+
+from irregular_object_packing.cat.chordal_axis_transform import (
+    CDT_DEFAULTS,
+    compute_cdt,
+)
+from irregular_object_packing.cat.utils import VTK_TETRA, get_tetmesh_cell_arrays
+
+CAVITY_SWITCHES = "pYO0/0Q"
+"""TetGen switches for the cavity: respect the boundary (p), without adding points on it (Y)."""
+
+# sorted vertex triples of the 4 faces of a tetrahedron
+TETRA_FACES = np.array([[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]])
+
+
+def signed_volumes(points: np.ndarray, cells: np.ndarray) -> np.ndarray:
+    """The signed volumes of the tetrahedrons. shape: (n_cells,)"""
+    p0 = points[cells[:, 0]]
+    return np.einsum(
+        "ij,ij->i",
+        np.cross(points[cells[:, 1]] - p0, points[cells[:, 2]] - p0),
+        points[cells[:, 3]] - p0,
+    ) / 6
+
+
+def face_keys(faces: np.ndarray, n_points: int) -> np.ndarray:
+    """A unique integer per triangle, independent of the order of its vertices."""
+    faces = np.sort(faces, axis=1).astype(np.int64)
+    return (faces[:, 0] * n_points + faces[:, 1]) * n_points + faces[:, 2]
+
+
+def tetmesh_from_arrays(points: np.ndarray, cells: np.ndarray) -> pv.UnstructuredGrid:
+    cells = np.asarray(cells, dtype=np.int64)
+    vtk_cells = np.empty((len(cells), 5), dtype=np.int64)
+    vtk_cells[:, 0] = 4
+    vtk_cells[:, 1:] = cells
+    return pv.UnstructuredGrid(vtk_cells.ravel(), np.full(len(cells), VTK_TETRA, dtype=np.uint8), points)
+
+
+class IncrementalCDT:
+    """Keeps the tetmesh of the previous call to `update` to re-mesh only the regions
+    around objects that moved."""
+
+    move_tol: float
+    """Maximum displacement of the vertices of an object for which its tetrahedrons are reused."""
+    margin: float
+    """Fraction of the object size by which the cavity around a moved object is enlarged."""
+    max_moved_fraction: float
+    """Fraction of moved objects above which the full CDT is computed instead."""
+
+    def __init__(self, move_tol=0.0, margin=0.1, max_moved_fraction=0.5, tetgen_kwargs=None):
+        self.move_tol = move_tol
+        self.margin = margin
+        self.max_moved_fraction = max_moved_fraction
+        self.tetgen_kwargs = tetgen_kwargs or CDT_DEFAULTS
+        self.reset()
+
+    def reset(self):
+        """Forget the previous tetmesh, the next update will compute the full CDT."""
+        self.points = None
+        self.cells = None
+        self.npoints_per_mesh = None
+        self.stats = {}
+
+    def update(self, meshes: list[pv.PolyData], topology_changed=False) -> pv.UnstructuredGrid:
+        """Compute the CDT of the meshes, reusing the tetmesh of the previous call.
+
+        Args:
+            - meshes: the objects followed by the container, the container may not move.
+            - topology_changed: whether the surface meshes were resampled since the last call.
+
+        Returns:
+            pv.UnstructuredGrid: a tetrahedralization of the container in which all
+            surface triangles of the meshes are faces.
+        """
+        npoints_per_mesh = np.array([mesh.n_points for mesh in meshes], dtype=np.int64)
+        if (
+            topology_changed
+            or self.points is None
+            or not np.array_equal(npoints_per_mesh, self.npoints_per_mesh)
+        ):
+            return self._full_update(meshes, npoints_per_mesh)
+
+        points = np.concatenate([mesh.points for mesh in meshes]).astype(np.float64)
+        offsets = np.concatenate(([0], np.cumsum(npoints_per_mesh)))
+        displacement = np.linalg.norm(points - self.points, axis=1)
+        moved = np.maximum.reduceat(displacement, offsets[:-1]) > self.move_tol
+        if moved[-1]:
+            # the container moved, nothing can be reused
+            return self._full_update(meshes, npoints_per_mesh)
+
+        # objects below the tolerance are moved in place, unless one of their tetrahedrons
+        # inverts. The tetrahedrons of moved objects are re-meshed anyway.
+        point_objs = np.repeat(np.arange(len(meshes)), npoints_per_mesh)
+        cell_objs = point_objs[self.cells]
+        shifted = ~moved[cell_objs].any(axis=1) & (displacement[self.cells] > 0).any(axis=1)
+        inverted = np.sign(signed_volumes(points, self.cells[shifted])) != np.sign(
+            signed_volumes(self.points, self.cells[shifted])
+        )
+        moved[cell_objs[shifted][inverted]] = True
+        moved[-1] = False
+
+        if moved.sum() > self.max_moved_fraction * (len(meshes) - 1):
+            return self._full_update(meshes, npoints_per_mesh)
+
+        self.stats = {"n_moved": int(moved.sum()), "n_cavity_cells": 0, "full": False}
+        if not moved.any():
+            self.points = points
+            return tetmesh_from_arrays(points, self.cells)
+
+        try:
+            cells = self._remesh_cavity(meshes, points, offsets, point_objs, moved)
+        except RuntimeError:
+            return self._full_update(meshes, npoints_per_mesh)
+
+        self.points, self.cells = points, cells
+        return tetmesh_from_arrays(points, cells)
+
+    def _full_update(self, meshes, npoints_per_mesh) -> pv.UnstructuredGrid:
+        tetmesh = compute_cdt(meshes, self.tetgen_kwargs)
+        self.points = np.array(tetmesh.points, dtype=np.float64)
+        self.cells = np.array(get_tetmesh_cell_arrays(tetmesh), dtype=np.int64)
+        self.npoints_per_mesh = npoints_per_mesh
+        self.stats = {"n_moved": len(meshes) - 1, "n_cavity_cells": len(self.cells), "full": True}
+        return tetmesh
+
+    def _cavity_mask(self, points, offsets, moved) -> np.ndarray:
+        """The tetrahedrons that overlap the bounds of a moved object before or after moving."""
+        cell_points = self.points[self.cells]
+        cell_min, cell_max = cell_points.min(axis=1), cell_points.max(axis=1)
+        cavity = np.zeros(len(self.cells), dtype=bool)
+        for obj_id in np.flatnonzero(moved):
+            obj_points = np.concatenate((
+                self.points[offsets[obj_id]:offsets[obj_id + 1]],
+                points[offsets[obj_id]:offsets[obj_id + 1]],
+            ))
+            box_min, box_max = obj_points.min(axis=0), obj_points.max(axis=0)
+            pad = self.margin * (box_max - box_min).max()
+            cavity |= np.all(cell_max >= box_min - pad, axis=1) & np.all(cell_min <= box_max + pad, axis=1)
+        return cavity
+
+    def _remesh_cavity(self, meshes, points, offsets, point_objs, moved) -> np.ndarray:
+        n_points = len(points)
+        cavity = self._cavity_mask(points, offsets, moved)
+        kept_cells, cavity_cells = self.cells[~cavity], self.cells[cavity]
+        if moved[point_objs[kept_cells]].any():
+            raise RuntimeError("A moved object is not covered by the cavity.")
+
+        # the boundary of the cavity are the faces that occur once in the cavity
+        cavity_faces = cavity_cells[:, TETRA_FACES].reshape(-1, 3)
+        keys = face_keys(cavity_faces, n_points)
+        unique_keys, first, counts = np.unique(keys, return_index=True, return_counts=True)
+        constraints = [cavity_faces[first[counts == 1]]]
+
+        # the surfaces of the meshes in the cavity, moved objects are re-inserted completely
+        in_cavity = np.zeros(len(meshes), dtype=bool)
+        in_cavity[point_objs[cavity_cells.ravel()]] = True
+        inner_surfaces = []
+        for mesh_id in np.flatnonzero(in_cavity | moved):
+            surface = meshes[mesh_id].faces.reshape(-1, 4)[:, 1:] + offsets[mesh_id]
+            (constraints if moved[mesh_id] else inner_surfaces).append(surface)
+        if inner_surfaces:
+            inner_surfaces = np.concatenate(inner_surfaces)
+            inner_keys = unique_keys[counts == 2]
+            constraints.append(inner_surfaces[np.isin(face_keys(inner_surfaces, n_points), inner_keys)])
+        constraints = np.concatenate(constraints)
+
+        local_ids, local_faces = np.unique(constraints, return_inverse=True)
+        local_faces = local_faces.reshape(-1, 3)
+
+        f = io.StringIO()
+        with redirect_stdout(f):
+            tgen = tetgen.TetGen(points[local_ids], local_faces.astype(np.int32))
+            nodes, elems = tgen.tetrahedralize(order=1, switches=CAVITY_SWITCHES)[:2]
+
+        if len(nodes) != len(local_ids):
+            raise RuntimeError("Steiner points were added to the cavity.")
+        new_cells = local_ids[np.asarray(elems, dtype=np.int64)]
+
+        # the cavity has a fixed boundary, so the volume of the new tetrahedrons must match
+        cavity_volume = np.abs(signed_volumes(self.points, cavity_cells)).sum()
+        new_volumes = signed_volumes(points, new_cells)
+        if not np.isclose(np.abs(new_volumes).sum(), cavity_volume, rtol=1e-6):
+            raise RuntimeError("The re-meshed cavity does not match the cavity.")
+
+        # use the orientation of the kept tetrahedrons
+        sign = np.sign(signed_volumes(self.points, kept_cells[:1]).sum() or 1.0)
+        flip = np.sign(new_volumes) != sign
+        new_cells[flip] = new_cells[flip][:, [1, 0, 2, 3]]
+
+        self.stats["n_cavity_cells"] = len(cavity_cells)
+        return np.concatenate((kept_cells, new_cells))
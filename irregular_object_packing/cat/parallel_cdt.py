@@ -0,0 +1,202 @@
+"""Domain decomposed computation of the tetrahedralization of the objects and container.
+
+The bounding box of all points is split into blocks, which are tetrahedralized
+separately in a process pool, each including the points in an overlap around the
+block. A tetrahedron of a block is kept if its circumsphere contains no points of
+other blocks, then the tetrahedron is part of the tetrahedralization of all points. The kept tetrahedrons of all blocks are merged,
+removing the duplicates found in the overlap of neighbouring blocks.
+
+If the merged tetrahedrons do not fill the convex hull of the points, for example
+because the overlap was too small, the tetrahedralization is computed serially.
+"""
+import io
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+import numpy as np
+import pyvista as pv
+import tetgen
+from scipy.spatial import ConvexHull, cKDTree
+
+from irregular_object_packing.cat.chordal_axis_transform import (
+    CDT_DEFAULTS,
+    compute_cdt,
+)
+from irregular_object_packing.cat.incremental_cdt import (
+    TETRA_FACES,
+    signed_volumes,
+    tetmesh_from_arrays,
+)
+
+
+def block_bounds(points: np.ndarray, n_blocks: tuple[int, int, int], overlap: float):
+    """The core and extended bounds of the blocks.
+
+    Args:
+        - points: the points to tetrahedralize.
+        - n_blocks: the number of blocks along every axis.
+        - overlap: the size of the overlap as a fraction of the block size.
+
+    Returns:
+        list of (core_min, core_max, ext_min, ext_max) per block.
+    """
+    p_min, p_max = points.min(axis=0), points.max(axis=0)
+    edges = [np.linspace(p_min[ax], p_max[ax], n + 1) for ax, n in enumerate(n_blocks)]
+    bounds = []
+    for i in range(n_blocks[0]):
+        for j in range(n_blocks[1]):
+            for k in range(n_blocks[2]):
+                core_min = np.array([edges[0][i], edges[1][j], edges[2][k]])
+                core_max = np.array([edges[0][i + 1], edges[1][j + 1], edges[2][k + 1]])
+                pad = overlap * (core_max - core_min)
+                bounds.append((core_min, core_max, core_min - pad, core_max + pad))
+    return bounds
+
+
+def circumspheres(points: np.ndarray, cells: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """The centers (n, 3) and radii (n,) of the circumspheres of the tetrahedrons."""
+    a = points[cells[:, 0]]
+    u, v, w = (points[cells[:, i]] - a for i in (1, 2, 3))
+    vw, wu, uv = np.cross(v, w), np.cross(w, u), np.cross(u, v)
+    det = 2 * np.einsum("ij,ij->i", u, vw)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        offset = (
+            np.einsum("ij,ij->i", u, u)[:, None] * vw
+            + np.einsum("ij,ij->i", v, v)[:, None] * wu
+            + np.einsum("ij,ij->i", w, w)[:, None] * uv
+        ) / det[:, None]
+    return a + offset, np.linalg.norm(offset, axis=1)
+
+
+def tetrahedralize_block(points: np.ndarray, ids: np.ndarray, bounds: tuple, tetgen_kwargs: dict) -> np.ndarray:
+    """The tetrahedrons (n, 4) of a single block that are part of the tetrahedralization
+    of all points.
+
+    Args:
+        - points: all points.
+        - ids: the ids of the points inside the extended bounds of the block.
+        - bounds: (core_min, core_max, ext_min, ext_max) of the block.
+        - tetgen_kwargs: the arguments for TetGen.
+    """
+    f = io.StringIO()
+    with redirect_stdout(f):
+        nodes, elems = tetgen.TetGen(points[ids], np.zeros((0, 3), dtype=np.int32)).tetrahedralize(
+            order=1, **tetgen_kwargs
+        )[:2]
+    if len(nodes) != len(ids):
+        raise RuntimeError("Steiner points were added to the block.")
+    return safe_cells(points, ids[np.asarray(elems, dtype=np.int64)], *bounds, cKDTree(points))
+
+
+def safe_cells(points, cells, core_min, core_max, ext_min, ext_max, tree: cKDTree) -> np.ndarray:
+    """The tetrahedrons of the block that are part of the tetrahedralization of all
+    points, i.e. of which the circumsphere contains no points of other blocks.
+
+    This is the case when the circumsphere, clipped to the bounds of all points, lies
+    inside the extended bounds of the block. The remaining tetrahedrons are checked by
+    querying the points inside their circumsphere. Points on the circumsphere make the
+    tetrahedralization ambiguous, these tetrahedrons are only taken from the block
+    that contains their centroid."""
+    centers, radii = circumspheres(points, cells)
+    finite = np.isfinite(radii)
+    centers, radii = centers[finite], radii[finite]
+    cells = cells[finite]
+
+    sphere_min = np.maximum(centers - radii[:, None], tree.mins)
+    sphere_max = np.minimum(centers + radii[:, None], tree.maxes)
+    inside = np.all(sphere_min >= ext_min, axis=1) & np.all(sphere_max <= ext_max, axis=1)
+
+    outside = np.flatnonzero(~inside)
+    n_on_sphere = tree.query_ball_point(centers[outside], radii[outside] * (1 + 1e-9), return_length=True)
+    inside[outside[n_on_sphere == 4]] = True
+
+    ambiguous = outside[n_on_sphere > 4]
+    centroids = points[cells[ambiguous]].mean(axis=1)
+    ambiguous = ambiguous[np.all(centroids >= core_min, axis=1) & np.all(centroids < core_max, axis=1)]
+    n_enclosed = tree.query_ball_point(centers[ambiguous], radii[ambiguous] * (1 - 1e-9), return_length=True)
+    inside[ambiguous[n_enclosed == 0]] = True
+    return cells[inside]
+
+
+def unique_rows(rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """The index of the first occurrence and the number of occurrences of every unique
+    row of an integer array, the values of a row are sorted first."""
+    rows = np.sort(rows, axis=1)
+    order = np.lexsort(rows.T[::-1])
+    new_row = np.ones(len(rows), dtype=bool)
+    new_row[1:] = np.any(rows[order[1:]] != rows[order[:-1]], axis=1)
+    starts = np.flatnonzero(new_row)
+    return order[starts], np.diff(np.append(starts, len(rows)))
+
+
+def merge_block_cells(points: np.ndarray, block_cells: list[np.ndarray]) -> np.ndarray:
+    """Merge the tetrahedrons of the blocks and check that they fill the convex hull of
+    the points exactly once.
+
+    Raises:
+        RuntimeError: if the tetrahedrons leave gaps or overlap."""
+    cells = np.concatenate(block_cells)
+    cells = cells[np.sort(unique_rows(cells)[0])]
+
+    volumes = signed_volumes(points, cells)
+    flip = volumes < 0
+    cells[flip] = cells[flip][:, [1, 0, 2, 3]]
+
+    _, face_counts = unique_rows(cells[:, TETRA_FACES].reshape(-1, 3))
+    if face_counts.max(initial=0) > 2:
+        raise RuntimeError("The tetrahedrons of the blocks overlap.")
+    if not np.isclose(np.abs(volumes).sum(), ConvexHull(points).volume, rtol=1e-8):
+        raise RuntimeError("The tetrahedrons of the blocks do not fill the convex hull.")
+    return cells
+
+
+def compute_cdt_parallel(
+    meshes: list[pv.PolyData],
+    n_blocks=(2, 2, 2),
+    overlap=0.25,
+    executor: Executor = None,
+    tetgen_kwargs=None,
+) -> pv.UnstructuredGrid:
+    """Compute the tetrahedralization of the meshes (see `compute_cdt`) by splitting the
+    bounding box of the meshes into blocks that are tetrahedralized in parallel.
+
+    Args:
+        - meshes: the objects followed by the container.
+        - n_blocks: the number of blocks along the x, y and z axis.
+        - overlap: the overlap of the blocks as a fraction of the block size.
+        - executor: the executor used to tetrahedralize the blocks, a process pool with a
+            worker per block is created if none is given.
+        - tetgen_kwargs: the arguments for TetGen, defaults to `CDT_DEFAULTS`.
+
+    Returns:
+        pv.UnstructuredGrid: the tetrahedralization, with the points in the same order as
+        the points of the meshes.
+    """
+    tetgen_kwargs = tetgen_kwargs or CDT_DEFAULTS
+    if np.prod(n_blocks) == 1:
+        return compute_cdt(meshes, tetgen_kwargs)
+
+    points = np.concatenate([mesh.points for mesh in meshes]).astype(np.float64)
+    bounds = block_bounds(points, n_blocks, overlap)
+
+    blocks = []
+    for block in bounds:
+        ext_min, ext_max = block[2:]
+        ids = np.flatnonzero(np.all(points >= ext_min, axis=1) & np.all(points <= ext_max, axis=1))
+        if len(ids) >= 4:
+            blocks.append((ids, block))
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=len(blocks))
+    try:
+        futures = [executor.submit(tetrahedralize_block, points, ids, block, tetgen_kwargs) for ids, block in blocks]
+        block_cells = [future.result() for future in futures]
+        cells = merge_block_cells(points, block_cells)
+    except RuntimeError:
+        return compute_cdt(meshes, tetgen_kwargs)
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    return tetmesh_from_arrays(points, cells)
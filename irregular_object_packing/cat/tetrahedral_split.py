@@ -1,4 +1,5 @@
 import numpy as np
+from numba import jit
 
 
 def split_4(p: np.ndarray):
@@ -111,3 +112,202 @@ def split_2_2222(p: np.ndarray):
 
     face = np.array([p02, p03, p13, p12])
     return ([face,],) * 4
+
+
+# -----------------------------------------------------------------------------
+# Batched splits
+# -----------------------------------------------------------------------------
+# Each occurrence case is described by the points that are derived from the 4
+# points of the tetrahedron (as the indices of the points that are averaged) and
+# the faces per (sorted) point position as indices into those derived points.
+# These templates describe exactly the same faces as the split_* functions above.
+SPLIT_4_TEMPLATE = (
+    # p0123, p01, p02, p03, p12, p23, p13, p012, p013, p023, p123
+    ((0, 1, 2, 3), (0, 1), (0, 2), (0, 3), (1, 2), (2, 3), (1, 3), (0, 1, 2), (0, 1, 3), (0, 2, 3), (1, 2, 3)),
+    (
+        ((0, 1, 7), (0, 7, 2), (0, 2, 9), (0, 9, 3), (0, 3, 8), (0, 8, 1)),
+        ((0, 1, 7), (0, 7, 4), (0, 4, 10), (0, 10, 6), (0, 6, 8), (0, 8, 1)),
+        ((0, 2, 7), (0, 7, 4), (0, 4, 10), (0, 10, 5), (0, 5, 9), (0, 9, 2)),
+        ((0, 3, 8), (0, 8, 6), (0, 6, 10), (0, 10, 5), (0, 5, 9), (0, 9, 3)),
+    ),
+)
+SPLIT_3_TEMPLATE = (
+    # p023, p123, p02, p03, p12, p13, p23
+    ((0, 2, 3), (1, 2, 3), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)),
+    (
+        ((0, 1, 4, 2), (0, 1, 5, 3)),
+        ((0, 1, 4, 2), (0, 1, 5, 3)),
+        ((0, 1, 4, 2), (0, 1, 6)),
+        ((0, 1, 5, 3), (0, 1, 6)),
+    ),
+)
+SPLIT_2_2222_TEMPLATE = (
+    # p02, p03, p13, p12
+    ((0, 2), (0, 3), (1, 3), (1, 2)),
+    (((0, 1, 2, 3),),) * 4,
+)
+SPLIT_2_3331_TEMPLATE = (
+    # p03, p13, p23
+    ((0, 3), (1, 3), (2, 3)),
+    (((0, 1, 2),),) * 4,
+)
+
+SPLIT_TEMPLATES = {
+    (1, 1, 1, 1): SPLIT_4_TEMPLATE,
+    (2, 1, 1): SPLIT_3_TEMPLATE,
+    (2, 2): SPLIT_2_2222_TEMPLATE,
+    (3, 1): SPLIT_2_3331_TEMPLATE,
+}
+
+
+def split_template_layout(case: tuple):
+    """Flatten the faces of the split template of an occurrence case.
+
+    Returns:
+        - face_ids (ndarray): shape (F, 4), indices of the derived points of every face,
+            triangles are padded by repeating their last vertex.
+        - face_sizes (ndarray): shape (F,), the number of vertices of every face (3 or 4).
+        - face_positions (ndarray): shape (F,), the sorted point position a face belongs to.
+        - face_local_ids (ndarray): shape (F,), the index of the face within its position.
+    """
+    _, position_faces = SPLIT_TEMPLATES[case]
+    face_ids, face_sizes, face_positions, face_local_ids = [], [], [], []
+    for position, faces in enumerate(position_faces):
+        for j, face in enumerate(faces):
+            face_ids.append(tuple(face) + (face[-1],) * (4 - len(face)))
+            face_sizes.append(len(face))
+            face_positions.append(position)
+            face_local_ids.append(j)
+
+    return (
+        np.array(face_ids, dtype=np.int64),
+        np.array(face_sizes, dtype=np.int64),
+        np.array(face_positions, dtype=np.int64),
+        np.array(face_local_ids, dtype=np.int64),
+    )
+
+
+def _derived_point_layout(case: tuple):
+    """The derived points of the split template of an occurrence case as a padded
+    (K, 4) array of point indices and the number of points averaged for each (K,)."""
+    derived_ids, _ = SPLIT_TEMPLATES[case]
+    ids = np.zeros((len(derived_ids), 4), dtype=np.int64)
+    sizes = np.empty(len(derived_ids), dtype=np.int64)
+    for k, point_ids in enumerate(derived_ids):
+        ids[k, :len(point_ids)] = point_ids
+        sizes[k] = len(point_ids)
+    return ids, sizes
+
+
+@jit(nopython=True, cache=True)
+def _split_batch(p, derived_ids, derived_sizes, face_ids, face_positions, faces, normals):
+    """Write the faces and the face normals of a batch of tetrahedra into the output buffers.
+
+    Parameters:
+    p (ndarray): the points of the tetrahedra, sorted by occurrance. shape: (n, 4, 3)
+    derived_ids, derived_sizes (ndarray): see `_derived_point_layout`.
+    face_ids, face_positions (ndarray): see `split_template_layout`.
+    faces (ndarray): output buffer of shape (n, F, 4, 3) for the (padded) faces.
+    normals (ndarray): output buffer of shape (n, F, 3, 3) for the [vertex, face point, unit normal] of every face.
+    """
+    n_derived = len(derived_ids)
+    derived = np.empty((n_derived, 3), dtype=np.float64)
+    for c in range(p.shape[0]):
+        # centroids and midpoints, summed sequentially like the single cell split functions
+        for k in range(n_derived):
+            for d in range(3):
+                acc = p[c, derived_ids[k, 0], d]
+                for i in range(1, derived_sizes[k]):
+                    acc += p[c, derived_ids[k, i], d]
+                derived[k, d] = acc / derived_sizes[k]
+
+        for f in range(face_ids.shape[0]):
+            for v in range(4):
+                for d in range(3):
+                    faces[c, f, v, d] = derived[face_ids[f, v], d]
+
+            # unit normal of the face, pointing towards the point of its position
+            v_i = p[c, face_positions[f]]
+            f0, f1, f2 = derived[face_ids[f, 0]], derived[face_ids[f, 1]], derived[face_ids[f, 2]]
+            a0, a1, a2 = f1[0] - f0[0], f1[1] - f0[1], f1[2] - f0[2]
+            b0, b1, b2 = f2[0] - f0[0], f2[1] - f0[1], f2[2] - f0[2]
+            n0 = a1 * b2 - a2 * b1
+            n1 = a2 * b0 - a0 * b2
+            n2 = a0 * b1 - a1 * b0
+            side = n0 * (v_i[0] - f0[0]) + n1 * (v_i[1] - f0[1]) + n2 * (v_i[2] - f0[2])
+            scale = 1.0 / np.sqrt(n0 * n0 + n1 * n1 + n2 * n2)
+            if side < 0:
+                scale = -scale
+
+            for d in range(3):
+                normals[c, f, 0, d] = v_i[d]
+                normals[c, f, 1, d] = f0[d]
+            normals[c, f, 2, 0] = n0 * scale
+            normals[c, f, 2, 1] = n1 * scale
+            normals[c, f, 2, 2] = n2 * scale
+
+
+SPLIT_4_DERIVED_IDS, SPLIT_4_DERIVED_SIZES = _derived_point_layout((1, 1, 1, 1))
+SPLIT_4_FACE_IDS, _, SPLIT_4_FACE_POSITIONS, _ = split_template_layout((1, 1, 1, 1))
+SPLIT_3_DERIVED_IDS, SPLIT_3_DERIVED_SIZES = _derived_point_layout((2, 1, 1))
+SPLIT_3_FACE_IDS, _, SPLIT_3_FACE_POSITIONS, _ = split_template_layout((2, 1, 1))
+SPLIT_2_2222_DERIVED_IDS, SPLIT_2_2222_DERIVED_SIZES = _derived_point_layout((2, 2))
+SPLIT_2_2222_FACE_IDS, _, SPLIT_2_2222_FACE_POSITIONS, _ = split_template_layout((2, 2))
+SPLIT_2_3331_DERIVED_IDS, SPLIT_2_3331_DERIVED_SIZES = _derived_point_layout((3, 1))
+SPLIT_2_3331_FACE_IDS, _, SPLIT_2_3331_FACE_POSITIONS, _ = split_template_layout((3, 1))
+
+
+@jit(nopython=True, cache=True)
+def split_4_batch(p, faces, normals):
+    """Batched `split_4`, fused with the face normal computation.
+
+    Args:
+        - p: the points of the tetrahedra, sorted by occurrance. shape: (n, 4, 3)
+        - faces: output buffer for the faces. shape: (n, 24, 4, 3)
+        - normals: output buffer for the face normals. shape: (n, 24, 3, 3)
+    """
+    _split_batch(p, SPLIT_4_DERIVED_IDS, SPLIT_4_DERIVED_SIZES, SPLIT_4_FACE_IDS, SPLIT_4_FACE_POSITIONS, faces, normals)
+
+
+@jit(nopython=True, cache=True)
+def split_3_batch(p, faces, normals):
+    """Batched `split_3`, fused with the face normal computation.
+
+    Args:
+        - p: the points of the tetrahedra, sorted by occurrance. shape: (n, 4, 3)
+        - faces: output buffer for the faces. shape: (n, 8, 4, 3)
+        - normals: output buffer for the face normals. shape: (n, 8, 3, 3)
+    """
+    _split_batch(p, SPLIT_3_DERIVED_IDS, SPLIT_3_DERIVED_SIZES, SPLIT_3_FACE_IDS, SPLIT_3_FACE_POSITIONS, faces, normals)
+
+
+@jit(nopython=True, cache=True)
+def split_2_2222_batch(p, faces, normals):
+    """Batched `split_2_2222`, fused with the face normal computation.
+
+    Args:
+        - p: the points of the tetrahedra, sorted by occurrance. shape: (n, 4, 3)
+        - faces: output buffer for the faces. shape: (n, 4, 4, 3)
+        - normals: output buffer for the face normals. shape: (n, 4, 3, 3)
+    """
+    _split_batch(p, SPLIT_2_2222_DERIVED_IDS, SPLIT_2_2222_DERIVED_SIZES, SPLIT_2_2222_FACE_IDS, SPLIT_2_2222_FACE_POSITIONS, faces, normals)
+
+
+@jit(nopython=True, cache=True)
+def split_2_3331_batch(p, faces, normals):
+    """Batched `split_2_3331`, fused with the face normal computation.
+
+    Args:
+        - p: the points of the tetrahedra, sorted by occurrance. shape: (n, 4, 3)
+        - faces: output buffer for the faces. shape: (n, 4, 4, 3)
+        - normals: output buffer for the face normals. shape: (n, 4, 3, 3)
+    """
+    _split_batch(p, SPLIT_2_3331_DERIVED_IDS, SPLIT_2_3331_DERIVED_SIZES, SPLIT_2_3331_FACE_IDS, SPLIT_2_3331_FACE_POSITIONS, faces, normals)
+
+
+SPLIT_BATCH_FUNCS = {
+    (1, 1, 1, 1): split_4_batch,
+    (2, 1, 1): split_3_batch,
+    (2, 2): split_2_2222_batch,
+    (3, 1): split_2_3331_batch,
+}
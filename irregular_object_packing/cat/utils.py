@@ -8,6 +8,13 @@ from pyvista import UnstructuredGrid
 logger = logging.getLogger("numba")
 logger.setLevel(logging.ERROR)
 
+OCCURRENCE_CASES = ((1, 1, 1, 1), (2, 1, 1), (2, 2), (3, 1))
+"""The occurrence cases of tetrahedra with points of more than one object. The index of a
+case in this tuple is used as its case code."""
+VTK_TETRA = 10
+"""The VTK cell type of a tetrahedron."""
+SINGLE_OBJECT_CASE = -1
+"""The case code of tetrahedra of which all points belong to the same object."""
 
 def sort_by_occurrance(point_ids: list[int], object_ids: list[int]) -> list[int]:
     """Sort a list of point ids by the number of times they occur in the list of object ids.
@@ -31,21 +38,65 @@ def sort_by_occurrance(point_ids: list[int], object_ids: list[int]) -> list[int]
     return list(sorted_point_ids), list(sorted_object_ids), tuple(sorted(count_dict.values(), reverse=True))
 
 
+def sort_cells_by_occurrance(cells: np.ndarray, cell_objs: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized version of `sort_by_occurrance` for an array of cells.
+
+    Parameters:
+    cells (ndarray): an array of shape (n_cells, 4) with the point ids of the cells.
+    cell_objs (ndarray): an array of shape (n_cells, 4) with the object ids of the points.
+
+    Returns:
+    tuple[ndarray, ndarray, ndarray]: the sorted point ids (n_cells, 4), the sorted object ids
+    (n_cells, 4) and the case code of every cell (n_cells,), see `OCCURRENCE_CASES`.
+    """
+    cells = np.asarray(cells, dtype=np.int64).reshape(-1, 4)
+    cell_objs = np.asarray(cell_objs, dtype=np.int64).reshape(-1, 4)
+
+    same = cell_objs[:, :, None] == cell_objs[:, None, :]
+    counts = same.sum(axis=2)
+
+    # sort on (count, obj_id) descending, stable so equal objects keep their order
+    order = np.argsort(-(counts * (cell_objs.max(initial=0) + 1) + cell_objs), axis=1, kind="stable")
+    s_cells = np.take_along_axis(cells, order, axis=1)
+    s_objs = np.take_along_axis(cell_objs, order, axis=1)
+
+    n_distinct = (~np.tril(same, k=-1).any(axis=2)).sum(axis=1)
+    max_count = counts.max(axis=1, initial=0)
+    case_codes = np.full(len(cells), SINGLE_OBJECT_CASE, dtype=np.int64)
+    case_codes[n_distinct == 4] = 0
+    case_codes[n_distinct == 3] = 1
+    case_codes[(n_distinct == 2) & (max_count == 2)] = 2
+    case_codes[(n_distinct == 2) & (max_count == 3)] = 3
+
+    return s_cells, s_objs, case_codes
+
+
 def get_tetmesh_cell_arrays(tetmesh: UnstructuredGrid) -> np.ndarray:
-    return get_cell_arrays(tetmesh.cells)
+    """Get the (n_cells, 4) point ids of the cells of a tetrahedral mesh.
+
+    This reads the offset based connectivity array of the grid directly, which is a
+    zero-copy view for meshes that only contain tetrahedrons."""
+    if tetmesh.n_cells == 0:
+        return np.empty((0, 4), dtype=np.int64)
+    if not np.all(tetmesh.celltypes == VTK_TETRA):
+        raise ValueError("The mesh should only contain tetrahedrons.")
+    return tetmesh.cell_connectivity.reshape(-1, 4)
 
 
 def get_cell_arrays(cells: np.ndarray) -> np.ndarray:
     """Get the cell arrays from a pyvista.UnstructuredGrid object.
     This function assumes that the cells are tetrahedrons.
 
-    -> tetmesh.cells will return a numpy array of shape (n_cells, 5),
-    where the first column is the number of vertices in the cell,
-    and the remaining columns are the indices of the vertices.
+    -> tetmesh.cells will return a numpy array of shape (n_cells * 5,),
+    where each cell starts with the number of vertices in the cell,
+    followed by the indices of the vertices.
 
-    returns a numpy array of shape (n_cells, 4), where each row is a cell,
+    returns a strided view of shape (n_cells, 4), where each row is a cell,
     """
-    return np.array(np.hsplit(cells, cells.size / 5)).reshape(-1, 5)[:, 1:]
+    cells = np.asarray(cells)
+    if cells.size % 5 != 0:
+        raise ValueError("The cells should be tetrahedrons in the legacy VTK layout.")
+    return cells.reshape(-1, 5)[:, 1:]
 
 
 def n_related_objects(objects_npoints, cell) -> np.ndarray:
@@ -70,6 +121,18 @@ def n_related_objects(objects_npoints, cell) -> np.ndarray:
 
     return point_objects
 
+def point_object_ids(objects_npoints) -> np.ndarray:
+    """Build a lookup table with the object id of every point.
+
+    Parameters:
+    objects_npoints (List[int]): A list of the number of points for each object.
+
+    Returns:
+    np.ndarray: An array of shape (sum(objects_npoints),) where entry i is the id of the object point i belongs to.
+    """
+    objects_npoints = np.asarray(objects_npoints, dtype=np.int64)
+    return np.repeat(np.arange(len(objects_npoints), dtype=np.int64), objects_npoints)
+
 @jit(nopython=True, cache=True)
 def compute_face_unit_normal(points, v_i):
     """Compute the normal vector of a planar face defined by either 3 or 4 points in 3D
@@ -123,3 +186,4 @@ def create_face_normal(face_vertices: np.ndarray, obj_point: np.ndarray):
     vertex_face_normal[1] = face_vertices[0]
     vertex_face_normal[2] = compute_face_unit_normal(face_vertices, obj_point)
     return vertex_face_normal
+
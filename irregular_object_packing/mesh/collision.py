@@ -1,11 +1,15 @@
-from itertools import combinations
-
 import numpy as np
 from pyvista import PolyData
 
+from irregular_object_packing.mesh.sdf import ContainerSDF
+from irregular_object_packing.mesh.transform import TransformedMeshBatch
+
+BROAD_PHASE_TOL = 1e-6
+"""The padding of the bounding boxes of the broad phase, touching objects collide."""
+
 
 def compute_collision(mesh: PolyData, with_mesh: PolyData, set_contacts) -> int:
-    contact_mesh, n_contacts = mesh.collision(with_mesh, 0, cell_tolerance=1e-6)
+    contact_mesh, n_contacts = mesh.collision(with_mesh, contact_mode=0, cell_tolerance=1e-6)
     if n_contacts > 0:
 
         if set_contacts:
@@ -19,21 +23,100 @@ def compute_collision(mesh: PolyData, with_mesh: PolyData, set_contacts) -> int:
     return None
 
 
-def compute_object_collisions(p_meshes: list[PolyData], set_contacts=False):
-    colls = []
+def compute_collisions(meshes: list[PolyData], tests: np.ndarray) -> list[int]:
+    """The number of contacts of the (k, 2) pairs of mesh ids in tests, None for the
+    pairs that do not collide."""
+    return [compute_collision(meshes[a], meshes[b], False) for a, b in np.asarray(tests).tolist()]
+
+
+def mesh_bounds(meshes: list[PolyData]) -> tuple[np.ndarray, np.ndarray]:
+    """The (n, 3) lower and upper corners of the bounding boxes of the meshes."""
+    if isinstance(meshes, TransformedMeshBatch):
+        return meshes.bounds()
+    bounds = np.array([mesh.bounds for mesh in meshes], dtype=np.float64).reshape(-1, 3, 2)
+    return bounds[:, :, 0], bounds[:, :, 1]
+
+
+def sweep_and_prune(lower: np.ndarray, upper: np.ndarray, tolerance=BROAD_PHASE_TOL) -> np.ndarray:
+    """The pairs of overlapping bounding boxes, found by sorting the boxes on their lower
+    x coordinate and sweeping over the boxes that start before the end of each box.
+
+    Args:
+        - lower, upper: (n, 3) the lower and upper corners of the boxes.
+        - tolerance: the padding of the boxes.
+
+    Returns:
+        np.ndarray: (k, 2) the pairs (i, j), i < j, in the order of `combinations`.
+    """
+    n = len(lower)
+    order = np.argsort(lower[:, 0], kind="stable")
+    lower, upper = lower[order], upper[order] + tolerance
+
+    # the boxes after a in the sweep that start before a ends overlap a in x
+    ends = np.searchsorted(lower[:, 0], upper[:, 0], side="right")
+    counts = np.maximum(ends - np.arange(n) - 1, 0)
+    a = np.repeat(np.arange(n), counts)
+    b = a + 1 + np.arange(len(a)) - np.repeat(np.cumsum(counts) - counts, counts)
+    overlap = np.all(lower[b, 1:] <= upper[a, 1:], axis=1) & np.all(lower[a, 1:] <= upper[b, 1:], axis=1)
 
-    for (_i1, mesh), (_i2, mesh_2) in combinations(enumerate(p_meshes), 2):
-        n_contacts = compute_collision(mesh, mesh_2, set_contacts)
+    pairs = np.sort(np.column_stack((order[a[overlap]], order[b[overlap]])), axis=1)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def broad_phase_pairs(p_meshes: list[PolyData]) -> tuple[np.ndarray, int]:
+    """The candidate pairs of colliding meshes and the number of pairs that were culled."""
+    pairs = sweep_and_prune(*mesh_bounds(p_meshes))
+    n = len(p_meshes)
+    return pairs, n * (n - 1) // 2 - len(pairs)
+
+
+def compute_object_collisions(p_meshes: list[PolyData], set_contacts=False, pairs=None):
+    """The collisions between the meshes. Only the candidate pairs are tested, which are
+    those of the broad phase by default."""
+    if pairs is None:
+        pairs, _ = broad_phase_pairs(p_meshes)
+
+    colls = []
+    for _i1, _i2 in pairs.tolist():
+        n_contacts = compute_collision(p_meshes[_i1], p_meshes[_i2], set_contacts)
         if n_contacts is not None:
             colls.append([(_i1, _i2) , n_contacts])
 
     return colls
 
 
-def compute_container_violations(p_meshes, container, set_contacts=False):
+def max_edge_length(mesh: PolyData) -> float:
+    """The length of the longest edge of a triangle mesh, inf for other meshes."""
+    if not mesh.is_all_triangles:
+        return np.inf
+    triangles = mesh.points[mesh.faces.reshape(-1, 4)[:, 1:]]
+    return np.linalg.norm(triangles - np.roll(triangles, 1, axis=1), axis=2).max(initial=0.0)
+
+
+def meshes_inside_container(p_meshes: list[PolyData], container_sdf: ContainerSDF) -> np.ndarray:
+    """Whether the meshes certainly do not collide with the container. Every point of a
+    triangle is within its longest edge of each of its vertices, so a mesh of which all
+    vertices are further than its longest edge inside the container can not touch it."""
+    if len(p_meshes) == 0:
+        return np.zeros(0, dtype=bool)
+    n_points = np.array([mesh.n_points for mesh in p_meshes])
+    clearances = np.repeat([max_edge_length(mesh) + BROAD_PHASE_TOL for mesh in p_meshes], n_points)
+    points = np.concatenate([mesh.points for mesh in p_meshes])
+    has_clearance = container_sdf.clearance(points, clearances)
+    return np.logical_and.reduceat(has_clearance, np.cumsum(n_points) - n_points) & (n_points > 0)
+
+
+def compute_container_violations(p_meshes, container, set_contacts=False, container_sdf: ContainerSDF = None):
+    """The container violations of the meshes. If the signed distance field of the
+    container is given, only the meshes close to the container are tested."""
     violations = []
+    inside = np.zeros(len(p_meshes), dtype=bool)
+    if container_sdf is not None:
+        inside = meshes_inside_container(p_meshes, container_sdf)
 
     for i, mesh in enumerate(p_meshes):
+        if inside[i]:
+            continue
         n_contacts = compute_collision(mesh, container, set_contacts)
         if n_contacts is not None:
             violations.append([i, n_contacts])
@@ -51,10 +134,10 @@ def compute_cat_violations(p_meshes, cat_meshes, set_contacts=False):
     return violations
 
 
-def compute_and_add_all_collisions(p_meshes, cat_meshes, container, set_contacts=False):
+def compute_and_add_all_collisions(p_meshes, cat_meshes, container, set_contacts=False, pairs=None):
     cat_viols = compute_cat_violations(p_meshes, cat_meshes, set_contacts)
     con_viols = compute_container_violations(p_meshes, container, set_contacts)
-    collisions = compute_object_collisions(p_meshes, set_contacts)
+    collisions = compute_object_collisions(p_meshes, set_contacts, pairs)
     return cat_viols, con_viols, collisions
 
 def compute_outside_points(enclosing_mesh: PolyData, inside_mesh:PolyData) -> PolyData:
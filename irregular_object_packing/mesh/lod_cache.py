@@ -0,0 +1,90 @@
+"""Cache of the resampled levels of detail of the shape and container meshes.
+
+`Optimizer.resample_meshes` resamples the shape and the container at every scale step,
+and `OptimizerData.resample_mesh` again when an iteration is replayed. The resampling
+only depends on the input mesh and the target number of faces, so the results are
+cached in memory and, if a directory is given, on disk for later runs. The memory cache
+only keeps the most recently used meshes, the disk cache keeps all of them.
+"""
+import hashlib
+import os
+from collections import OrderedDict
+from functools import cache
+from pathlib import Path
+
+import numpy as np
+import pyvista as pv
+
+from irregular_object_packing.mesh.sampling import (
+    resample_pyvista_mesh,
+    target_faces_by_triangle_area,
+)
+
+
+def mesh_hash(mesh: pv.PolyData) -> str:
+    """A hash of the points, including their precision, and the faces of the mesh."""
+    digest = hashlib.sha1(str(mesh.points.dtype).encode())
+    digest.update(np.ascontiguousarray(mesh.points).tobytes())
+    digest.update(np.ascontiguousarray(mesh.faces, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+class LodCache:
+    """Resampled meshes keyed by (mesh hash, target faces), in memory and optionally in
+    a directory of .vtp files. The meshes are returned as copies, so the cached
+    meshes are never modified."""
+
+    def __init__(self, directory: str = None, max_entries: int = 32):
+        """
+        Args:
+            directory: the directory of the disk cache, no disk cache if None.
+            max_entries: the number of meshes kept in memory, the least recently used
+                mesh is dropped first.
+        """
+        self.directory = None if directory is None else Path(directory)
+        self.max_entries = max_entries
+        self.meshes: OrderedDict[tuple[str, int], pv.PolyData] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key: tuple[str, int]) -> Path:
+        return self.directory / f"{key[0]}-{key[1]}.vtp"
+
+    def resample(self, mesh: pv.PolyData, target_faces: int) -> pv.PolyData:
+        """The cached equivalent of `resample_pyvista_mesh`."""
+        target_faces = int(target_faces)
+        key = (mesh_hash(mesh), target_faces)
+        if key not in self.meshes and self.directory is not None and self.path(key).exists():
+            self.meshes[key] = pv.read(self.path(key))
+
+        if key in self.meshes:
+            self.hits += 1
+            self.meshes.move_to_end(key)
+        else:
+            self.misses += 1
+            self.meshes[key] = resample_pyvista_mesh(mesh, target_faces).copy()
+            if self.directory is not None:
+                self._write(key, self.meshes[key])
+        resampled = self.meshes[key].copy()
+        while len(self.meshes) > self.max_entries:
+            self.meshes.popitem(last=False)
+        return resampled
+
+    def resample_by_triangle_area(self, example_mesh: pv.PolyData, target_mesh: pv.PolyData, factor=1) -> pv.PolyData:
+        """The cached equivalent of `resample_mesh_by_triangle_area`."""
+        return self.resample(target_mesh, target_faces_by_triangle_area(example_mesh, target_mesh, factor))
+
+    def _write(self, key: tuple[str, int], mesh: pv.PolyData):
+        """Write the mesh to a temporary file first, so that concurrent runs never read
+        a partially written file."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        tmp_path = path.with_name(f"{path.stem}-{os.getpid()}.tmp.vtp")
+        mesh.save(tmp_path)
+        os.replace(tmp_path, path)
+
+
+@cache
+def lod_cache(directory: str = None) -> LodCache:
+    """The cache of the directory, shared by all optimizers of the process."""
+    return LodCache(directory)
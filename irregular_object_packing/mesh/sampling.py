@@ -105,12 +105,7 @@ def resample_mesh_by_triangle_area(example_mesh: pv.PolyData, target_mesh: pv.Po
     """Resample a target mesh to match the average triangle area of the example mesh.
     function assumes that both meshes are triangulated surface meshes
     """
-    # Compute average triangle area for both meshes
-    example_avg_area = compute_average_triangle_area(example_mesh)
-    target_avg_area = compute_average_triangle_area(target_mesh)
-
-    # Calculate the desired number of triangles in the target mesh
-    target_num_triangles =  factor * int(target_mesh.n_faces * (target_avg_area / example_avg_area))
+    target_num_triangles = target_faces_by_triangle_area(example_mesh, target_mesh, factor)
 
     # Use the decimation algorithm to reduce the number of triangles in the target mesh
     resampled_mesh = resample_pyvista_mesh(target_mesh, target_faces=target_num_triangles)
@@ -118,6 +113,16 @@ def resample_mesh_by_triangle_area(example_mesh: pv.PolyData, target_mesh: pv.Po
     return resampled_mesh
 
 
+def target_faces_by_triangle_area(example_mesh: pv.PolyData, target_mesh: pv.PolyData, factor=1) -> int:
+    """The number of faces of the target mesh at which its average triangle area matches
+    the one of the example mesh, times the factor."""
+    # Compute average triangle area for both meshes
+    example_avg_area = compute_average_triangle_area(example_mesh)
+    target_avg_area = compute_average_triangle_area(target_mesh)
+
+    return factor * int(target_mesh.n_faces * (target_avg_area / example_avg_area))
+
+
 def compute_average_triangle_area(mesh: pv.PolyData):
     """Compute the average triangle area of a mesh."""
     return mesh.area / mesh.n_faces
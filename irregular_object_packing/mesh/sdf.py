@@ -0,0 +1,90 @@
+"""Signed distance field of a container for batched inside and clearance queries.
+
+The initialization and the container violation checks test many points against the
+same container. `ContainerSDF` samples the signed distance of the container on a
+regular grid once, and answers queries by trilinear interpolation. Because the signed
+distance changes by at most the distance between two points, the interpolation error
+is bounded by the grid cell diagonal. Queries that are not decided within that bound,
+and points outside the grid, fall back to the exact distance.
+"""
+import numpy as np
+import pyvista as pv
+from scipy.ndimage import map_coordinates
+from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+from vtkmodules.vtkFiltersCore import vtkImplicitPolyDataDistance
+
+
+class ContainerSDF:
+    """The signed distance field of a closed container surface, positive inside."""
+
+    def __init__(self, container: pv.PolyData, resolution=16, margin=0.05):
+        """Sample the signed distance on a grid of `resolution` points along the longest
+        axis of the bounds of the container, which are extended by `margin` times their
+        size on each side."""
+        # the sign is taken from the normals, which have to point outward
+        surface = container.triangulate().compute_normals(auto_orient_normals=True)
+        self._distance = vtkImplicitPolyDataDistance()
+        self._distance.SetInput(surface)
+
+        bounds = np.array(container.bounds).reshape(3, 2)
+        self.bounds = bounds.T
+        """shape: (2, 3) the lower and upper bounds of the container, as `trimesh.Trimesh.bounds`."""
+        size = bounds[:, 1] - bounds[:, 0]
+        self.lower = bounds[:, 0] - margin * size.max()
+        self.spacing = (size.max() * (1 + 2 * margin)) / (resolution - 1)
+        shape = np.ceil((size + 2 * margin * size.max()) / self.spacing).astype(int) + 1
+        self.upper = self.lower + (shape - 1) * self.spacing
+        self.max_error = self.spacing * np.sqrt(3)
+        """The maximum error of the interpolated signed distance inside the grid."""
+
+        axes = [self.lower[i] + np.arange(shape[i]) * self.spacing for i in range(3)]
+        grid_points = np.array(np.meshgrid(*axes, indexing="ij")).reshape(3, -1).T
+        self.values = self.exact(grid_points).reshape(shape)
+        self.n_exact = 0
+        """The number of points of the last query that needed the exact distance."""
+
+    def exact(self, points: np.ndarray) -> np.ndarray:
+        """The exact signed distance of the points to the container surface."""
+        points = np.ascontiguousarray(np.reshape(points, (-1, 3)), dtype=np.float64)
+        if len(points) == 0:
+            return np.empty(0)
+        distance = numpy_to_vtk(np.empty(len(points)), deep=True)
+        self._distance.FunctionValue(numpy_to_vtk(points), distance)
+        return -vtk_to_numpy(distance)
+
+    def interpolate(self, points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The trilinear interpolation of the signed distance field.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the interpolated distances and whether the
+                points lie inside the grid, the distance is nan for the other points.
+        """
+        points = np.reshape(points, (-1, 3))
+        in_grid = np.all((points >= self.lower) & (points <= self.upper), axis=1)
+        distance = np.full(len(points), np.nan)
+        coords = (points[in_grid] - self.lower) / self.spacing
+        distance[in_grid] = map_coordinates(self.values, coords.T, order=1, mode="nearest")
+        return distance, in_grid
+
+    def signed_distance(self, points: np.ndarray) -> np.ndarray:
+        """The signed distance of the points, positive inside. It is exact within
+        `max_error` of the surface and outside the grid, else interpolated."""
+        distance, in_grid = self.interpolate(points)
+        uncertain = ~in_grid | (np.abs(distance) <= self.max_error)
+        self.n_exact = np.count_nonzero(uncertain)
+        distance[uncertain] = self.exact(np.reshape(points, (-1, 3))[uncertain])
+        return distance
+
+    def clearance(self, points: np.ndarray, distance: float | np.ndarray) -> np.ndarray:
+        """Whether the signed distance of the points is larger than the given distance,
+        i.e. whether they are inside the container with at least that clearance. The
+        distance is either one value or one per point."""
+        interpolated, in_grid = self.interpolate(points)
+        uncertain = ~in_grid | (np.abs(interpolated - distance) <= self.max_error)
+        self.n_exact = np.count_nonzero(uncertain)
+        interpolated[uncertain] = self.exact(np.reshape(points, (-1, 3))[uncertain])
+        return interpolated > distance
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        """Whether the points are inside the container."""
+        return self.clearance(points, 0.0)
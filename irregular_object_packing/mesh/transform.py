@@ -1,5 +1,8 @@
+from collections.abc import Sequence
+
 import numpy as np
 import pyvista as pv
+from vtkmodules.vtkCommonDataModel import vtkCellArray
 
 
 def translation_matrix(x0, x1) -> np.ndarray:
@@ -24,3 +27,56 @@ def scale_and_center_mesh(mesh: pv.PolyData, target_volume) -> pv.PolyData:
     mesh = scale_to_volume(mesh, target_volume)
     mesh.translate(-1 * np.array(mesh.center_of_mass()), inplace=True)
     return mesh
+
+
+def transform_points(points: np.ndarray, transforms: np.ndarray) -> np.ndarray:
+    """Apply the (N, 4, 4) transforms to the (n_points, 3) points in one batched matmul.
+
+    Returns:
+        np.ndarray: (N, n_points, 3) the transformed points, in the precision of the
+        points, as `PolyData.transform` would compute them.
+    """
+    points64 = np.asarray(points, dtype=np.float64)
+    res = np.matmul(points64[None], transforms[:, :3, :3].transpose(0, 2, 1)) + transforms[:, None, :3, 3]
+    return res.astype(points.dtype, copy=False)
+
+
+class TransformedMeshBatch(Sequence):
+    """N transformed copies of a triangulated shape, as a read only sequence of PolyData.
+
+    The transformed points of all copies are computed at once into an (N, n_points, 3)
+    buffer. A PolyData is only created when a copy is accessed, with a view of its points
+    in the buffer and its own copy of the faces of the shape, so that in-place VTK
+    operations on one copy do not change the faces of the others.
+    """
+
+    def __init__(self, shape: pv.PolyData, transforms: np.ndarray):
+        self.shape = shape
+        transforms = np.asarray(transforms, dtype=np.float64).reshape(-1, 4, 4)
+        self.points = transform_points(shape.points, transforms)
+        self._meshes: list[pv.PolyData] = [None] * len(transforms)
+
+    def __len__(self):
+        return len(self._meshes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self._meshes[index] is None:
+            mesh = pv.PolyData()
+            mesh.points = self.points[index]
+            polys = vtkCellArray()
+            polys.DeepCopy(self.shape.GetPolys())
+            mesh.SetPolys(polys)
+            self._meshes[index] = mesh
+        return self._meshes[index]
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        """The (N, 3) lower and upper corners of the bounding boxes of the copies."""
+        return self.points.min(axis=1).astype(np.float64), self.points.max(axis=1).astype(np.float64)
@@ -5,6 +5,8 @@ import pyvista as pv
 from numpy import array_str
 from trimesh import Trimesh
 
+from irregular_object_packing.cat.cat_data import CatCells
+
 
 def print_mesh_info(mesh: pv.PolyData, description="", suppress_scientific=True):
     with np.printoptions(precision=3, suppress=suppress_scientific):
@@ -14,76 +16,69 @@ def print_mesh_info(mesh: pv.PolyData, description="", suppress_scientific=True)
         )
 
 def pyvista_to_trimesh(mesh: pv.PolyData):
-    tri_container = mesh.extract_surface().triangulate() # type: ignore
+    # a surface mesh does not need the extraction, which also warns about its changing default
+    surface = mesh if isinstance(mesh, pv.PolyData) else mesh.extract_surface()
+    tri_container = surface.triangulate() # type: ignore
     faces_as_array = tri_container.faces.reshape((tri_container.n_faces, 4))[:, 1:] # type: ignore
     tri_container = Trimesh(tri_container.points, faces_as_array) # type: ignore
     return tri_container
 
 
-def convert_faces_to_polydata_input(faces: np.ndarray):
+def convert_faces_to_polydata_input(faces: list[np.ndarray] | np.ndarray, face_sizes: np.ndarray = None):
     """Convert a list of faces represented by points with coordinates to
     a list of points and a list of faces represented by the number of points and point
     ids. This function is used to convert the data so that it can be used by the
     pyvista.PolyData class.
 
+    The vertices of all faces are deduplicated at once, the points are in the order of
+    their first occurrence. Faces can be triangles and quads, a padded (n_faces, 4, 3)
+    array of faces is trimmed to the given face sizes.
     """
-    cat_points = []
-    poly_faces = []
-    n_entries = 0
-    for face in faces:
-        len_face = len(face)
-        # assert len_face == 3, f"len_face: {len_face}"
-        if len_face == 3:
-            n_entries += 4
-        if len_face == 4:
-            n_entries += 5
-            # n_entries += 8
-
-    poly_faces = np.empty(n_entries, dtype=np.int32)
-    points = {}
-
-    counter = 0
-    face_len = 0
-    idx = 0
-
-    for _i, face in enumerate(faces):
-        face_len = len(face)
-        new_face = np.zeros(face_len)
-        for i, vertex in enumerate(face):
-            # if face_len != 3:
-            #     raise NotImplementedError("Only triangular faces are supported")
-            vertex = tuple(vertex)
-            if vertex not in points.keys():
-                points[vertex] = counter
-                cat_points.append(vertex)
-                counter += 1
-
-            new_face[i] = points[vertex]
-
-        # For a face with 4 points, we create 2 triangles,
-        # Because pyvista does not support quads correctly, while it says it does.
-        # The issue is that when you supply a quad, it will create 2 triangles,
-        # but the triangles will overlap by half, like an open envelope shape.
-        if face_len == 3:
-            poly_faces[idx] = 3
-            poly_faces[idx + 1] = new_face[0]
-            poly_faces[idx + 2] = new_face[1]
-            poly_faces[idx + 3] = new_face[2]
-            idx += 4
-
-        elif face_len == 4:  # make a quadrillateral (NOTE: Skipped by raise)
-            poly_faces[idx] = 4
-            poly_faces[idx + 1] = new_face[0]
-            poly_faces[idx + 2] = new_face[1]
-            poly_faces[idx + 3] = new_face[2]
-            poly_faces[idx + 4] = new_face[3]
-            idx += 5
-
-    return cat_points, poly_faces
+    if face_sizes is not None:
+        face_sizes = np.asarray(face_sizes, dtype=np.int64)
+        vertices = np.asarray(faces)[np.arange(np.shape(faces)[1]) < face_sizes[:, None]]
+    elif len(faces) == 0:
+        face_sizes, vertices = np.empty(0, dtype=np.int64), np.empty((0, 3))
+    else:
+        face_sizes = np.fromiter((len(face) for face in faces), dtype=np.int64, count=len(faces))
+        vertices = np.concatenate([np.reshape(face, (-1, 3)) for face in faces])
+
+    # equal vertices are adjacent after the (stable) sort, the first of a group is the
+    # first occurrence of the vertex
+    sort_ids = np.lexsort(vertices.T[::-1])
+    sorted_vertices = vertices[sort_ids]
+    is_first = np.ones(len(vertices), dtype=bool)
+    np.any(sorted_vertices[1:] != sorted_vertices[:-1], axis=1, out=is_first[1:])
+    first = sort_ids[is_first]
+    inverse = np.empty(len(vertices), dtype=np.int64)
+    inverse[sort_ids] = np.cumsum(is_first) - 1
+    order = np.argsort(first)
+    point_ids = np.empty(len(order), dtype=np.int32)
+    point_ids[order] = np.arange(len(order), dtype=np.int32)
+
+    # For a face with 4 points, we create 2 triangles,
+    # Because pyvista does not support quads correctly, while it says it does.
+    # The issue is that when you supply a quad, it will create 2 triangles,
+    # but the triangles will overlap by half, like an open envelope shape.
+    poly_faces = np.empty(len(face_sizes) + len(vertices), dtype=np.int32)
+    size_ids = np.cumsum(face_sizes + 1) - (face_sizes + 1)
+    is_vertex = np.ones(len(poly_faces), dtype=bool)
+    is_vertex[size_ids] = False
+    poly_faces[size_ids] = face_sizes
+    poly_faces[is_vertex] = point_ids[inverse]
+
+    return vertices[first[order]], poly_faces
 
 def polydata_from_cat_cell(cat_cell)-> pv.PolyData:
     return pv.PolyData(*convert_faces_to_polydata_input(cat_cell))
 
+def cat_cell_mesh(cat_cells: CatCells | list, obj_id: int) -> pv.PolyData:
+    """The mesh of the CAT cell of an object, `CatCells` are converted directly from
+    their padded face buffer."""
+    if isinstance(cat_cells, CatCells):
+        return pv.PolyData(*convert_faces_to_polydata_input(cat_cells.faces[obj_id], cat_cells.face_sizes[obj_id]))
+    return polydata_from_cat_cell(cat_cells[obj_id])
+
 def cat_meshes_from_cells(cat_cells):
     return [polydata_from_cat_cell(cat_cell) for cat_cell in cat_cells]
 
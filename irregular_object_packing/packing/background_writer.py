@@ -0,0 +1,56 @@
+"""Background thread for the bookkeeping of the optimisation loop.
+
+Appending an iteration to the run archive and updating the progress bars do not
+affect the optimisation, so the loop only enqueues the call with references to its
+(immutable) arguments and continues. The calls run in order in a single thread. The
+queue is bounded, so a slow disk throttles the loop instead of letting the queue grow
+without limit.
+"""
+import queue
+import threading
+from collections.abc import Callable
+
+
+class BackgroundWriter:
+    """Runs the submitted calls in order in a daemon thread. An exception of a call is
+    raised again by the next `submit`, `flush` or `close`."""
+
+    def __init__(self, maxsize=64):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._error: BaseException = None
+        self._thread = threading.Thread(target=self._work, name="background-writer", daemon=True)
+        self._thread.start()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                fn, args, kwargs = item
+                if self._error is None:
+                    fn(*args, **kwargs)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def submit(self, fn: Callable, *args, **kwargs):
+        """Enqueue a call, blocks while the queue is full."""
+        self._raise()
+        self._queue.put((fn, args, kwargs))
+
+    def flush(self):
+        """Wait until all submitted calls are done."""
+        self._queue.join()
+        self._raise()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._raise()
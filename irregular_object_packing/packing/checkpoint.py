@@ -0,0 +1,103 @@
+"""Binary snapshots of the optimizer state, to resume long packing runs.
+
+A snapshot is a single uncompressed `.npz` file with the transforms, the position in
+the run, the per-step counters, the number of iterations in the run archive, the
+global numpy random state and the resampled shape
+and container meshes of the current scale step. It holds no pickled objects, so it
+can be read by any numpy version.
+
+`Checkpointer` decides when a snapshot is due and writes it in a background thread.
+The file is written to a temporary path first and then renamed, so an interrupted
+write never replaces a valid snapshot.
+"""
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from time import time
+
+import numpy as np
+import pyvista as pv
+
+
+def random_state_arrays() -> dict[str, np.ndarray]:
+    """The global numpy random state as arrays."""
+    name, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    assert name == "MT19937", f"unsupported bit generator {name}"
+    return {
+        "rng_keys": keys,
+        "rng_pos": np.array(pos),
+        "rng_has_gauss": np.array(has_gauss),
+        "rng_cached_gaussian": np.array(cached_gaussian),
+    }
+
+
+def set_random_state(snapshot: dict[str, np.ndarray]):
+    np.random.set_state((
+        "MT19937",
+        snapshot["rng_keys"],
+        int(snapshot["rng_pos"]),
+        int(snapshot["rng_has_gauss"]),
+        float(snapshot["rng_cached_gaussian"]),
+    ))
+
+
+def mesh_arrays(prefix: str, mesh: pv.PolyData) -> dict[str, np.ndarray]:
+    return {f"{prefix}_points": np.array(mesh.points), f"{prefix}_faces": np.array(mesh.faces)}
+
+
+def arrays_mesh(prefix: str, snapshot: dict[str, np.ndarray]) -> pv.PolyData:
+    return pv.PolyData(snapshot[f"{prefix}_points"], snapshot[f"{prefix}_faces"])
+
+
+def write_snapshot(path: str, arrays: dict[str, np.ndarray]):
+    """Write the arrays to an .npz file atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.stem}-{os.getpid()}.tmp.npz")
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> dict[str, np.ndarray]:
+    with np.load(path) as data:
+        return dict(data)
+
+
+class Checkpointer:
+    """Writes a snapshot every `every` iterations and/or every `interval` seconds."""
+
+    def __init__(self, path: str, every: int = None, interval: float = None):
+        self.path = path
+        self.every = every
+        self.interval = interval
+        self.last_time = time()
+        self.n_iterations = 0
+        self.n_written = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+        self._pending: Future = None
+
+    def due(self) -> bool:
+        """Called at the start of every iteration, whether a snapshot should be taken."""
+        n_iterations = self.n_iterations
+        self.n_iterations += 1
+        if self.every is not None and n_iterations > 0 and n_iterations % self.every == 0:
+            return True
+        return self.interval is not None and time() - self.last_time >= self.interval
+
+    def save(self, arrays: dict[str, np.ndarray]):
+        """Write the snapshot in the background, the arrays must not be modified
+        afterwards. A snapshot that is still being written is finished first."""
+        self.wait()
+        self.last_time = time()
+        self._pending = self._executor.submit(write_snapshot, self.path, arrays)
+
+    def wait(self):
+        """Wait until the pending snapshot is written, raises its exception if it failed."""
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+            self.n_written += 1
+
+    def shutdown(self):
+        self.wait()
+        self._executor.shutdown()
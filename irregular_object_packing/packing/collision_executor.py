@@ -0,0 +1,140 @@
+"""Process pool backend for the narrow phase collision tests.
+
+The VTK collision tests of the objects against their CAT cell, the container and the
+other objects are independent of each other. The `ProcessCollisionExecutor` writes the
+points and faces of all meshes to a shared memory block once per check, and the worker
+processes run chunks of the tests on the meshes they rebuild from that block. Only the
+mesh ids of the tests are sent with the tasks.
+"""
+import numpy as np
+from pyvista import PolyData
+
+from irregular_object_packing.mesh.collision import (
+    broad_phase_pairs,
+    compute_collisions,
+)
+from irregular_object_packing.packing.process_pool import (
+    attach_shared_memory,
+    ensure_shared_memory,
+    process_pool,
+    release_shared_memory,
+)
+
+MESH_HEADER_COLS = 5
+"""The columns of the mesh header: the point and face offsets, the number of points
+and faces entries, and whether the points are single precision."""
+
+
+def mesh_header(meshes: list[PolyData]) -> np.ndarray:
+    """The (n_meshes, 5) header that locates the points and faces of every mesh in the
+    shared memory block, see `MESH_HEADER_COLS`."""
+    n_points = np.array([mesh.n_points * 3 for mesh in meshes], dtype=np.int64)
+    n_faces = np.array([len(mesh.faces) for mesh in meshes], dtype=np.int64)
+    header = np.empty((len(meshes), MESH_HEADER_COLS), dtype=np.int64)
+    header[:, 0] = np.cumsum(n_points) - n_points
+    header[:, 1] = np.cumsum(n_faces) - n_faces
+    header[:, 2] = n_points
+    header[:, 3] = n_faces
+    header[:, 4] = [mesh.points.dtype == np.float32 for mesh in meshes]
+    return header
+
+
+def read_mesh(buffer: memoryview, header: np.ndarray, mesh_id: int) -> PolyData:
+    """Rebuild a mesh from the shared memory block, with the points in their original
+    precision."""
+    point_offset, face_offset, n_points, n_faces, single = header[mesh_id]
+    total_points = int(header[-1, 0] + header[-1, 2])
+    points = np.ndarray((n_points,), dtype=np.float64, buffer=buffer, offset=int(point_offset) * 8)
+    faces = np.ndarray((n_faces,), dtype=np.int64, buffer=buffer, offset=(total_points + int(face_offset)) * 8)
+    points = points.reshape(-1, 3).astype(np.float32 if single else np.float64)
+    return PolyData(points, faces.copy())
+
+
+def collide_meshes(shm_name: str, header: np.ndarray, tests: np.ndarray) -> list[int]:
+    """Run a chunk of the collision tests in a worker process.
+
+    Args:
+        - shm_name: the name of the shared memory block with the points followed by the
+            faces of all meshes.
+        - header: the location of the meshes in the block, see `mesh_header`.
+        - tests: (k, 2) the mesh ids of the tests.
+
+    Returns:
+        list[int]: the number of contacts of every test, None if there is no collision.
+    """
+    buffer = attach_shared_memory(shm_name).buf
+    mesh_ids = np.unique(tests)
+    meshes = dict(zip(mesh_ids.tolist(), (read_mesh(buffer, header, mesh_id) for mesh_id in mesh_ids), strict=True))
+    return compute_collisions(meshes, tests)
+
+
+class ProcessCollisionExecutor:
+    """Persistent worker processes that run the narrow phase collision tests."""
+
+    def __init__(self, n_workers: int, chunks_per_worker=4):
+        self.n_workers = n_workers
+        self.chunks_per_worker = chunks_per_worker
+        self.pool = process_pool(n_workers)
+        self.shm = None
+
+    def _write_shared(self, meshes: list[PolyData]) -> np.ndarray:
+        """Copy the points and faces of the meshes into the shared memory block, which
+        is only replaced when it is too small.
+
+        Returns:
+            np.ndarray: the header of the meshes in the block.
+        """
+        header = mesh_header(meshes)
+        total_points = int(header[:, 2].sum())
+        size = (total_points + int(header[:, 3].sum())) * 8
+        self.shm = ensure_shared_memory(self.shm, size)
+        points = np.ndarray((total_points,), dtype=np.float64, buffer=self.shm.buf)
+        faces = np.ndarray((size // 8 - total_points,), dtype=np.int64, buffer=self.shm.buf, offset=total_points * 8)
+        for mesh, (point_offset, face_offset, n_points, n_faces, _) in zip(meshes, header, strict=True):
+            points[point_offset:point_offset + n_points] = mesh.points.ravel()
+            faces[face_offset:face_offset + n_faces] = mesh.faces
+        return header
+
+    def _release_shared(self):
+        release_shared_memory(self.shm)
+        self.shm = None
+
+    def compute_collisions(self, meshes: list[PolyData], tests: np.ndarray) -> list[int]:
+        """The parallel equivalent of `mesh.collision.compute_collisions`."""
+        tests = np.asarray(tests, dtype=np.int64).reshape(-1, 2)
+        if len(tests) == 0:
+            return []
+
+        header = self._write_shared(meshes)
+        chunks = np.array_split(tests, min(len(tests), self.n_workers * self.chunks_per_worker))
+        futures = [self.pool.submit(collide_meshes, self.shm.name, header, chunk) for chunk in chunks]
+        return [n_contacts for future in futures for n_contacts in future.result()]
+
+    def compute_all_collisions(self, p_meshes: list[PolyData], cat_meshes: list[PolyData], container: PolyData, pairs=None):
+        """The parallel equivalent of `mesh.collision.compute_and_add_all_collisions`,
+        without setting the contacts on the meshes."""
+        if pairs is None:
+            pairs, _ = broad_phase_pairs(p_meshes)
+        n_objs = len(p_meshes)
+        obj_ids = np.arange(n_objs)
+        tests = np.concatenate([
+            np.column_stack((obj_ids, obj_ids + n_objs)),
+            np.column_stack((obj_ids, np.full(n_objs, 2 * n_objs))),
+            np.asarray(pairs, dtype=np.int64).reshape(-1, 2),
+        ])
+        n_contacts = self.compute_collisions(list(p_meshes) + list(cat_meshes) + [container], tests)
+
+        cat_viols = [[i, n] for i, n in enumerate(n_contacts[:n_objs]) if n is not None]
+        con_viols = [[i, n] for i, n in enumerate(n_contacts[n_objs:2 * n_objs]) if n is not None]
+        collisions = [[tuple(pair), n] for pair, n in zip(tests[2 * n_objs:].tolist(), n_contacts[2 * n_objs:], strict=True) if n is not None]
+        return cat_viols, con_viols, collisions
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self._release_shared()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
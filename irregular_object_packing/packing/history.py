@@ -0,0 +1,127 @@
+"""Per-optimizer history of the iterations of a packing run.
+
+Every iteration stores the transforms of all objects, the iteration data and the CAT
+normals and cells it was computed with. The transforms are small and are kept in one
+growable `(n_iters, N, 7)` array. The CAT data is by far the largest part, so only the
+CAT data of the most recent `cat_ring` iterations and of pinned iterations (e.g. the
+last iteration of every scale step) is kept in memory. The CAT data of older iterations
+is written to a temporary subdirectory of a directory if one is given, else it is
+dropped. The subdirectory is removed when the history is closed or garbage collected.
+
+Iterations are indexed as in `OptimizerData`: the state after `setup` is stored at
+index -1 and the iterations of the run follow from 0.
+"""
+import pickle
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+
+class IterationHistory:
+    """The history of a single optimizer, nothing is shared between instances."""
+
+    def __init__(self, cat_ring: int = None, directory: str = None, capacity=64):
+        """
+        Args:
+            cat_ring: the number of most recent iterations of which the CAT data is kept
+                in memory, None to keep all.
+            directory: the directory to which the CAT data of older iterations is
+                evicted, each history writes to its own subdirectory, which it removes
+                when it is closed or garbage collected. None to drop it.
+            capacity: the initial number of iterations of the transform array.
+        """
+        self.cat_ring = cat_ring
+        self.directory = directory
+        self._evict_dir = None
+        self._finalizer = None
+        self._capacity = capacity
+        self._tf_arrays = None
+        self._iteration_data = []
+        self._cat = OrderedDict()
+        self._pinned = {}
+        self._evicted = set()
+
+    def __len__(self) -> int:
+        return len(self._iteration_data)
+
+    def _row(self, index: int) -> int:
+        row = index + 1
+        if not 0 <= row < len(self):
+            raise IndexError(f"iteration {index} is not stored, the history has {len(self)} entries")
+        return row
+
+    def add(self, tf_arrays: np.ndarray, normals, cat_cells, iteration_data):
+        """Append an iteration. The normals and cat cells are stored as is, the CAT
+        buffers of `CatResult` are read-only and need no copy."""
+        if self._tf_arrays is None:
+            self._tf_arrays = np.empty((self._capacity, *np.shape(tf_arrays)))
+        elif len(self) == len(self._tf_arrays):
+            self._tf_arrays = np.concatenate([self._tf_arrays, np.empty_like(self._tf_arrays)])
+        self._tf_arrays[len(self)] = tf_arrays
+
+        index = len(self) - 1
+        self._iteration_data.append(iteration_data)
+        self._cat[index] = (normals, cat_cells)
+        if self.cat_ring is not None:
+            while len(self._cat) > self.cat_ring:
+                self._evict(*self._cat.popitem(last=False))
+
+    def pin(self, index: int):
+        """Keep the CAT data of the iteration in memory, also when it leaves the ring."""
+        self._row(index)
+        if index in self._cat:
+            self._pinned[index] = self._cat[index]
+
+    def _evict_path(self, index: int) -> Path:
+        return Path(self._evict_dir) / f"cat-{index}.pickle"
+
+    def _evict(self, index: int, cat_data: tuple):
+        if self.directory is None or index in self._pinned:
+            return
+        if self._evict_dir is None:
+            Path(self.directory).mkdir(parents=True, exist_ok=True)
+            self._evict_dir = tempfile.mkdtemp(prefix="history-", dir=self.directory)
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self._evict_dir, ignore_errors=True)
+        with open(self._evict_path(index), "wb") as f:
+            pickle.dump(cat_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._evicted.add(index)
+
+    def close(self):
+        """Remove the evicted CAT data, its iterations are dropped."""
+        if self._finalizer is not None:
+            self._finalizer()
+        self._evict_dir = None
+        self._finalizer = None
+        self._evicted.clear()
+
+    @property
+    def tf_arrays(self) -> np.ndarray:
+        """shape: (n_iters, N, 7) a view of the transforms of all stored iterations."""
+        if self._tf_arrays is None:
+            return np.empty((0, 0, 7))
+        return self._tf_arrays[:len(self)]
+
+    def get_tf_arrays(self, index: int) -> np.ndarray:
+        return self._tf_arrays[self._row(index)]
+
+    def get_iteration_data(self, index: int):
+        return self._iteration_data[self._row(index)]
+
+    def get_cat(self, index: int) -> tuple:
+        """The normals and cat cells of the iteration, (None, None) if they were dropped."""
+        self._row(index)
+        if index in self._cat:
+            return self._cat[index]
+        if index in self._pinned:
+            return self._pinned[index]
+        if index in self._evicted:
+            with open(self._evict_path(index), "rb") as f:
+                return pickle.load(f)
+        return None, None
+
+    def has_cat(self, index: int) -> bool:
+        return index in self._cat or index in self._pinned or index in self._evicted
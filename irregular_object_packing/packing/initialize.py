@@ -5,13 +5,14 @@ import numpy as np
 import trimesh
 from pyvista import PolyData, StructuredGrid
 from scipy.optimize import minimize
+from scipy.spatial import cKDTree
 from wrapt_timeout_decorator import timeout
 
 from irregular_object_packing.mesh.collision import (
     compute_container_violations,
     compute_object_collisions,
 )
-from irregular_object_packing.mesh.utils import pyvista_to_trimesh
+from irregular_object_packing.mesh.sdf import ContainerSDF
 
 
 def random_coordinate_within_bounds(bounding_box: np.ndarray) -> np.ndarray:
@@ -62,13 +63,13 @@ def get_max_radius(mesh: PolyData) -> float:
     return max_distance
 
 
-def generate_correct_coordinates(mesh, min_distance_between_meshes, max_volume, tri_container):
+def generate_correct_coordinates(mesh, min_distance_between_meshes, max_volume, container: ContainerSDF):
     objects_coords = []
     acc_vol, skipped = 0, 0
     while acc_vol < max_volume:
-        coord = random_coordinate_within_bounds(tri_container.bounds)
+        coord = random_coordinate_within_bounds(container.bounds)
         if coord_is_correct(
-            coord, tri_container, objects_coords, min_distance_between_meshes
+            coord, container, objects_coords, min_distance_between_meshes
         ):
             objects_coords.append(coord)
             acc_vol += mesh.volume
@@ -77,8 +78,8 @@ def generate_correct_coordinates(mesh, min_distance_between_meshes, max_volume,
     return objects_coords,skipped # type: ignore
 
 @timeout(20)
-def generate_correct_coordinates_timeout(mesh, min_distance_between_meshes, max_volume, tri_container):
-    return generate_correct_coordinates(mesh, min_distance_between_meshes, max_volume, tri_container)
+def generate_correct_coordinates_timeout(mesh, min_distance_between_meshes, max_volume, container: ContainerSDF):
+    return generate_correct_coordinates(mesh, min_distance_between_meshes, max_volume, container)
 
 def generate_initial_coordinates(
     container: PolyData,
@@ -102,12 +103,178 @@ def generate_initial_coordinates(
     min_distance_between_meshes = f_init ** (1 / 3) * max_dim_mesh
     max_volume = container.volume * coverage_rate
 
-    tri_container = pyvista_to_trimesh(container)
+    container_sdf = ContainerSDF(container)
     if min_distance_between_meshes > 1/4 * container.volume ** (1/3):
         # Warning: Initial distance between meshes is larger than 1/4 of the container size. This may lead to an infinite loop.")
-        return timeout_loop(generate_correct_coordinates_timeout, (mesh, min_distance_between_meshes, max_volume, tri_container), 20)
+        return timeout_loop(generate_correct_coordinates_timeout, (mesh, min_distance_between_meshes, max_volume, container_sdf), 20)
 
-    return generate_correct_coordinates(mesh, min_distance_between_meshes, max_volume, tri_container)
+    return generate_correct_coordinates(mesh, min_distance_between_meshes, max_volume, container_sdf)
+
+
+def generate_correct_coordinates_batched(
+    n_objects: int,
+    min_distance_between_meshes: float,
+    container_sdf: ContainerSDF,
+    rng: np.random.Generator,
+    block_size: int = None,
+    max_blocks=1000,
+) -> tuple[np.ndarray, int]:
+    """The batched equivalent of `generate_correct_coordinates`. Candidates are drawn
+    in blocks, the containment and the container clearance of a block are tested with a
+    single `ContainerSDF.clearance` call, and the minimum distance to the accepted coordinates with a
+    KD-tree. Within a block the candidates are accepted in order of drawing. The
+    default block size is 4 candidates per object.
+
+    Returns:
+        tuple[np.ndarray, int]: (n_objects, 3) coordinates and the number of drawn
+            candidates that were not accepted.
+    """
+    if block_size is None:
+        block_size = max(64, 4 * n_objects)
+    objects_coords = np.empty((0, 3))
+    skipped = 0
+    for _ in range(max_blocks):
+        candidates = rng.uniform(container_sdf.bounds[0], container_sdf.bounds[1], (block_size, 3))
+        candidates = candidates[container_sdf.clearance(candidates, min_distance_between_meshes / 2)]
+        if len(candidates) > 0 and len(objects_coords) > 0:
+            distance, _ = cKDTree(objects_coords).query(candidates, distance_upper_bound=min_distance_between_meshes)
+            candidates = candidates[distance > min_distance_between_meshes]
+
+        neighbours = cKDTree(candidates).query_ball_point(candidates, min_distance_between_meshes) if len(candidates) > 0 else []
+        accepted = np.zeros(len(candidates), dtype=bool)
+        for i, i_neighbours in enumerate(neighbours):
+            if len(objects_coords) + np.count_nonzero(accepted) == n_objects:
+                break
+            accepted[i] = not np.any(accepted[i_neighbours])
+
+        skipped += block_size - np.count_nonzero(accepted)
+        objects_coords = np.concatenate([objects_coords, candidates[accepted]])
+        if len(objects_coords) == n_objects:
+            return objects_coords, skipped
+
+    raise RuntimeError(f"Only {len(objects_coords)}/{n_objects} valid coordinates were found in {max_blocks} blocks.")
+
+
+def generate_initial_coordinates_batched(
+    container: PolyData,
+    mesh: PolyData,
+    coverage_rate: float = 0.3,
+    f_init: float = 0.1,
+    seed: int = None,
+) -> tuple[np.ndarray, int]:
+    """Places the objects inside the container at initial location, with the same
+    constraints as `generate_initial_coordinates`, see `generate_correct_coordinates_batched`.
+
+    Args:
+        container (PolyData): container mesh
+        mesh (PolyData): mesh of the objects
+        coverage_rate (float): percentage of the container volume that should be filled
+        seed (int): the seed of the random candidates, if None it is drawn from the
+            global numpy random state.
+
+    returns:
+        tuple[np.ndarray, int]: coordinates of the objects and number of skipped candidates
+    """
+    assert container.is_manifold, "Container mesh is not a closed surface mesh"
+    max_dim_mesh = get_max_radius(mesh) * 2
+    min_distance_between_meshes = f_init ** (1 / 3) * max_dim_mesh
+    n_objects = int(np.ceil(container.volume * coverage_rate / mesh.volume))
+    rng = np.random.default_rng(np.random.randint(2**31) if seed is None else seed)
+
+    return generate_correct_coordinates_batched(
+        n_objects, min_distance_between_meshes, ContainerSDF(container), rng
+    )
+
+
+FCC_BASIS = np.array([[0, 0, 0], [0, 0.5, 0.5], [0.5, 0, 0.5], [0.5, 0.5, 0]])
+"""The points of the unit cell of the face centered cubic lattice."""
+
+
+def fcc_lattice(lower: np.ndarray, upper: np.ndarray, spacing: float, offset: np.ndarray) -> np.ndarray:
+    """The points of a face centered cubic lattice with nearest neighbour distance
+    `spacing` that cover the box from lower to upper, shifted by the offset."""
+    a = spacing * np.sqrt(2)
+    axes = [np.arange(lo - a, hi + a, a) for lo, hi in zip(lower, upper, strict=True)]
+    corners = np.array(np.meshgrid(*axes, indexing="ij")).reshape(3, -1).T
+    return (corners[:, None] + FCC_BASIS * a).reshape(-1, 3) + offset * a
+
+
+def generate_correct_coordinates_lattice(
+    n_objects: int,
+    min_distance_between_meshes: float,
+    container_sdf: ContainerSDF,
+    volume: float,
+    rng: np.random.Generator,
+    max_iter=50,
+) -> tuple[np.ndarray, int]:
+    """Place the objects on a randomly shifted and jittered FCC lattice, clipped to the
+    points that keep a distance of half the minimum distance to the container.
+
+    The spacing starts at the spacing of n_objects lattice points in the container
+    volume and shrinks until enough lattice points lie inside. The jitter of a point
+    is less than half the difference between the spacing and the minimum distance, so
+    the objects keep the minimum distance. Of the valid lattice points, n_objects are
+    chosen at random.
+
+    Returns:
+        tuple[np.ndarray, int]: (n_objects, 3) coordinates and the number of valid
+            lattice points that were not used.
+    """
+    min_spacing = min_distance_between_meshes * 1.01
+    spacing = max(min_spacing, (np.sqrt(2) * volume / n_objects) ** (1 / 3))
+    lower, upper = container_sdf.bounds
+    for _ in range(max_iter):
+        points = fcc_lattice(lower, upper, spacing, rng.uniform(0, 1, 3))
+        # random directions with a length of at most the jitter
+        jitter = rng.normal(size=points.shape)
+        jitter *= (0.99 * (spacing - min_distance_between_meshes) / 2 * rng.uniform(0, 1, (len(points), 1)) ** (1 / 3)
+                   / np.linalg.norm(jitter, axis=1, keepdims=True))
+        points = points + jitter
+        points = points[container_sdf.clearance(points, min_distance_between_meshes / 2)]
+
+        if len(points) >= n_objects:
+            chosen = rng.choice(len(points), n_objects, replace=False)
+            return points[np.sort(chosen)], len(points) - n_objects
+        if spacing == min_spacing:
+            break
+        spacing = max(min_spacing, spacing * (0.95 * (len(points) / n_objects) ** (1 / 3) if len(points) > 0 else 0.8))
+
+    raise RuntimeError(
+        f"Only {len(points)}/{n_objects} lattice points with a spacing of {spacing:.3g} fit in the container."
+    )
+
+
+def generate_initial_coordinates_lattice(
+    container: PolyData,
+    mesh: PolyData,
+    coverage_rate: float = 0.3,
+    f_init: float = 0.1,
+    seed: int = None,
+) -> tuple[np.ndarray, int]:
+    """Places the objects inside the container at initial location, with the same
+    constraints as `generate_initial_coordinates`, on a lattice (see
+    `generate_correct_coordinates_lattice`). Unlike the random placement it does not
+    stall at high coverage rates or large initial scales.
+
+    Args:
+        container (PolyData): container mesh
+        mesh (PolyData): mesh of the objects
+        coverage_rate (float): percentage of the container volume that should be filled
+        seed (int): the seed of the lattice offset, jitter and selection, if None it is
+            drawn from the global numpy random state.
+
+    returns:
+        tuple[np.ndarray, int]: coordinates of the objects and number of unused lattice points
+    """
+    assert container.is_manifold, "Container mesh is not a closed surface mesh"
+    max_dim_mesh = get_max_radius(mesh) * 2
+    min_distance_between_meshes = f_init ** (1 / 3) * max_dim_mesh
+    n_objects = int(np.ceil(container.volume * coverage_rate / mesh.volume))
+    rng = np.random.default_rng(np.random.randint(2**31) if seed is None else seed)
+
+    return generate_correct_coordinates_lattice(
+        n_objects, min_distance_between_meshes, ContainerSDF(container), container.volume, rng
+    )
 
 
 def timeout_loop(fn, params, max_runs):
@@ -126,10 +293,15 @@ def timeout_loop(fn, params, max_runs):
 
 def coord_is_correct(
     coord,
-    container: trimesh.Trimesh,
+    container: trimesh.Trimesh | ContainerSDF,
     object_coords: list[np.ndarray],
     min_distance_between_meshes: float,
 ):
+    if isinstance(container, ContainerSDF):
+        return container.clearance(coord, min_distance_between_meshes / 2)[0] and all(
+            np.linalg.norm(coord - i) > min_distance_between_meshes for i in object_coords
+        )
+
     # PolyData([coord]).select_enclosed_points(container)["SelectedPoints"][0]
     if container.contains([coord]):
         distance_arr = [
@@ -146,7 +318,7 @@ def coord_is_correct(
 
 
 def filter_coords(
-    container: PolyData, mesh_volume, coverage_rate, min_distance, coords
+    container: PolyData, mesh_volume, coverage_rate, min_distance, coords, container_sdf: ContainerSDF = None
 ):
     max_volume = container.volume * coverage_rate
     acc_vol = 0
@@ -157,20 +329,22 @@ def filter_coords(
     # this may stall if the first point is in the middle of the container.
     # there wont be any other points possible
 
-    points_inside = PolyData(coords).select_enclosed_points(container)
+    if container_sdf is None:
+        container_sdf = ContainerSDF(container)
+    coords = np.asarray(coords)
+    points_inside = coords[container_sdf.contains(coords)]
+    has_clearance = container_sdf.clearance(points_inside, min_distance / 2)
 
     i = -1
     while acc_vol < max_volume:
         i += 1
-        coord = points_inside.points[i]
+        coord = points_inside[i]
         distance_arr = [True] + [
             np.linalg.norm(coord - i) > min_distance for i in objects_coords
         ]
 
         if np.all(distance_arr):
-            point = container.find_closest_point(coord)
-            distance_to_container = np.linalg.norm(coord - point)
-            if distance_to_container > min_distance / 2:
+            if has_clearance[i]:
                 objects_coords.append(coord)
                 acc_vol += mesh_volume
                 continue
@@ -179,13 +353,14 @@ def filter_coords(
     return skipped, objects_coords
 
 
-def generate_sample_points(mesh: PolyData, container: PolyData, grid_spacing: float, min_distance: float, bounds=None) -> np.ndarray:
+def generate_sample_points(mesh: PolyData, container: PolyData, grid_spacing: float, min_distance: float, bounds=None, container_sdf: ContainerSDF = None) -> np.ndarray:
     """
     Generate sample points based on a structured grid within a specific mesh.
 
     :param mesh: A PyVista mesh
     :param grid_spacing: A tuple (dx, dy, dz) representing the grid spacing in each dimension
     :param bounds: A tuple (xmin, xmax, ymin, ymax, zmin, zmax) representing the bounds of the grid
+    :param container_sdf: The signed distance field of the container, built if None
     :return: A PyVista point cloud representing the sample points
     """
     if bounds is None:
@@ -202,12 +377,10 @@ def generate_sample_points(mesh: PolyData, container: PolyData, grid_spacing: fl
 
     # Clip the grid to the mesh
     sample_points: PolyData = structured_grid.clip_surface(container)
-    points = []
-    for p in sample_points.points:  # type: ignore
-        if trimesh.proximity.signed_distance(pyvista_to_trimesh(container), [p])[0] > min_distance / 2:  # type: ignore
-            points.append(p)
-
-    return np.array(points)
+    if container_sdf is None:
+        container_sdf = ContainerSDF(container)
+    points = np.asarray(sample_points.points)
+    return points[container_sdf.clearance(points, min_distance / 2)]
 
 
 def estimate_grid_spacing(volume, num_grid_points):
@@ -224,8 +397,8 @@ def estimate_grid_spacing(volume, num_grid_points):
     return cube_root
 
 
-def objective_function(spacing, target_volume, min_distance, mesh, container):
-    grid_points = generate_sample_points(mesh, container, spacing, min_distance)
+def objective_function(spacing, target_volume, min_distance, mesh, container, container_sdf=None):
+    grid_points = generate_sample_points(mesh, container, spacing, min_distance, container_sdf=container_sdf)
     objective = np.abs(len(grid_points) * mesh.volume - target_volume)
     return -objective
 
@@ -235,12 +408,12 @@ def find_optimal_grid_spacing(mesh: PolyData, container: PolyData, coverage_rate
     n_objects = np.ceil(target_volume / mesh.volume)
     spacing0 = estimate_grid_spacing(container.volume, n_objects)
     # spacing0 = 0.5
-    # pyvista_to_trimesh(container)
+    container_sdf = ContainerSDF(container)
 
     res = minimize(
         objective_function,
         spacing0,
-        args=(target_volume, min_distance, mesh, container),
+        args=(target_volume, min_distance, mesh, container, container_sdf),
         bounds=[(1e-6, None)],  # Avoid zero spacing
         method='SLSQP',
         options={
@@ -254,8 +427,16 @@ def find_optimal_grid_spacing(mesh: PolyData, container: PolyData, coverage_rate
         raise RuntimeError(f"Could not find optimal grid spacing due to {res.message}")
 
 
-def initialize_state(mesh, container, coverage_rate, f_init):
-    object_coords, _skipped = generate_initial_coordinates(
+INITIALIZERS = {
+    "sequential": generate_initial_coordinates,
+    "batched": generate_initial_coordinates_batched,
+    "lattice": generate_initial_coordinates_lattice,
+}
+"""The functions that generate the initial coordinates, by name."""
+
+
+def initialize_state(mesh, container, coverage_rate, f_init, method="sequential"):
+    object_coords, _skipped = INITIALIZERS[method](
         container,
         mesh,
         coverage_rate,
@@ -0,0 +1,213 @@
+"""Batched solver for the NLC optimisation of all objects.
+
+Instead of a `scipy.optimize.minimize` call per object, the optimisation problems of
+all objects are solved in one compiled call, in parallel over the objects. The
+problem is the same as in `nlc_optimisation.compute_optimal_transform`: maximize the
+scale of the object such that all its vertices stay on the inner side of the faces of
+its CAT cell. It is solved with an augmented Lagrangian method in the linear scale
+s = f^(1/3), of which the bound constrained subproblems are minimized with projected
+Levenberg-Marquardt steps on the Gauss-Newton approximation of the hessian.
+
+The augmented Lagrangian only converges to a feasible result, so the scale of the
+result is reduced to the largest scale for which all constraints hold. An object for
+which no feasible result is found keeps its transform at the lower scale bound.
+"""
+import numpy as np
+from numba import jit, prange
+
+from irregular_object_packing.packing.nlc_optimisation import (
+    DEBUG,
+    NO_PYTHON,
+    rotation_matrix,
+    rotation_matrix_jacobian,
+)
+
+N_OUTER = 15
+"""The maximum number of multiplier updates of the augmented Lagrangian."""
+N_INNER = 100
+"""The maximum number of Levenberg-Marquardt steps per subproblem."""
+MIN_DAMPING, MAX_DAMPING = 1e-10, 1e10
+"""The range of the damping of the Levenberg-Marquardt steps."""
+FEASIBILITY_TOL = 1e-6
+"""The maximum constraint violation of a result."""
+
+
+@jit(nopython=NO_PYTHON, debug=DEBUG, fastmath=True, cache=True)
+def constraint_terms(y, V, N, qn):
+    """The constraints (s R v + t - q) . n - padding, and (R v) . n, for the parameters
+    y = (s, theta, t) of an object."""
+    rv_n = np.sum((V @ rotation_matrix(np.ascontiguousarray(y[1:4])).T) * N, axis=1)
+    return y[0] * rv_n + N @ np.ascontiguousarray(y[4:]) - qn, rv_n
+
+
+@jit(nopython=NO_PYTHON, debug=DEBUG, fastmath=True, cache=True)
+def constraint_jacobian(y, V, N, rv_n):
+    """The (m, 7) jacobian of the constraints with respect to y = (s, theta, t)."""
+    J = np.empty((len(V), 7))
+    J[:, 0] = rv_n
+    dR = rotation_matrix_jacobian(np.ascontiguousarray(y[1:4]))
+    for k in range(3):
+        J[:, 1 + k] = y[0] * np.sum((V @ dR[k].T) * N, axis=1)
+    J[:, 4:] = N
+    return J
+
+
+@jit(nopython=NO_PYTHON, debug=DEBUG, fastmath=True, cache=True)
+def augmented_lagrangian(y, V, N, qn, lam, mu):
+    """The value of the augmented Lagrangian of -s s.t. c(y) >= 0, the constraints and
+    the penalty weights of the constraints, which are zero for inactive constraints."""
+    c, rv_n = constraint_terms(y, V, N, qn)
+    active = c < lam / mu
+    value = -y[0] + np.sum(np.where(active, -lam * c + 0.5 * mu * c**2, -0.5 * lam**2 / mu))
+    return value, c, rv_n, np.where(active, mu * c - lam, 0.0), active
+
+
+@jit(nopython=NO_PYTHON, debug=DEBUG, fastmath=True, cache=True)
+def gauss_newton_system(y, V, N, rv_n, w, active, mu, lower, upper):
+    """The gradient and the Gauss-Newton approximation of the hessian of the augmented
+    Lagrangian. The variables that are at a bound and pushed against it are fixed, by
+    zeroing their gradient and their rows and columns of the hessian."""
+    J = constraint_jacobian(y, V, N, rv_n)
+    grad = J.T @ w
+    grad[0] -= 1.0
+    J_active = J[active]
+    H = mu * (J_active.T @ J_active)
+
+    fixed = ((y <= lower) & (grad > 0)) | ((y >= upper) & (grad < 0))
+    reduced_grad = np.where(fixed, 0.0, grad)
+    for i in range(7):
+        if fixed[i]:
+            H[i, :] = 0.0
+            H[:, i] = 0.0
+    return grad, reduced_grad, H
+
+
+@jit(nopython=NO_PYTHON, debug=DEBUG, fastmath=True, cache=True)
+def solve_object(V, N, qn, lower, upper):
+    """Maximize the scale of a single object, see the module docstring.
+
+    Args:
+        - V: (m, 3) the vertices relative to the object coordinate.
+        - N: (m, 3) the unit normals of the faces.
+        - qn: (m,) the offset of the faces q . n plus the padding.
+        - lower, upper: (7,) the bounds of (s, theta, t).
+
+    Returns:
+        np.ndarray: (7,) the optimal (s, theta, t).
+    """
+    y0 = np.zeros(7)
+    y0[0] = lower[0]
+    if len(V) == 0:
+        # nothing limits the object, like SLSQP it grows to the upper scale bound
+        y_free = np.zeros(7)
+        y_free[0] = upper[0]
+        return y_free
+
+    y = y0.copy()
+    lam = np.zeros(len(V))
+    mu = 10.0
+    damping = 1.0
+    for _ in range(N_OUTER):
+        value, c, rv_n, w, active = augmented_lagrangian(y, V, N, qn, lam, mu)
+        for _ in range(N_INNER):
+            grad, reduced_grad, H = gauss_newton_system(y, V, N, rv_n, w, active, mu, lower, upper)
+            # Levenberg-Marquardt steps, projected on the bounds
+            improved = False
+            while damping < MAX_DAMPING:
+                direction = -np.linalg.solve(H + damping * np.eye(7), reduced_grad)
+                y_new = np.minimum(np.maximum(y + direction, lower), upper)
+                value_new, c_new, rv_n_new, w_new, active_new = augmented_lagrangian(y_new, V, N, qn, lam, mu)
+                if value_new <= value + 1e-4 * np.dot(grad, y_new - y):
+                    improved = True
+                    damping = max(damping * 0.1, MIN_DAMPING)
+                    break
+                damping *= 10
+            if not improved:
+                damping = 1.0
+                break
+            converged = np.max(np.abs(y_new - y)) < 1e-10
+            y, value, c, rv_n, w, active = y_new, value_new, c_new, rv_n_new, w_new, active_new
+            if converged:
+                break
+
+        if -np.min(c) < FEASIBILITY_TOL:
+            y_feasible = restore_feasibility(y, V, N, qn, lower)
+            if y_feasible[0] > 0:
+                return y_feasible
+        lam = np.maximum(lam - mu * c, 0.0)
+        mu = min(mu * 10, 1e8)
+
+    y_feasible = restore_feasibility(y, V, N, qn, lower)
+    if y_feasible[0] > 0:
+        return y_feasible
+    # no feasible result was found, keep the object as it is
+    return y0
+
+
+@jit(nopython=NO_PYTHON, debug=DEBUG, fastmath=True, cache=True)
+def restore_feasibility(y, V, N, qn, lower):
+    """Reduce the scale of y to the largest scale for which the constraints hold. The
+    scale of the result is zero if no scale within the lower bound is feasible."""
+    y_feasible = y.copy()
+    y_feasible[0] = max_feasible_scale(y, V, N, qn)
+    if y_feasible[0] < lower[0] or np.min(constraint_terms(y_feasible, V, N, qn)[0]) < -FEASIBILITY_TOL:
+        y_feasible[0] = 0.0
+    return y_feasible
+
+
+@jit(nopython=NO_PYTHON, debug=DEBUG, fastmath=True, cache=True)
+def max_feasible_scale(y, V, N, qn):
+    """The largest scale s <= y[0] for which the constraints that limit the scale hold
+    at the rotation and translation of y."""
+    c, rv_n = constraint_terms(y, V, N, qn)
+    offset = c - y[0] * rv_n
+    s = y[0]
+    for i in range(len(c)):
+        if rv_n[i] < 0:
+            s = min(s, offset[i] / -rv_n[i])
+    return s
+
+
+@jit(nopython=NO_PYTHON, debug=DEBUG, parallel=True, cache=True)
+def solve_objects(obj_coords, normals, obj_offsets, padding, lower, upper):
+    """Solve the problems of all objects in parallel, see `solve_object`."""
+    n_objs = len(obj_coords)
+    res = np.empty((n_objs, 7))
+    for obj_id in prange(n_objs):
+        rows = normals[obj_offsets[obj_id]:obj_offsets[obj_id + 1]]
+        V = np.ascontiguousarray(rows[:, 0, :]) - obj_coords[obj_id]
+        N = np.ascontiguousarray(rows[:, 2, :])
+        qn = np.sum((rows[:, 1, :] - obj_coords[obj_id]) * N, axis=1) + padding
+        res[obj_id] = solve_object(V, N, qn, lower, upper)
+    return res
+
+
+def compute_optimal_transforms_batched(obj_coords, normals, obj_offsets, padding, max_scale, scale_bound, max_angle, max_t) -> np.ndarray:
+    """Compute the optimal transforms of all objects, the batched alternative to
+    calling `compute_optimal_transform` for every object.
+
+    Args:
+        - obj_coords: (n_objs, 3) the coordinates of the objects.
+        - normals: (n_normals, 3, 3) the [vertex, face point, face normal] entries of all objects.
+        - obj_offsets: (n_objs + 1,) the start of the normals of every object.
+        - the remaining arguments as in `compute_optimal_transform`.
+
+    Returns:
+        np.ndarray: (n_objs, 7) the transform arrays [f, theta, t] of the objects.
+    """
+    max_angle = max_angle * 0.9
+    max_t = max_t if max_t is not None else np.inf
+    max_f = scale_bound[1] if scale_bound[1] is not None else np.inf
+    lower = np.array([scale_bound[0] ** (1 / 3), -max_angle, -max_angle, -max_angle, -max_t, -max_t, -max_t])
+    upper = np.array([max_f ** (1 / 3), max_angle, max_angle, max_angle, max_t, max_t, max_t])
+
+    res = solve_objects(
+        np.ascontiguousarray(obj_coords, dtype=np.float64),
+        np.asarray(normals, dtype=np.float64),
+        np.asarray(obj_offsets, dtype=np.int64),
+        float(padding),
+        lower,
+        upper,
+    )
+    res[:, 0] = res[:, 0] ** 3
+    return res
@@ -0,0 +1,110 @@
+"""Process pool backend for the per object NLC optimisation.
+
+SLSQP and the constraint callback hold the GIL for most of a solve, so threads barely
+run in parallel. The `ProcessNLCExecutor` solves the objects in persistent worker
+processes instead. The object coordinates and the (n, 3, 3) normals buffer of the
+CAT are written to a shared memory block that the workers attach to, only the object
+ids and offsets are sent with the tasks.
+"""
+import numpy as np
+
+from irregular_object_packing.packing import nlc_optimisation as nlc
+from irregular_object_packing.packing.process_pool import (
+    attach_shared_memory,
+    ensure_shared_memory,
+    process_pool,
+    release_shared_memory,
+)
+
+
+def optimize_objects(shm_name, n_objs, n_normals, obj_ids, obj_offsets, x0_angles, nlc_kwargs) -> np.ndarray:
+    """Compute the optimal transforms of a chunk of objects in a worker process.
+
+    Args:
+        - shm_name: the name of the shared memory block with the object coords
+            followed by the normals.
+        - n_objs, n_normals: the number of object coords and normals in the block.
+        - obj_ids: the ids of the objects of the chunk.
+        - obj_offsets: the start and end of the normals of every object of the chunk.
+        - x0_angles: (len(obj_ids), 3) the initial rotation of every object.
+        - nlc_kwargs: the arguments for `compute_optimal_transform`.
+
+    Returns:
+        np.ndarray: (len(obj_ids), 7) the transform arrays found by the optimisation.
+    """
+    buffer = np.ndarray((n_objs * 3 + n_normals * 9,), dtype=np.float64, buffer=attach_shared_memory(shm_name).buf)
+    obj_coords = buffer[:n_objs * 3].reshape(n_objs, 3)
+    normals = buffer[n_objs * 3:].reshape(n_normals, 3, 3)
+
+    res_tf_arrays = np.empty((len(obj_ids), 7))
+    for i, obj_id in enumerate(obj_ids):
+        res_tf_arrays[i] = nlc.compute_optimal_transform(
+            obj_coord=obj_coords[obj_id],
+            vertex_fpoint_normal_arr=normals[obj_offsets[i, 0]:obj_offsets[i, 1]],
+            x0_angles=x0_angles[i],
+            **nlc_kwargs,
+        )
+    return res_tf_arrays
+
+
+class ProcessNLCExecutor:
+    """Persistent worker processes that compute the optimal transforms of the objects."""
+
+    def __init__(self, n_workers: int, chunks_per_worker=4):
+        self.n_workers = n_workers
+        self.chunks_per_worker = chunks_per_worker
+        self.pool = process_pool(n_workers)
+        self.shm = None
+
+    def _write_shared(self, obj_coords: np.ndarray, normals: np.ndarray) -> None:
+        """Copy the coords and normals into the shared memory block, which is only
+        replaced when it is too small."""
+        self.shm = ensure_shared_memory(self.shm, (obj_coords.size + normals.size) * np.float64().itemsize)
+        buffer = np.ndarray((obj_coords.size + normals.size,), dtype=np.float64, buffer=self.shm.buf)
+        buffer[:obj_coords.size] = obj_coords.ravel()
+        buffer[obj_coords.size:] = normals.ravel()
+
+    def _release_shared(self):
+        release_shared_memory(self.shm)
+        self.shm = None
+
+    def compute_optimal_transforms(self, obj_coords: np.ndarray, normals: np.ndarray, obj_offsets: np.ndarray, nlc_kwargs: dict) -> np.ndarray:
+        """Compute the optimal transform of every object (see `nlc.compute_optimal_transform`).
+
+        Args:
+            - obj_coords: (n_objs, 3) the coordinates of the objects.
+            - normals: (n_normals, 3, 3) the [vertex, face point, face normal] entries of all objects.
+            - obj_offsets: (n_objs + 1,) the start of the normals of every object.
+            - nlc_kwargs: the arguments for `compute_optimal_transform`.
+
+        Returns:
+            np.ndarray: (n_objs, 7) the transform arrays found by the optimisation.
+        """
+        n_objs = len(obj_coords)
+        # draw the initial rotations here, in the same order as a sequential loop would
+        max_angle = nlc_kwargs["max_angle"] * 0.9
+        x0_angles = np.random.uniform(-max_angle, max_angle, size=(n_objs, 3))
+
+        self._write_shared(np.ascontiguousarray(obj_coords, dtype=np.float64), np.asarray(normals, dtype=np.float64))
+        offsets = np.column_stack((obj_offsets[:n_objs], obj_offsets[1:n_objs + 1]))
+        chunks = np.array_split(np.arange(n_objs), min(n_objs, self.n_workers * self.chunks_per_worker) or 1)
+        futures = [
+            self.pool.submit(
+                optimize_objects, self.shm.name, n_objs, len(normals), ids, offsets[ids], x0_angles[ids], nlc_kwargs
+            )
+            for ids in chunks
+        ]
+        res_tf_arrays = np.empty((n_objs, 7))
+        for ids, future in zip(chunks, futures):
+            res_tf_arrays[ids] = future.result()
+        return res_tf_arrays
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self._release_shared()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
@@ -9,6 +9,8 @@ from scipy.optimize import Bounds, minimize
 # Define the objective function to be maximized
 NO_PYTHON = True
 DEBUG = False
+FD_STEP = np.sqrt(np.finfo(np.float64).eps)
+"""The step of the finite difference jacobian of SLSQP."""
 
 logger = logging.getLogger("numba")
 logger.setLevel(logging.ERROR)
@@ -55,6 +57,51 @@ def rotation_matrix(theta):
     return R
 
 
+@jit(float64[::1](float64[::1]), nopython=NO_PYTHON, debug=DEBUG, cache=True)
+def objective_jacobian(x):
+    """Gradient of the objective function."""
+    jac = np.zeros_like(x)
+    jac[0] = -1.0
+    return jac
+
+
+@jit(float64[:, :, ::1](float64[::1]), nopython=NO_PYTHON, debug=DEBUG, fastmath=True, cache=True)
+def rotation_matrix_jacobian(theta):
+    """Derivatives of the rotation matrix (see `rotation_matrix`) with respect to the
+    rotation angles.
+
+    Parameters
+    ----------
+    theta: (3,) array of (rx, ry, rz)
+
+    Returns
+    -------
+    dR : (3,3,3) array
+        dR[k] is the derivative of the rotation matrix with respect to theta[k].
+    """
+    c = np.cos(theta)
+    s = np.sin(theta)
+
+    dR = np.empty((3, 3, 3), dtype=np.float64)
+    dR[0] = np.array([
+        [0.0, c[1] * s[2] * s[0] + s[1] * c[0], c[1] * s[2] * c[0] - s[1] * s[0]],
+        [0.0, -c[2] * s[0], -c[2] * c[0]],
+        [0.0, -s[1] * s[2] * s[0] + c[1] * c[0], -s[1] * s[2] * c[0] - c[1] * s[0]]
+    ], dtype=np.float64)
+    dR[1] = np.array([
+        [-s[1] * c[2], s[1] * s[2] * c[0] + c[1] * s[0], -s[1] * s[2] * s[0] + c[1] * c[0]],
+        [0.0, 0.0, 0.0],
+        [-c[1] * c[2], c[1] * s[2] * c[0] - s[1] * s[0], -c[1] * s[2] * s[0] - s[1] * c[0]]
+    ], dtype=np.float64)
+    dR[2] = np.array([
+        [-c[1] * s[2], -c[1] * c[2] * c[0], c[1] * c[2] * s[0]],
+        [c[2], -s[2] * c[0], s[2] * s[0]],
+        [s[1] * s[2], s[1] * c[2] * c[0], -s[1] * c[2] * s[0]]
+    ], dtype=np.float64)
+
+    return dR
+
+
 @ jit(float64[: , ::1](float64, float64[::1], float64[::1]), nopython=NO_PYTHON, debug=DEBUG, fastmath=True, cache=True)
 def construct_transform_matrix(f, theta, t):
     """Transforms parameters to transformation matrix.
@@ -211,8 +258,52 @@ def local_constraint_vertices(
     return constraints
 
 
+@ jit(nopython=NO_PYTHON, debug=DEBUG, fastmath=True, cache=True)
+def local_constraint_jacobian(
+    tf_arr: ndarray[float],
+    vertex_fpoint_fnormal_arr: ndarray[ndarray[float]],
+    obj_coords: ndarray[float],
+    padding=0.0,
+):
+    """Jacobian of `local_constraint_vertices` with respect to the transformation
+    parameters (f, theta_x, theta_y, theta_z, t_x, t_y, t_z).
+
+    The constraint of a vertex v (relative to the object coordinate) and a face with
+    point q and unit normal n is (f^(1/3) R(theta) v + t - q) . n - padding, so:
+        d/df     = 1/3 f^(-2/3) (R v) . n
+        d/dtheta = f^(1/3) (dR/dtheta v) . n
+        d/dt     = n
+
+    Returns
+    -------
+    np.ndarray
+        The (n_constraints, 7) jacobian.
+    """
+    f = tf_arr[0]
+    f_cbrt = f ** (1 / 3)
+    if f > FD_STEP:
+        df_cbrt = f_cbrt / (3 * f)
+    else:
+        # the derivative of the cube root is infinite at 0, use the slope over a finite step instead
+        df_cbrt = ((f + FD_STEP) ** (1 / 3) - f_cbrt) / FD_STEP
+    R = rotation_matrix(np.ascontiguousarray(tf_arr[1:4]))
+    dR = rotation_matrix_jacobian(np.ascontiguousarray(tf_arr[1:4]))
 
-def compute_optimal_transform( obj_coord, vertex_fpoint_normal_arr, padding, max_scale, scale_bound, max_angle, max_t,):
+    size = len(vertex_fpoint_fnormal_arr)
+    jac = np.empty((size, 7), dtype=np.float64)
+    for i in range(size):
+        v_i = vertex_fpoint_fnormal_arr[i][0] - obj_coords
+        normal = vertex_fpoint_fnormal_arr[i][2]
+        jac[i, 0] = df_cbrt * np.dot(R @ v_i, normal)
+        for k in range(3):
+            jac[i, 1 + k] = f_cbrt * np.dot(dR[k] @ v_i, normal)
+        jac[i, 4:] = normal
+    return jac
+
+
+def compute_optimal_transform( obj_coord, vertex_fpoint_normal_arr, padding, max_scale, scale_bound, max_angle, max_t, x0_angles=None):
+    """Compute the transform parameters [f, theta_x, theta_y, theta_z, t_x, t_y, t_z] that maximize the
+    scale of the object within its cat cell. The initial rotation is drawn randomly unless `x0_angles` is given."""
     max_angle = max_angle * 0.9
     max_t = max_t if max_t is not None else np.inf
     min_f = scale_bound[0]
@@ -223,7 +314,7 @@ def compute_optimal_transform( obj_coord, vertex_fpoint_normal_arr, padding, max
     bounds = [(0.09, max_f), r_bound, r_bound, r_bound, t_bound, t_bound, t_bound]
     x0 = np.array([min_f, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0])
     # randomize initial guess based on max_angle
-    x0[1:4] = np.random.uniform(-max_angle, max_angle, size=3)
+    x0[1:4] = np.random.uniform(-max_angle, max_angle, size=3) if x0_angles is None else x0_angles
 
     lower_bounds = np.array([min_f, -max_angle, -max_angle, -max_angle, -max_t, -max_t, -max_t])
     upper_bounds = np.array([max_f, max_angle, max_angle, max_angle, max_t, max_t, max_t])
@@ -232,6 +323,7 @@ def compute_optimal_transform( obj_coord, vertex_fpoint_normal_arr, padding, max
     constraint_dict = {
         "type": "ineq",
         "fun": local_constraint_vertices,
+        "jac": local_constraint_jacobian,
         "args": (
             vertex_fpoint_normal_arr,
             obj_coord,
@@ -239,7 +331,7 @@ def compute_optimal_transform( obj_coord, vertex_fpoint_normal_arr, padding, max
         ),
     }
     res = minimize(
-        objective, x0, method="SLSQP", bounds=bounds, constraints=constraint_dict, # options={'ftol': 1E-8}
+        objective, x0, jac=objective_jacobian, method="SLSQP", bounds=bounds, constraints=constraint_dict, # options={'ftol': 1E-8}
     )
 
     return res.x
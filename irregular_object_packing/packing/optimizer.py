@@ -1,6 +1,8 @@
 # %%
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from concurrent.futures import ThreadPoolExecutor as PoolExecutor
+from os import path
 from time import time
 
 import click
@@ -10,34 +12,57 @@ from pyvista import PolyData, UnstructuredGrid
 from tqdm.auto import tqdm
 
 from irregular_object_packing.cat import chordal_axis_transform as cat
+from irregular_object_packing.cat.cat_data import CatResult
+from irregular_object_packing.cat.incremental_cdt import IncrementalCDT
+from irregular_object_packing.cat.parallel_cdt import compute_cdt_parallel
 from irregular_object_packing.mesh.collision import (
+    broad_phase_pairs,
     compute_and_add_all_collisions,
 )
+from irregular_object_packing.mesh.lod_cache import lod_cache
 from irregular_object_packing.mesh.sampling import (
     mesh_simplification_condition,
-    resample_mesh_by_triangle_area,
     resample_pyvista_mesh,
 )
+from irregular_object_packing.mesh.sdf import ContainerSDF
 from irregular_object_packing.mesh.transform import (
     scale_and_center_mesh,
     scale_to_volume,
 )
 from irregular_object_packing.mesh.utils import (
-    convert_faces_to_polydata_input,
+    cat_cell_mesh,
     print_mesh_info,
 )
 from irregular_object_packing.packing import initialize as init
 from irregular_object_packing.packing import nlc_optimisation as nlc
+from irregular_object_packing.packing.background_writer import BackgroundWriter
+from irregular_object_packing.packing.checkpoint import (
+    Checkpointer,
+    arrays_mesh,
+    mesh_arrays,
+    random_state_arrays,
+    read_snapshot,
+    set_random_state,
+)
+from irregular_object_packing.packing.collision_executor import ProcessCollisionExecutor
+from irregular_object_packing.packing.history import IterationHistory
+from irregular_object_packing.packing.nlc_batched import (
+    compute_optimal_transforms_batched,
+)
+from irregular_object_packing.packing.nlc_executor import ProcessNLCExecutor
 from irregular_object_packing.packing.optimizer_data import (
     IterationData,
     OptimizerData,
     SimConfig,
 )
 from irregular_object_packing.packing.optimizer_plotter import ScenePlotter
+from irregular_object_packing.packing.run_archive import RunArchiveWriter
+from irregular_object_packing.packing.scheduler import ActiveSetScheduler
 from irregular_object_packing.packing.utils import (
     check_cat_cells_quality,
     log_violations,
 )
+from irregular_object_packing.packing.violations import IncrementalViolationChecker
 
 # This is for the @profile decorator that otherwise has to be commented out
 if type(__builtins__) is not dict or 'profile' not in __builtins__: profile=lambda f:f  # noqa: E731, E701
@@ -71,6 +96,21 @@ class Optimizer(OptimizerData):
         self.fails_per_step = np.zeros(self.config.n_scale_steps)
         self.errors_per_step = np.zeros(self.config.n_scale_steps)
         self.pbar1, self.pbar2, self.pbar3 = None, None, None
+        self.cdt = IncrementalCDT(move_tol=config.cdt_move_tol) if config.incremental_cdt else None
+        self.executor = None
+        self.cdt_executor = None
+        self.nlc_executor = None
+        self.collision_executor = None
+        self.container_sdf = None
+        self.scheduler = None
+        self.n_active = 0
+        self.violating_ids = set()
+        self.checkpointer = None
+        self.snapshot = None
+        self.mesh_snapshot = {}
+        self.resume_i = None
+        self.resume_times = []
+        self.history = IterationHistory(config.history_cat_ring, config.history_dir)
         self.seed=seed
         if seed is not None:
             np.random.seed(seed)
@@ -100,11 +140,13 @@ class Optimizer(OptimizerData):
                 container=self.container0,
                 coverage_rate=self.config.r,
                 f_init=self.config.init_f,
+                method=self.config.initializer,
             )
 
-        self.log.info(f"Setup with settings: \n{self.config}")
-        self.log.info(f"Number of objects: {len(self.tf_arrays)}")
+        self.log.info("Setup with settings: \n%s", self.config)
+        self.log.info("Number of objects: %d", len(self.tf_arrays))
 
+        self.open_archive()
         self.update_data(-1, -1)
         objects = self.current_meshes(shape=self.shape0)
         init.check_initial_state(self.container0, objects)
@@ -120,7 +162,7 @@ class Optimizer(OptimizerData):
     # Helper functions
     # ----------------------------------------------------------------------------------------------
     def update_data(self, i_b, i, viol_data=()):
-        self.log.info(f"Updating data for {i_b=}, {i=}")
+        self.log.info("Updating data for i_b=%d, i=%d", i_b, i)
         iterdata = IterationData(
             i,
             i_b,
@@ -128,10 +170,18 @@ class Optimizer(OptimizerData):
             self.scale_steps[i_b],
             np.count_nonzero(self.tf_arrays[:, 0] >= self.scale_steps[i_b]),
             self.curr_sample_rate,
-            *viol_data
+            *viol_data,
+            n_active=self.n_active,
         )
         self.add(self.tf_arrays, self.normals, self.cat_cells, iterdata)
 
+    def open_archive(self):
+        """Create the run archive, unless it is open already or a resumed run reopened it."""
+        if self.archive is None and self.config.run_archive_dir is not None:
+            self.archive = RunArchiveWriter(
+                self.config.run_archive_dir, self.shape0, self.container0, self.config, self.description
+            )
+
     def sample_rate_mesh(self, scale_factor):
         return int(mesh_simplification_condition(scale_factor, self.config.alpha, self.config.beta) * self.shape0.n_faces)
 
@@ -142,24 +192,125 @@ class Optimizer(OptimizerData):
 
         self.curr_sample_rate = self.sample_rate_mesh(scale_factor)
         if not self.config.sampling_disabled:
-            self.shape = resample_pyvista_mesh(self.shape0, self.curr_sample_rate)
-            self.container = resample_mesh_by_triangle_area(self.shape, self.container0, factor=4)
+            cache = lod_cache(self.config.lod_cache_dir)
+            self.shape = cache.resample(self.shape0, self.curr_sample_rate)
+            self.container = cache.resample_by_triangle_area(self.shape, self.container0, factor=4)
+            if self.cdt is not None:
+                self.cdt.reset()
+            self.container_sdf = None
 
-        self.log.info(f"container: n_faces: {self.container.n_faces}[sampled]/{self.container0.n_faces}[original]")
-        self.log.info(f"mesh: n_faces: {self.curr_sample_rate}[sampled]/{self.shape0.n_faces}[original]")
+        if self.config.checkpoint_dir is not None:
+            self.snapshot_meshes()
+
+        self.log.info("container: n_faces: %d[sampled]/%d[original]", self.container.n_faces, self.container0.n_faces)
+        self.log.info("mesh: n_faces: %d[sampled]/%d[original]", self.curr_sample_rate, self.shape0.n_faces)
+
+    @property
+    def checkpoint_path(self) -> str:
+        return path.join(self.config.checkpoint_dir, f"checkpoint-{self.description}.npz")
+
+    def snapshot_meshes(self):
+        """Copy the current shape and container for the snapshots, once per resampling."""
+        self.mesh_snapshot = {**mesh_arrays("shape", self.shape), **mesh_arrays("container", self.container)}
+
+    def iteration_state(self, iteration_times: list) -> dict[str, np.ndarray]:
+        """The state at the start of the current iteration without the meshes, which is
+        small enough to be taken every iteration."""
+        return {
+            "tf_arrays": self.tf_arrays.copy(),
+            "i_b": np.array(self.i_b),
+            "i": np.array(self.i),
+            "curr_sample_rate": np.array(self.curr_sample_rate),
+            "iteration_times": np.array(iteration_times, dtype=float),
+            "time_per_step": self.time_per_step.copy(),
+            "its_per_step": self.its_per_step.copy(),
+            "fails_per_step": self.fails_per_step.copy(),
+            "errors_per_step": self.errors_per_step.copy(),
+            "n_archived": np.array(self.n_archived),
+            "violating_ids": np.array(sorted(self.violating_ids), dtype=np.int64),
+            **random_state_arrays(),
+            **({} if self.scheduler is None else self.scheduler.state_arrays()),
+        }
+
+    def checkpoint_state(self, iteration_times: list) -> dict[str, np.ndarray]:
+        """The state at the start of the current iteration, see `restore_checkpoint`."""
+        return {**self.iteration_state(iteration_times), **self.mesh_snapshot}
+
+    def restore_checkpoint(self, filename: str = None):
+        """Restore a snapshot, `run` then continues at the iteration at which it was
+        taken. The optimizer has to be created with the same shape, container and config.
+        The incremental CDT restarts with a full CDT, and the history starts empty. The
+        run archive is reopened and cut back to the iterations before the snapshot."""
+        snapshot = read_snapshot(self.checkpoint_path if filename is None else filename)
+        self.tf_arrays = snapshot["tf_arrays"]
+        self.i_b = int(snapshot["i_b"])
+        self.i = int(snapshot["i"])
+        self.curr_sample_rate = int(snapshot["curr_sample_rate"])
+        self.time_per_step = snapshot["time_per_step"]
+        self.its_per_step = snapshot["its_per_step"]
+        self.fails_per_step = snapshot["fails_per_step"]
+        self.errors_per_step = snapshot["errors_per_step"]
+        self.violating_ids = set(snapshot["violating_ids"].tolist())
+        if "scheduler_frozen" in snapshot:
+            self.scheduler = ActiveSetScheduler(self.n_objs, self.config.active_set_tol)
+            self.scheduler.restore_state(snapshot)
+        set_random_state(snapshot)
+        self.shape = arrays_mesh("shape", snapshot)
+        self.container = arrays_mesh("container", snapshot)
+        self.snapshot_meshes()
+        self.container_sdf = None
+        if self.cdt is not None:
+            self.cdt.reset()
+        self.resume_i = self.i
+        self.resume_times = list(snapshot["iteration_times"])
+        if self.config.run_archive_dir is not None:
+            self.n_archived = int(snapshot["n_archived"])
+            self.archive = RunArchiveWriter.reopen(self.config.run_archive_dir, self.n_archived)
 
     def run(self, start_idx=None, end_idx=None, Ni=-1):
         self.check_setup()
+        self.open_archive()
+        if self.config.checkpoint_dir is not None:
+            self.checkpointer = Checkpointer(
+                self.checkpoint_path, self.config.checkpoint_every, self.config.checkpoint_interval
+            )
+        if self.config.writer_queue_size > 0:
+            self.writer = BackgroundWriter(self.config.writer_queue_size)
+        if np.prod(self.config.cdt_blocks) > 1:
+            self.cdt_executor = ProcessPoolExecutor(max_workers=int(np.prod(self.config.cdt_blocks)))
         try:
             if self.config.n_threads == 1:
                 self._run(start_idx, end_idx, Ni)
+            elif self.config.executor == "process":
+                self.nlc_executor = ProcessNLCExecutor(n_workers=self.config.n_threads)
+                self.collision_executor = ProcessCollisionExecutor(n_workers=self.config.n_threads)
+                self._run(start_idx, end_idx, Ni)
             else:
                 self.executor = PoolExecutor(thread_name_prefix="optimizer", max_workers=self.config.n_threads)
                 self._run(start_idx, end_idx, Ni)
                 self.executor.shutdown(wait=False, cancel_futures=False)
         except KeyboardInterrupt:
-            self.executor.shutdown(wait=False, cancel_futures=False)
-            # self.write_state()
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=False)
+            if self.checkpointer is not None and self.snapshot is not None:
+                self.checkpointer.save({**self.snapshot, **self.mesh_snapshot})
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+            if self.checkpointer is not None:
+                self.checkpointer.shutdown()
+                self.checkpointer = None
+                self.snapshot = None
+            if self.cdt_executor is not None:
+                self.cdt_executor.shutdown(wait=False, cancel_futures=True)
+                self.cdt_executor = None
+            if self.nlc_executor is not None:
+                self.nlc_executor.shutdown()
+                self.nlc_executor = None
+            if self.collision_executor is not None:
+                self.collision_executor.shutdown()
+                self.collision_executor = None
         self.log.info("Exiting optimizer.run()")
 
     def _run(self, start_idx=None, end_idx=None, Ni=-1):
@@ -170,17 +321,26 @@ class Optimizer(OptimizerData):
             end_idx = self.config.n_scale_steps
 
         for i_b in range(start_idx, end_idx):
-            self.log.info(f"Starting scaling step {i_b}")
+            self.log.info("Starting scaling step %d", i_b)
             self.i_b = i_b
-            self.resample_meshes(self.curr_max_scale)
-            self.pbar1.set_postfix(ƒ_max=f"{self.curr_max_scale:.3f}")
-            self.pbar2.reset()
-            iteration_times = []
-            for i in range(self.config.itn_max):
-                self.log.info(f"Starting iteration [{i}, scale_step:{i_b}] total: {self.idx}")
-                self.pbar3.reset()
-                self.pbar2.set_postfix(total=self.idx)
+            if self.resume_i is None:
+                self.resample_meshes(self.curr_max_scale)
+                start_i, iteration_times = 0, []
+            else:
+                start_i, iteration_times = self.resume_i, self.resume_times
+                self.resume_i, self.resume_times = None, []
+            self.submit(self.pbar1.set_postfix, {"ƒ_max": f"{self.curr_max_scale:.3f}"})
+            self.submit(self.pbar2.reset)
+            for i in range(start_i, self.config.itn_max):
+                self.log.info("Starting iteration [%d, scale_step:%d] total: %d", i, i_b, self.idx)
+                self.submit(self.pbar3.reset)
+                self.submit(self.pbar2.set_postfix, {"total": self.idx})
                 self.i = i
+                if self.checkpointer is not None:
+                    # kept to write a snapshot when the run is interrupted
+                    self.snapshot = self.iteration_state(iteration_times)
+                    if self.checkpointer.due():
+                        self.checkpointer.save({**self.snapshot, **self.mesh_snapshot})
                 start_time = time()
                 if self.perform_optimisation_iteration() is False:
                     continue
@@ -189,17 +349,18 @@ class Optimizer(OptimizerData):
 
                 # administrative stuff
                 self.process_iteration()
-                self.pbar2.update()
+                self.update_pbar(2)
 
                 if Ni != -1 and self.idx >= Ni:
                     return
 
                 if self.step_should_terminate():
+                    self.history.pin(self.idx)
                     self.time_per_step[i_b] = np.mean(iteration_times)
                     self.its_per_step[i_b] = i
                     break
 
-            self.pbar1.update()
+            self.update_pbar(1)
 
     # ----------------------------------------------------------------------------------------------
     # Optimisation
@@ -208,80 +369,140 @@ class Optimizer(OptimizerData):
     def perform_optimisation_iteration(self):
         """Computes cat cells and scales the objects accordingly"""
         self.objects = self.current_meshes()
-        meshes = self.objects + [self.container]
+        cdt_input = cat.assemble_cdt_input([self.objects, self.container])
 
         try:
         # Compute the CDT
-            tetmesh = cat.compute_cdt(meshes)
+            tetmesh = self.compute_cdt(cdt_input)
         except RuntimeError as e:
             self.log.error(f"RuntimeError: {e}, Scaling down and trying again...")
             self.reduce_all_scales()
             self.errors_per_step[self.i_b] += 1
             return False
 
-        self.normals, self.cat_cells, self.normals_pp = self.compute_cat_cells(tetmesh)
+        self.cat_result = self.compute_cat_cells(tetmesh, cdt_input.n_points_per_object)
+        if self.config.active_set:
+            if self.scheduler is None:
+                self.scheduler = ActiveSetScheduler(self.n_objs, self.config.active_set_tol)
+            self.scheduler.set_neighbours(tetmesh, cdt_input.n_points_per_object)
+        self.normals = self.cat_result.normals_per_obj
+        self.cat_cells = self.cat_result.cat_cells
+        self.normals_pp = self.cat_result.normals_per_point
 
         check_cat_cells_quality(self.log,self.normals)
 
         self.optimize_positions()
         return True
 
+    def compute_cdt(self, cdt_input: cat.CdtInput) -> UnstructuredGrid:
+        """The tetmesh of the current objects and the container, of which the points are
+        assembled in cdt_input."""
+        if self.cdt is not None:
+            return self.cdt.update(self.objects + [self.container])
+        if np.prod(self.config.cdt_blocks) > 1:
+            return compute_cdt_parallel(self.objects + [self.container], self.config.cdt_blocks, executor=self.cdt_executor)
+        return cat.tetrahedralize(cdt_input)
+
     def optimize_positions(self):
         self.log.debug("optimizing cells...")
-
-        if self.config.n_threads is None or self.config.n_threads != 1:
-            self.executor.map(self.parallel_local_optimisation, range(self.n_objs), self.tf_arrays)
-        else:
+        obj_ids = None
+        if self.scheduler is not None:
+            obj_ids = self.scheduler.schedule(self.tf_arrays, self.curr_max_scale, self.violating_ids)
+            self.log.info("%d/%d objects are active", len(obj_ids), self.n_objs)
+        self.n_active = self.n_objs if obj_ids is None else len(obj_ids)
+
+        if self.config.nlc_solver == "batched":
+            self.batched_local_optimisation(obj_ids=obj_ids)
+        elif self.nlc_executor is not None:
+            self.process_local_optimisation(obj_ids=obj_ids)
+        elif self.config.n_threads is None or self.config.n_threads != 1:
+            if obj_ids is None:
+                self.executor.map(self.parallel_local_optimisation, range(self.n_objs), self.tf_arrays)
+            else:
+                self.executor.map(self.parallel_local_optimisation, obj_ids, self.tf_arrays[obj_ids])
+        elif obj_ids is None:
             for obj_id, previous_tf_array in enumerate(self.tf_arrays):
                 self.tf_arrays[obj_id] = self.local_optimisation(obj_id, previous_tf_array)
+        else:
+            for obj_id in obj_ids:
+                self.tf_arrays[obj_id] = self.local_optimisation(obj_id, self.tf_arrays[obj_id])
+
+    def active_normals(self, obj_ids=None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The coordinates, normals and normal offsets of the objects to optimise, all
+        objects if obj_ids is None."""
+        if obj_ids is None:
+            return self.object_coords, self.normals.data, self.normals.offsets
+        normals = self.normals.take(obj_ids)
+        return self.object_coords[obj_ids], normals.data, normals.offsets
 
     def parallel_local_optimisation(self,obj_id, previous_tf_array):
         """workaround for setting the tf_arrays in parallel"""
         self.tf_arrays[obj_id] = self.local_optimisation(obj_id, previous_tf_array)
 
+    def process_local_optimisation(self, max_scale=None, obj_ids=None):
+        """Optimise the objects (all by default) in the worker processes of the nlc executor."""
+        max_scale = max_scale or self.curr_max_scale
+        res_tf_arrays = self.nlc_executor.compute_optimal_transforms(
+            *self.active_normals(obj_ids), self.nlc_kwargs(max_scale)
+        )
+        for obj_id, res_tf_array in zip(range(self.n_objs) if obj_ids is None else obj_ids, res_tf_arrays, strict=True):
+            self.tf_arrays[obj_id] = nlc.update_transform_array(self.tf_arrays[obj_id], res_tf_array, max_scale)
+        self.update_pbar(3, len(res_tf_arrays))
+
+    def batched_local_optimisation(self, max_scale=None, obj_ids=None):
+        """Optimise the objects (all by default) in a single call of the batched solver."""
+        max_scale = max_scale or self.curr_max_scale
+        res_tf_arrays = compute_optimal_transforms_batched(
+            *self.active_normals(obj_ids), **self.nlc_kwargs(max_scale)
+        )
+        for obj_id, res_tf_array in zip(range(self.n_objs) if obj_ids is None else obj_ids, res_tf_arrays, strict=True):
+            self.tf_arrays[obj_id] = nlc.update_transform_array(self.tf_arrays[obj_id], res_tf_array, max_scale)
+        self.update_pbar(3, len(res_tf_arrays))
+
+    def nlc_kwargs(self, max_scale) -> dict:
+        return {
+            "max_scale": max_scale,
+            "scale_bound": (self.config.init_f, None),
+            "max_angle": self.config.max_a,
+            "max_t": self.config.max_t * max_scale if self.config.max_t is not None else None,
+            "padding": self.config.padding,
+        }
+
     def local_optimisation(self, obj_id, previous_tf_array, max_scale=None):
         max_scale = max_scale or self.curr_max_scale
 
-        vertex_fpoint_fnormal_arr = np.array(self.normals[obj_id], dtype=np.float64)
+        # view of the contiguous normals buffer of the cat result, no copy needed
+        vertex_fpoint_fnormal_arr = self.normals[obj_id]
         assert np.shape(vertex_fpoint_fnormal_arr)[1:] == (3,3)
 
         res_tf_array = nlc.compute_optimal_transform(
             obj_coord=self.object_coords[obj_id],
             vertex_fpoint_normal_arr=vertex_fpoint_fnormal_arr,
-            max_scale=max_scale,
-            scale_bound=(self.config.init_f, None),
-            max_angle=self.config.max_a,
-            max_t=self.config.max_t * max_scale if self.config.max_t is not None else None,
-            padding=self.config.padding,
+            **self.nlc_kwargs(max_scale),
         )
 
         new_tf = nlc.update_transform_array(previous_tf_array, res_tf_array, max_scale)
         self.update_pbar(3)
         return new_tf
 
-    def update_pbar(self, i):
-        """Updates the progress bar if it exists"""
-        if i == 1 and self.pbar1 is not None:
-            self.pbar1.update()
-        elif i == 2 and self.pbar2 is not None:
-            self.pbar2.update()
-        elif i == 3 and self.pbar3 is not None:
-            self.pbar3.update()
+    def update_pbar(self, i, n=1):
+        """Updates the progress bar if it exists, in the background writer if there is one."""
+        pbar = (None, self.pbar1, self.pbar2, self.pbar3)[i]
+        if pbar is not None:
+            self.submit(pbar.update, n)
 
 
-    def compute_cat_cells(self, tetmesh: UnstructuredGrid) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    def compute_cat_cells(self, tetmesh: UnstructuredGrid, n_points_per_object=None) -> CatResult:
         self.log.info("Computing CAT cells")
         # COMPUTE CAT CELLS
-        n_points_per_object = [obj.n_points for obj in self.objects] + [self.container.n_points]
+        if n_points_per_object is None:
+            n_points_per_object = [obj.n_points for obj in self.objects] + [self.container.n_points]
         # steiner_points = tetmesh.points[range(tetmesh.n_points - sum(n_points_per_object), tetmesh.n_points)]
         # n_points_per_object[-1] += len(steiner_points)
 
         assert sum(n_points_per_object) == tetmesh.n_points, "Number of points in tetmesh does not match the sum of points in the objects"
 
-        normals, cat_cells, normals_pp = cat.compute_cat_faces(
-                tetmesh, n_points_per_object, self.tf_arrays[:, 4:]
-            )
-        return normals, cat_cells, normals_pp
+        return cat.compute_cat_result(tetmesh, n_points_per_object)
 
 
     def step_should_terminate(self):
@@ -293,8 +514,9 @@ class Optimizer(OptimizerData):
             if are_scaled[i]:
                 count += 1
 
-        self.log.info(f"{count}/{self.n_objs} objects have reached the scaling barrier")
-        self.log.info(f"scales: {[f'{f[0]:.2f}' for f in self.tf_arrays]}")
+        self.log.info("%d/%d objects have reached the scaling barrier", count, self.n_objs)
+        if self.log.isEnabledFor(logging.INFO):
+            self.log.info(f"scales: {[f'{f[0]:.2f}' for f in self.tf_arrays]}")
         if count == self.n_objs:
             return True
         return False
@@ -307,8 +529,17 @@ class Optimizer(OptimizerData):
         i, ib = self.i, self.i_b
         is_correct = False
         failed = False
+        # only the objects of which the scale was reduced are checked again
+        if self.container_sdf is None:
+            self.container_sdf = ContainerSDF(self.container)
+        checker = IncrementalViolationChecker(
+            self.shape, self.container, self.final_cat_meshes(), executor=self.collision_executor,
+            container_sdf=self.container_sdf,
+        )
+        self.violating_ids = set()
         while is_correct is False:
-            violations, violating_ids = self.compute_violations()
+            violations, violating_ids = self.compute_violations(checker)
+            self.violating_ids |= violating_ids | {obj_id for obj_id, _ in violations[0]}
             if not self.config.handle_collisions:
                 violations = []
                 break
@@ -316,7 +547,7 @@ class Optimizer(OptimizerData):
             is_correct = len(violating_ids) == 0
             if len(violating_ids) != 0:
                 failed = True
-                self.log.info("reducing scale for violating objects: " + str(violating_ids))
+                self.log.info("reducing scale for violating objects: %s", violating_ids)
                 for id in violating_ids:
                     self.reduce_scale(id, scale=0.93)
 
@@ -324,10 +555,25 @@ class Optimizer(OptimizerData):
             self.fails_per_step[ib] += 1
         self.update_data(ib, i, violations)
 
-    def compute_violations(self):
-        p_meshes = self.current_meshes()
-        cat_meshes = self.final_cat_meshes()
-        cat_viols, con_viols, collisions = compute_and_add_all_collisions(p_meshes, cat_meshes, self.container, set_contacts=False)
+    def compute_violations(self, checker: IncrementalViolationChecker = None):
+        if checker is not None:
+            cat_viols, con_viols, collisions = checker.check(self.tf_arrays)
+            n_culled, n_pairs = checker.n_culled, self.n_objs * (self.n_objs - 1) // 2
+            self.log.info("%d narrow phase collision tests", checker.n_tested)
+        else:
+            p_meshes = self.current_meshes()
+            cat_meshes = self.final_cat_meshes()
+            pairs, n_culled = broad_phase_pairs(p_meshes)
+            n_pairs = n_culled + len(pairs)
+            if self.collision_executor is not None:
+                cat_viols, con_viols, collisions = self.collision_executor.compute_all_collisions(
+                    p_meshes, cat_meshes, self.container, pairs=pairs
+                )
+            else:
+                cat_viols, con_viols, collisions = compute_and_add_all_collisions(
+                    p_meshes, cat_meshes, self.container, set_contacts=False, pairs=pairs
+                )
+        self.log.info("broad phase culled %d/%d object pairs", n_culled, n_pairs)
         log_violations(self.log, self.idx+1, (cat_viols, con_viols, collisions))
         violating_ids = set()
         for ((obj_ida, obj_idb), _) in collisions:
@@ -347,7 +593,7 @@ class Optimizer(OptimizerData):
 
     def check_closed_cells(self):
         cat_cells = [
-            PolyData(*convert_faces_to_polydata_input(self.cat_cells[obj_id]))
+            cat_cell_mesh(self.cat_cells, obj_id)
             for obj_id in range(self.n_objs)
         ]
         non_manifold_cells = []
@@ -12,11 +12,13 @@ from irregular_object_packing.mesh.collision import (
     compute_and_add_all_collisions,
     compute_cat_violations,
 )
-from irregular_object_packing.mesh.sampling import (
-    resample_pyvista_mesh,
-)
-from irregular_object_packing.mesh.utils import convert_faces_to_polydata_input
+from irregular_object_packing.mesh.lod_cache import lod_cache
+from irregular_object_packing.mesh.transform import TransformedMeshBatch
+from irregular_object_packing.mesh.utils import cat_cell_mesh
+from irregular_object_packing.packing.background_writer import BackgroundWriter
+from irregular_object_packing.packing.history import IterationHistory
 from irregular_object_packing.packing.nlc_optimisation import construct_transform_matrix
+from irregular_object_packing.packing.run_archive import RunArchive, RunArchiveWriter
 
 STATE_DIRECTORY = "../dump/state/"
 
@@ -48,11 +50,48 @@ class SimConfig:
     beta: float = 0.1
     n_threads: int = None
     """Whether to use sequential scaling."""
+    executor: str = "thread"
+    """The backend for the per object optimisation when n_threads != 1, "thread" or "process".
+    The "process" backend also runs the collision tests in a process pool."""
+    nlc_solver: str = "slsqp"
+    """The solver of the NLC optimisation, "slsqp" per object or "batched" for all objects at once."""
     container_volume: float = 10.0
     """The volume of the container."""
     new_cat: bool = False,
 
     handle_collisions: bool = True
+    incremental_cdt: bool = False
+    """Whether to reuse the tetmesh of the previous iteration and only re-mesh around moved objects."""
+    cdt_move_tol: float = 0.0
+    """The displacement below which the tetrahedrons of an object are reused as is."""
+    cdt_blocks: tuple = (1, 1, 1)
+    """The number of blocks along each axis in which the CDT is computed in parallel processes."""
+    initializer: str = "sequential"
+    """The placement of the initial coordinates, "sequential" or "batched" rejection sampling,
+    or "lattice" for high coverage rates."""
+    lod_cache_dir: str = None
+    """The directory in which the resampled meshes are cached across runs, None to only cache them in memory."""
+    history_cat_ring: int = None
+    """The number of most recent iterations of which the CAT data is kept in memory, None to keep all.
+    The CAT data of the last iteration of every scale step is always kept."""
+    history_dir: str = None
+    """The directory to which the CAT data of older iterations is evicted, None to drop it."""
+    run_archive_dir: str = None
+    """The directory to which every iteration is appended as a `RunArchive`, None to not archive the run."""
+    checkpoint_dir: str = None
+    """The directory in which snapshots of the optimizer are written, None to disable checkpointing."""
+    checkpoint_every: int = None
+    """The number of iterations between snapshots."""
+    checkpoint_interval: float = None
+    """The number of seconds between snapshots."""
+    active_set: bool = False
+    """Whether to skip the optimisation of objects at the scale barrier of which no neighbour moved,
+    see `ActiveSetScheduler`."""
+    active_set_tol: float = 1e-3
+    """The largest change of a transform parameter below which an object does not count as moved."""
+    writer_queue_size: int = 64
+    """The number of calls that the background writer of the archive and progress bars can queue,
+    0 to run them on the optimisation thread."""
 
 
 @dataclass
@@ -72,6 +111,8 @@ class IterationData:
     cat_violations: list = field(default_factory=list)
     container_violations: list = field(default_factory=list)
     collisions: list = field(default_factory=list)
+    n_active: int = 0
+    """The number of objects that were optimised in the iteration."""
 
     @property
     def table_str(self):
@@ -120,8 +161,9 @@ class OptimizerData:
     fails_per_step: ndarray
     errors_per_step: ndarray
     description: str
-    _data = {}
-    _index = -1
+    history: IterationHistory | RunArchive
+    archive: RunArchiveWriter
+    writer: BackgroundWriter
 
     def __init__(self):
         self.normals = []
@@ -130,10 +172,25 @@ class OptimizerData:
         self.i_b = 0
         self.i = 0
         self.seed=None
+        self.history = IterationHistory()
+        self.archive = None
+        self.n_archived = 0
+        self.writer = None
         return
 
     def __getitem__(self, key):
-        return self._data[key]
+        normals, cat_cells = self.history.get_cat(key)
+        return {
+            "tf_arrays": self._tf_arrays(key),
+            "normals": normals,
+            "cat_cells": cat_cells,
+            "iterationData": self._iteration_data(key),
+        }
+
+    @property
+    def _index(self) -> int:
+        """The index of the next iteration that is added."""
+        return len(self.history) - 1
 
     def check_setup(self):
         assert self.shape0 is not None, "setup not correct: shape0 is None"
@@ -142,23 +199,27 @@ class OptimizerData:
 
 
     def add(self, tf_arrays: ndarray, normals: list, cat_cells: list, iteration_data: IterationData):
-        self._data[self._index] = {
-            "tf_arrays": tf_arrays.copy(),
-            "normals": normals.copy(),
-            "cat_cells": cat_cells.copy(),
-            "iterationData": iteration_data,
-        }
-        # self._data[ref] = self._data[self._index]
-        self._index += 1
+        self.history.add(tf_arrays, normals.copy(), cat_cells.copy(), iteration_data)
+        if self.archive is not None:
+            # the stored row of the history is never modified, unlike tf_arrays
+            self.submit(self.archive.append, self.history.get_tf_arrays(self.idx), cat_cells, iteration_data)
+            self.n_archived += 1
+
+    def submit(self, fn, *args):
+        """Call fn in the background writer if there is one, else right away."""
+        if self.writer is None:
+            fn(*args)
+        else:
+            self.writer.submit(fn, *args)
 
     def _tf_arrays(self, index: int):
-        return self._data[index]["tf_arrays"]
+        return self.history.get_tf_arrays(index)
 
     def _cat_cells(self, index: int) -> list:
-        return self._data[index]["cat_cells"]
+        return self.history.get_cat(index)[1]
 
     def _iteration_data(self, index: int) -> IterationData:
-        return self._data[index]["iterationData"]
+        return self.history.get_iteration_data(index)
 
     def _get_mesh(self, index: int, obj_id: int, mesh: PolyData) -> PolyData:
         tf_array = self._tf_arrays(index)[obj_id]
@@ -211,9 +272,7 @@ class OptimizerData:
     def cat_mesh(self, iteration: int, obj_id: int) -> PolyData:
         """Get the mesh of the cat cell that corresponds to the object from the given
         iteration."""
-        return PolyData(
-            *convert_faces_to_polydata_input(self._cat_cells(iteration)[obj_id])
-        )
+        return cat_cell_mesh(self._cat_cells(iteration), obj_id)
 
     def status(self, iteration: int) -> IterationData:
         """Get the data of the given iteration."""
@@ -236,7 +295,7 @@ class OptimizerData:
         """Resample the given mesh with the sample rate of the given iteration."""
         status = self.status(iteration)
         try:
-            return resample_pyvista_mesh(mesh=self.shape0, target_faces=status.sample_rate)
+            return lod_cache(self.config.lod_cache_dir).resample(self.shape0, status.sample_rate)
         except ValueError:
             return self.shape0
 
@@ -258,7 +317,7 @@ class OptimizerData:
         if self._cat_cells(iteration) is None:
             raise ValueError("No cat data stored yet for iteration " + str(iteration))
         return [
-            PolyData(*convert_faces_to_polydata_input(self._cat_cells(iteration)[obj_id]))
+            cat_cell_mesh(self._cat_cells(iteration), obj_id)
             for obj_id in range(len(self._tf_arrays(iteration)))
         ]
 
@@ -281,15 +340,16 @@ class OptimizerData:
 
         return mesh_before, mesh_after, cat_mesh
 
-    def current_meshes(self, shape: PolyData = None):
-        """Construct mesh objects from the latest self.tf_arrays ."""
+    def current_meshes(self, shape: PolyData = None) -> TransformedMeshBatch:
+        """Construct mesh objects from the latest self.tf_arrays, the PolyData of an
+        object is only created when it is accessed."""
         if shape is None:
             shape = self.shape
 
-        return [shape.transform(
-                construct_transform_matrix(tf_array[0], tf_array[1:4], tf_array[4:7]), inplace=False,
-                )
-                for tf_array in self.tf_arrays]
+        return TransformedMeshBatch(shape, [
+            construct_transform_matrix(tf_array[0], tf_array[1:4], tf_array[4:7])
+            for tf_array in self.tf_arrays
+        ])
 
     def final_meshes_before(self):
         """Get the meshes of all objects at the final iteration, before the
@@ -305,7 +365,7 @@ class OptimizerData:
         if self._index <= 0:
             ValueError("No cat data stored yet")
         return [
-            PolyData(*convert_faces_to_polydata_input(self.cat_cells[obj_id]))
+            cat_cell_mesh(self.cat_cells, obj_id)
             for obj_id in range(self.n_objs)
         ]
 
@@ -373,4 +433,16 @@ class OptimizerData:
 
         return state
 
-
+    @staticmethod
+    def load_run_archive(directory: str) -> 'OptimizerData':
+        """Open a run archive, the iterations are only read from disk when accessed."""
+        archive = RunArchive(directory)
+        data = OptimizerData()
+        data.history = archive
+        data.config = archive.config()
+        data.description = archive.description
+        data.shape0 = data.shape = archive.shape0()
+        data.container0 = data.container = archive.container0()
+        data.tf_arrays = np.array(archive.tf_arrays[-1])
+        data.cat_cells = archive.get_cat(data.idx)[1]
+        return data
@@ -0,0 +1,45 @@
+"""The process pools and shared memory blocks of the process executors.
+
+`ProcessNLCExecutor` and `ProcessCollisionExecutor` both run in the optimizer after the
+parallel numba code of the batched nlc solver, so their pools use the same start method.
+Forking a process that runs numba threads can hang it on exit, so the workers are
+started by a forkserver. The large inputs are passed through shared memory blocks that
+the workers attach to by name.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+MP_START_METHOD = "forkserver"
+"""The start method of the worker processes of all process executors."""
+
+# shared memory blocks attached by a worker process, by name
+_attached: dict[str, shared_memory.SharedMemory] = {}
+
+
+def process_pool(n_workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=n_workers, mp_context=get_context(MP_START_METHOD))
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attach to the shared memory block, detaching from the previous blocks."""
+    if name not in _attached:
+        for shm in _attached.values():
+            shm.close()
+        _attached.clear()
+        _attached[name] = shared_memory.SharedMemory(name=name)
+    return _attached[name]
+
+
+def ensure_shared_memory(shm: shared_memory.SharedMemory, size: int) -> shared_memory.SharedMemory:
+    """A block of at least `size` bytes, the given block if it is large enough. A new
+    block is twice as large as needed, so that it is rarely replaced."""
+    if shm is not None and shm.size >= size:
+        return shm
+    release_shared_memory(shm)
+    return shared_memory.SharedMemory(create=True, size=max(2 * size, 1))
+
+
+def release_shared_memory(shm: shared_memory.SharedMemory):
+    if shm is not None:
+        shm.close()
+        shm.unlink()
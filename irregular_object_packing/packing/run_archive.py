@@ -0,0 +1,235 @@
+"""On-disk archive of a packing run that is read lazily through memory maps.
+
+Replaying a run with `OptimizerData` (`meshes_before`, `cat_meshes`, `recreate_scene`,
+`generate_gif`, ...) otherwise needs the whole history in memory. The archive is a
+directory of flat binary files to which every iteration is appended:
+
+    meta.json           the number of objects and the description of the run
+    config.pickle       the `SimConfig` of the run
+    shape0.vtp          the original shape
+    container0.vtp      the original container
+    tf_arrays.bin       float64 (n_iters, N, 7) transforms
+    iterations.bin      `ITERATION_DTYPE` (n_iters,) scalar fields of the iteration data
+    violations.pickle   the pickled violation lists, located by the iteration rows
+    face_offsets.bin    int64 the offsets of the CAT faces of every cell, located by the iteration rows
+    faces.bin           float64 (n_faces, 4, 3) the padded CAT faces of all iterations
+    face_sizes.bin      int64 (n_faces,) the number of vertices of every CAT face
+
+`RunArchive` maps the files and only reads the iterations that are accessed. It
+implements the same accessors as `IterationHistory`, so it can be used as the history
+of an `OptimizerData`, see `load_run_archive`.
+"""
+import json
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pyvista as pv
+
+from irregular_object_packing.cat.cat_data import CatCells, CsrArray
+
+ITERATION_DTYPE = np.dtype([
+    ("i", np.int64),
+    ("i_b", np.int64),
+    ("f_start", np.float64),
+    ("f_target", np.float64),
+    ("n_succes_scale", np.int64),
+    ("sample_rate", np.int64),
+    ("n_active", np.int64),
+    ("has_cat", np.bool_),
+    ("face_start", np.int64),
+    ("offsets_start", np.int64),
+    ("n_cells", np.int64),
+    ("violations_start", np.int64),
+    ("violations_size", np.int64),
+])
+
+
+class RunArchiveWriter:
+    """Appends the iterations of a run to an archive directory."""
+
+    def __init__(self, directory: str, shape0: pv.PolyData, container0: pv.PolyData, config, description=""):
+        self.directory = Path(directory)
+        if (self.directory / "meta.json").exists():
+            raise FileExistsError(f"{self.directory} already contains a run archive")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        shape0.save(self.directory / "shape0.vtp")
+        container0.save(self.directory / "container0.vtp")
+        with open(self.directory / "config.pickle", "wb") as f:
+            pickle.dump(config, f)
+        self.n_objs = None
+        self.description = description
+        self.n_faces = 0
+        self.n_offsets = 0
+        self.n_violation_bytes = 0
+
+    @classmethod
+    def reopen(cls, directory: str, n_iterations: int) -> "RunArchiveWriter":
+        """Append to an existing archive, of which only the first `n_iterations` are
+        kept, e.g. the iterations before the checkpoint from which a run is resumed."""
+        writer = cls.__new__(cls)
+        writer.directory = Path(directory)
+        with open(writer.directory / "meta.json") as f:
+            meta = json.load(f)
+        writer.n_objs = meta["n_objs"]
+        writer.description = meta["description"]
+
+        iterations = np.fromfile(writer.directory / "iterations.bin", dtype=ITERATION_DTYPE)
+        if not 0 < n_iterations <= len(iterations):
+            raise ValueError(f"cannot keep {n_iterations} iterations, the archive has {len(iterations)}")
+        iterations = iterations[:n_iterations]
+        writer.n_violation_bytes = int(iterations["violations_start"][-1] + iterations["violations_size"][-1])
+        writer.n_faces, writer.n_offsets = 0, 0
+        cat_rows = iterations[iterations["has_cat"]]
+        if len(cat_rows) > 0:
+            last = cat_rows[-1]
+            writer.n_offsets = int(last["offsets_start"] + last["n_cells"] + 1)
+            end_offset = np.fromfile(
+                writer.directory / "face_offsets.bin", dtype=np.int64, count=1, offset=(writer.n_offsets - 1) * 8
+            )
+            writer.n_faces = int(last["face_start"] + end_offset[0])
+
+        writer._truncate("iterations.bin", n_iterations * ITERATION_DTYPE.itemsize)
+        writer._truncate("tf_arrays.bin", n_iterations * writer.n_objs * 7 * 8)
+        writer._truncate("violations.pickle", writer.n_violation_bytes)
+        writer._truncate("face_offsets.bin", writer.n_offsets * 8)
+        writer._truncate("faces.bin", writer.n_faces * 4 * 3 * 8)
+        writer._truncate("face_sizes.bin", writer.n_faces * 8)
+        return writer
+
+    def _truncate(self, name: str, size: int):
+        with open(self.directory / name, "ab") as f:
+            f.truncate(size)
+
+    def _append(self, name: str, data: bytes):
+        with open(self.directory / name, "ab") as f:
+            f.write(data)
+
+    def append(self, tf_arrays: np.ndarray, cat_cells, iteration_data):
+        """Append an iteration, the CAT cells are only stored if they are a `CatCells`."""
+        if self.n_objs is None:
+            self.n_objs = len(tf_arrays)
+            with open(self.directory / "meta.json", "w") as f:
+                json.dump({"n_objs": self.n_objs, "description": self.description}, f)
+        elif len(tf_arrays) != self.n_objs:
+            raise ValueError(f"expected {self.n_objs} objects, got {len(tf_arrays)}")
+
+        row = np.zeros(1, dtype=ITERATION_DTYPE)
+        for name in ("i", "i_b", "f_start", "f_target", "n_succes_scale", "sample_rate", "n_active"):
+            row[name] = getattr(iteration_data, name)
+
+        violations = pickle.dumps(
+            (iteration_data.cat_violations, iteration_data.container_violations, iteration_data.collisions),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        row["violations_start"] = self.n_violation_bytes
+        row["violations_size"] = len(violations)
+        self._append("violations.pickle", violations)
+        self.n_violation_bytes += len(violations)
+
+        if isinstance(cat_cells, CatCells):
+            start, end = cat_cells.faces.offsets[0], cat_cells.faces.offsets[-1]
+            faces = np.ascontiguousarray(cat_cells.faces.data[start:end], dtype=np.float64)
+            face_sizes = np.ascontiguousarray(cat_cells.face_sizes.data[start:end], dtype=np.int64)
+            offsets = np.asarray(cat_cells.faces.offsets, dtype=np.int64) - start
+            self._append("faces.bin", faces.tobytes())
+            self._append("face_sizes.bin", face_sizes.tobytes())
+            self._append("face_offsets.bin", offsets.tobytes())
+            row["has_cat"] = True
+            row["face_start"] = self.n_faces
+            row["offsets_start"] = self.n_offsets
+            row["n_cells"] = len(cat_cells)
+            self.n_faces += len(faces)
+            self.n_offsets += len(offsets)
+
+        self._append("tf_arrays.bin", np.ascontiguousarray(tf_arrays, dtype=np.float64).tobytes())
+        # the iteration row is written last, so readers never see a partial iteration
+        self._append("iterations.bin", row.tobytes())
+
+
+class RunArchive:
+    """Lazy read access to a run archive. Iterations are indexed as in `OptimizerData`,
+    starting at -1 for the state after setup. Call `refresh` to see the iterations that
+    were appended after opening."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        with open(self.directory / "meta.json") as f:
+            meta = json.load(f)
+        self.n_objs = meta["n_objs"]
+        self.description = meta["description"]
+        self.refresh()
+
+    def _map(self, name: str, dtype, shape: tuple, n_rows: int = None) -> np.ndarray:
+        path = self.directory / name
+        row_size = int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+        if n_rows is None:
+            n_rows = path.stat().st_size // row_size if path.exists() else 0
+        if n_rows == 0:
+            return np.empty((0, *shape), dtype=dtype)
+        # copy on write, numba does not accept read-only arrays
+        return np.memmap(path, dtype=dtype, mode="c", shape=(n_rows, *shape))
+
+    def refresh(self):
+        """Map the files again, including the iterations that were appended since."""
+        self.iterations = self._map("iterations.bin", ITERATION_DTYPE, ())
+        n_iters = len(self.iterations)
+        self.tf_arrays = self._map("tf_arrays.bin", np.float64, (self.n_objs, 7), n_iters)
+        self.face_offsets = self._map("face_offsets.bin", np.int64, ())
+        self.faces = self._map("faces.bin", np.float64, (4, 3))
+        self.face_sizes = self._map("face_sizes.bin", np.int64, ())
+
+    def __len__(self) -> int:
+        return len(self.iterations)
+
+    def _row(self, index: int) -> int:
+        row = index + 1
+        if not 0 <= row < len(self):
+            raise IndexError(f"iteration {index} is not stored, the archive has {len(self)} entries")
+        return row
+
+    def config(self):
+        with open(self.directory / "config.pickle", "rb") as f:
+            return pickle.load(f)
+
+    def shape0(self) -> pv.PolyData:
+        return pv.read(self.directory / "shape0.vtp")
+
+    def container0(self) -> pv.PolyData:
+        return pv.read(self.directory / "container0.vtp")
+
+    def get_tf_arrays(self, index: int) -> np.ndarray:
+        return self.tf_arrays[self._row(index)]
+
+    def get_iteration_data(self, index: int):
+        from irregular_object_packing.packing.optimizer_data import IterationData
+
+        row = self.iterations[self._row(index)]
+        with open(self.directory / "violations.pickle", "rb") as f:
+            f.seek(row["violations_start"])
+            violations = pickle.loads(f.read(row["violations_size"]))
+        return IterationData(
+            int(row["i"]),
+            int(row["i_b"]),
+            float(row["f_start"]),
+            float(row["f_target"]),
+            int(row["n_succes_scale"]),
+            int(row["sample_rate"]),
+            *violations,
+            n_active=int(row["n_active"]),
+        )
+
+    def has_cat(self, index: int) -> bool:
+        return bool(self.iterations[self._row(index)]["has_cat"])
+
+    def get_cat(self, index: int) -> tuple:
+        """The normals, which are not archived, and the cat cells backed by the maps."""
+        row = self._row(index)
+        if not self.iterations[row]["has_cat"]:
+            return None, None
+        row = self.iterations[row]
+        offsets = self.face_offsets[row["offsets_start"]:row["offsets_start"] + row["n_cells"] + 1]
+        start = row["face_start"]
+        faces = self.faces[start:start + offsets[-1]]
+        face_sizes = self.face_sizes[start:start + offsets[-1]]
+        return None, CatCells(CsrArray(faces, offsets), CsrArray(face_sizes, offsets))
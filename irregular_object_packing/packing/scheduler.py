@@ -0,0 +1,84 @@
+"""Active set scheduling of the per object optimisation.
+
+Every iteration optimises all objects, also the ones that already reached the scale
+barrier of the current step and whose surroundings did not change. For those the
+optimisation can only move them within a CAT cell that is the same as in the previous
+iteration, so `ActiveSetScheduler` freezes them. An object stays frozen until one of
+its neighbours in the tetmesh moved since the previous schedule, also a neighbour at
+the barrier, it violates a constraint or the barrier is raised. A neighbour that moves into the cell of a frozen object is caught by the
+violation checks, which reduce the scale of the frozen object and so activate it.
+The active objects are ordered by their scale, smallest first, because they have the
+most room to grow.
+"""
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix
+
+from irregular_object_packing.cat.utils import get_tetmesh_cell_arrays, point_object_ids
+
+
+def object_adjacency(tetmesh, n_points_per_object, n_objs: int) -> csr_matrix:
+    """The (n_objs, n_objs) adjacency of the objects that share a tetrahedron, the
+    container and any other ids >= n_objs are left out."""
+    cells_objs = point_object_ids(n_points_per_object)[get_tetmesh_cell_arrays(tetmesh)]
+    a = np.concatenate([cells_objs[:, i] for i in range(4) for j in range(4) if i != j])
+    b = np.concatenate([cells_objs[:, j] for i in range(4) for j in range(4) if i != j])
+    mask = (a != b) & (a < n_objs) & (b < n_objs)
+    adjacency = coo_matrix((np.ones(np.count_nonzero(mask), dtype=bool), (a[mask], b[mask])), shape=(n_objs, n_objs))
+    return adjacency.tocsr()
+
+
+class ActiveSetScheduler:
+    """Selects the objects to optimise in an iteration."""
+
+    def __init__(self, n_objs: int, move_tol=1e-3):
+        """
+        Args:
+            n_objs: the number of objects.
+            move_tol: the largest change of any transform parameter of an object since
+                the previous iteration below which it does not count as moved.
+        """
+        self.move_tol = move_tol
+        self.frozen = np.zeros(n_objs, dtype=bool)
+        self.adjacency = csr_matrix((n_objs, n_objs), dtype=bool)
+        self.previous_tf_arrays: np.ndarray = None
+        self.active_sizes = []
+        """The number of active objects of every scheduled iteration."""
+
+    def set_neighbours(self, tetmesh, n_points_per_object):
+        self.adjacency = object_adjacency(tetmesh, n_points_per_object, len(self.frozen))
+
+    def state_arrays(self) -> dict[str, np.ndarray]:
+        """The state of the scheduler for a snapshot, the adjacency is recomputed in
+        every iteration. The arrays are replaced and never modified by `schedule`."""
+        arrays = {"scheduler_frozen": self.frozen}
+        if self.previous_tf_arrays is not None:
+            arrays["scheduler_previous_tf_arrays"] = self.previous_tf_arrays
+        return arrays
+
+    def restore_state(self, snapshot: dict[str, np.ndarray]):
+        self.frozen = snapshot["scheduler_frozen"]
+        self.previous_tf_arrays = snapshot.get("scheduler_previous_tf_arrays")
+
+    def schedule(self, tf_arrays: np.ndarray, max_scale: float, violating_ids=()) -> np.ndarray:
+        """The ids of the objects to optimise, ordered by scale.
+
+        Args:
+            tf_arrays: (n_objs, 7) the current transforms.
+            max_scale: the scale barrier of the current step.
+            violating_ids: the objects that violated a constraint in the previous iteration.
+        """
+        if self.previous_tf_arrays is None:
+            moved = np.ones(len(tf_arrays), dtype=bool)
+        else:
+            moved = np.abs(tf_arrays - self.previous_tf_arrays).max(axis=1) > self.move_tol
+
+        can_freeze = tf_arrays[:, 0] >= max_scale
+        can_freeze[list(violating_ids)] = False
+        neighbour_moved = (self.adjacency @ moved.astype(np.int64)) > 0
+        self.frozen = can_freeze & ~neighbour_moved
+
+        self.previous_tf_arrays = tf_arrays.copy()
+        active = np.flatnonzero(~self.frozen)
+        active = active[np.argsort(tf_arrays[active, 0], kind="stable")]
+        self.active_sizes.append(len(active))
+        return active
@@ -9,11 +9,11 @@ def print_transform_array(array):
 
 def log_violations(logger,idx, violations):
     if len(violations[0]) > 0:
-        logger.warning(f"[i:{idx}]! cat violation found {violations[0]}")
+        logger.warning("[i:%d]! cat violation found %s", idx, violations[0])
     if len(violations[1]) > 0:
-        logger.warning(f"[i:{idx}]! container violation found {violations[1]}")
+        logger.warning("[i:%d]! container violation found %s", idx, violations[1])
     if len(violations[2]) > 0:
-        logger.warning(f"[i:{idx}]! collisions found {violations[2]}")
+        logger.warning("[i:%d]! collisions found %s", idx, violations[2])
 
         # Check the quality if the cat cells
 def check_cat_cells_quality(logger, all_normals):
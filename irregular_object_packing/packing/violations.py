@@ -0,0 +1,108 @@
+"""Incremental checking of the violations of the objects of an iteration.
+
+After the NLC optimisation, `Optimizer.process_iteration` checks the objects for
+collisions with each other, their CAT cell and the container, and reduces the scale of
+the violating objects until there are none. Only the reduced objects have to be tested
+again, the `IncrementalViolationChecker` caches the results of the other objects and
+pairs. The results are identical to a full recompute with `compute_and_add_all_collisions`.
+"""
+import numpy as np
+from pyvista import PolyData
+
+from irregular_object_packing.mesh.collision import (
+    compute_collisions,
+    meshes_inside_container,
+    sweep_and_prune,
+)
+from irregular_object_packing.mesh.sdf import ContainerSDF
+from irregular_object_packing.mesh.transform import TransformedMeshBatch
+from irregular_object_packing.packing.collision_executor import ProcessCollisionExecutor
+from irregular_object_packing.packing.nlc_optimisation import construct_transform_matrix
+
+
+class IncrementalViolationChecker:
+    """Caches the meshes and the violations per object and per pair of objects, and only
+    re-tests the objects of which the transform array changed since the last check. The
+    tests are run in the worker processes of the executor, if one is given. With the
+    signed distance field of the container, objects that are certainly inside the
+    container are not tested against it."""
+
+    def __init__(
+        self, shape: PolyData, container: PolyData, cat_meshes: list[PolyData],
+        executor: ProcessCollisionExecutor = None, container_sdf: ContainerSDF = None,
+    ):
+        self.shape = shape
+        self.container = container
+        self.container_sdf = container_sdf
+        self.cat_meshes = list(cat_meshes)
+        self.compute_collisions = executor.compute_collisions if executor is not None else compute_collisions
+
+        n_objs = len(cat_meshes)
+        self.tf_arrays = np.full((n_objs, 7), np.nan)
+        self.meshes: list[PolyData] = [None] * n_objs
+        self.lower = np.empty((n_objs, 3))
+        self.upper = np.empty((n_objs, 3))
+        self.cat_viols: list[int] = [None] * n_objs
+        self.con_viols: list[int] = [None] * n_objs
+        self.collisions: dict[tuple[int, int], int] = {}
+        self.n_culled = 0
+        self.n_tested = 0
+        """The number of narrow phase tests in the last check."""
+
+    def update_meshes(self, tf_arrays: np.ndarray) -> np.ndarray:
+        """Transform the shape for the objects of which the transform array changed.
+
+        Returns:
+            np.ndarray: the ids of the changed objects.
+        """
+        changed = np.flatnonzero(np.any(tf_arrays != self.tf_arrays, axis=1))
+        batch = TransformedMeshBatch(self.shape, [
+            construct_transform_matrix(tf_array[0], tf_array[1:4], tf_array[4:7])
+            for tf_array in tf_arrays[changed]
+        ])
+        for obj_id, mesh in zip(changed, batch, strict=True):
+            self.meshes[obj_id] = mesh
+        self.lower[changed], self.upper[changed] = batch.bounds()
+        self.tf_arrays[changed] = tf_arrays[changed]
+        return changed
+
+    def check(self, tf_arrays: np.ndarray) -> tuple[list, list, list]:
+        """The cat violations, container violations and collisions of the objects, in
+        the format of `compute_and_add_all_collisions`."""
+        n_objs = len(tf_arrays)
+        changed = self.update_meshes(tf_arrays)
+        is_changed = np.zeros(n_objs, dtype=bool)
+        is_changed[changed] = True
+        pairs = sweep_and_prune(self.lower, self.upper)
+        self.n_culled = n_objs * (n_objs - 1) // 2 - len(pairs)
+        retest = np.array([
+            is_changed[a] or is_changed[b] or (a, b) not in self.collisions for a, b in pairs.tolist()
+        ], dtype=bool)
+        con_tested = changed
+        if self.container_sdf is not None:
+            con_tested = changed[~meshes_inside_container([self.meshes[i] for i in changed], self.container_sdf)]
+
+        # the tests index into the objects, followed by the cat cells and the container
+        tests = np.concatenate([
+            np.column_stack((changed, changed + n_objs)),
+            np.column_stack((con_tested, np.full(len(con_tested), 2 * n_objs))),
+            pairs[retest],
+        ]).astype(np.int64)
+        n_contacts = self.compute_collisions(self.meshes + self.cat_meshes + [self.container], tests)
+        self.n_tested = len(tests)
+
+        n_cat_tests, n_obj_tests = len(changed), len(changed) + len(con_tested)
+        for obj_id, n_cat in zip(changed, n_contacts[:n_cat_tests], strict=True):
+            self.cat_viols[obj_id], self.con_viols[obj_id] = n_cat, None
+        for obj_id, n_con in zip(con_tested, n_contacts[n_cat_tests:n_obj_tests], strict=True):
+            self.con_viols[obj_id] = n_con
+        for pair, n in zip(pairs[retest].tolist(), n_contacts[n_obj_tests:], strict=True):
+            self.collisions[tuple(pair)] = n
+        # pairs that are culled now can not collide anymore
+        self.collisions = {pair: self.collisions[pair] for pair in map(tuple, pairs.tolist())}
+
+        return (
+            [[i, n] for i, n in enumerate(self.cat_viols) if n is not None],
+            [[i, n] for i, n in enumerate(self.con_viols) if n is not None],
+            [[pair, n] for pair, n in self.collisions.items() if n is not None],
+        )
@@ -0,0 +1,179 @@
+"""Benchmarks of the CAT computation steps against their previous implementations.
+
+Run from the root of the repository:
+```python3 irregular_object_packing/performance_analysis/benchmark_cat.py --n-cells 1000000```
+"""
+from concurrent.futures import ProcessPoolExecutor
+from timeit import repeat
+
+import click
+import numpy as np
+import pandas as pd
+import pyvista as pv
+from pyvista import UnstructuredGrid
+
+from irregular_object_packing.cat.chordal_axis_transform import (
+    assemble_cdt_input,
+    compute_cat_result,
+    compute_cdt,
+)
+from irregular_object_packing.cat.incremental_cdt import IncrementalCDT
+from irregular_object_packing.cat.parallel_cdt import compute_cdt_parallel
+from irregular_object_packing.cat.utils import get_cell_arrays, get_tetmesh_cell_arrays
+from irregular_object_packing.mesh.utils import convert_faces_to_polydata_input
+
+
+def get_cell_arrays_hsplit(cells: np.ndarray) -> np.ndarray:
+    """The previous implementation of `get_cell_arrays`, which creates an array per cell."""
+    return np.array(np.hsplit(cells, cells.size / 5)).reshape(-1, 5)[:, 1:]
+
+
+def random_tetmesh(n_cells: int, n_points: int, seed=0):
+    rng = np.random.default_rng(seed)
+    cells = np.empty((n_cells, 5), dtype=np.int64)
+    cells[:, 0] = 4
+    cells[:, 1:] = rng.integers(0, n_points, (n_cells, 4))
+    return UnstructuredGrid(cells.ravel(), np.full(n_cells, 10, dtype=np.uint8), rng.random((n_points, 3)))
+
+
+def time_func(func, *args, number=5, repeats=3) -> float:
+    """The best mean runtime of `number` calls over `repeats` runs in seconds."""
+    return min(repeat(lambda: func(*args), number=number, repeat=repeats)) / number
+
+
+def benchmark_cell_arrays(n_cells_list, n_points=10_000) -> pd.DataFrame:
+    rows = []
+    for n_cells in n_cells_list:
+        tetmesh = random_tetmesh(n_cells, n_points)
+        cells = tetmesh.cells
+        assert np.array_equal(get_cell_arrays_hsplit(cells), get_tetmesh_cell_arrays(tetmesh))
+        rows.append({
+            "n_cells": n_cells,
+            "hsplit": time_func(get_cell_arrays_hsplit, cells),
+            "legacy_view": time_func(get_cell_arrays, cells),
+            "connectivity_view": time_func(get_tetmesh_cell_arrays, tetmesh),
+        })
+    return pd.DataFrame(rows)
+
+
+def sphere_grid_meshes(centers: np.ndarray) -> list[pv.PolyData]:
+    container = pv.Cube(x_length=10, y_length=10, z_length=10).triangulate().subdivide(2)
+    shape = pv.Icosphere(radius=0.4, nsub=1)
+    return [shape.translate(center, inplace=False) for center in centers] + [container]
+
+
+def benchmark_incremental_cdt(n_moved_list, n_per_axis=7, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    axis = np.linspace(-4, 4, n_per_axis)
+    centers = np.array(np.meshgrid(axis, axis, axis)).reshape(3, -1).T
+    cdt = IncrementalCDT()
+    cdt.update(sphere_grid_meshes(centers))
+
+    rows = []
+    for n_moved in n_moved_list:
+        moved = centers.copy()
+        moved[rng.choice(len(centers), n_moved, replace=False)] += rng.normal(0, 0.1, (n_moved, 3))
+        meshes = sphere_grid_meshes(moved)
+        full_time = time_func(compute_cdt, meshes, number=1)
+        start = cdt.points.copy(), cdt.cells.copy()
+
+        def incremental_update(meshes=meshes, start=start):
+            cdt.points, cdt.cells = start
+            cdt.update(meshes)
+
+        rows.append({
+            "n_objects": len(centers),
+            "n_moved": n_moved,
+            "full": full_time,
+            "incremental": time_func(incremental_update, number=1),
+            "n_cavity_cells": cdt.stats["n_cavity_cells"],
+            "fallback": cdt.stats["full"],
+        })
+    return pd.DataFrame(rows)
+
+
+def benchmark_parallel_cdt(n_blocks_list, n_per_axis=7) -> pd.DataFrame:
+    axis = np.linspace(-4, 4, n_per_axis)
+    meshes = sphere_grid_meshes(np.array(np.meshgrid(axis, axis, axis)).reshape(3, -1).T)
+    rows = [{"n_blocks": 1, "time": time_func(compute_cdt, meshes, number=1)}]
+    for n_blocks in n_blocks_list:
+        blocks = (n_blocks, n_blocks, n_blocks)
+        with ProcessPoolExecutor(max_workers=n_blocks**3) as executor:
+            compute_cdt_parallel(meshes, blocks, executor=executor)
+            rows.append({
+                "n_blocks": n_blocks**3,
+                "time": time_func(compute_cdt_parallel, meshes, blocks, 0.25, executor, number=1),
+            })
+    return pd.DataFrame(rows)
+
+
+def merge_meshes(meshes: list[pv.PolyData]) -> pv.PolyData:
+    """The previous assembly of the CDT input, which merges the meshes one by one."""
+    pc = pv.PolyData()
+    for mesh in meshes:
+        pc.merge(mesh, merge_points=False, inplace=True)
+    return pc
+
+
+def benchmark_cdt_input(n_per_axis_list) -> pd.DataFrame:
+    rows = []
+    for n_per_axis in n_per_axis_list:
+        axis = np.linspace(-4, 4, n_per_axis)
+        meshes = sphere_grid_meshes(np.array(np.meshgrid(axis, axis, axis)).reshape(3, -1).T)
+        rows.append({
+            "n_objects": len(meshes) - 1,
+            "merge": time_func(merge_meshes, meshes, number=1),
+            "arrays": time_func(assemble_cdt_input, meshes, number=1),
+        })
+    return pd.DataFrame(rows)
+
+
+def convert_faces_dict(faces: list[np.ndarray]) -> tuple[list, np.ndarray]:
+    """The previous implementation of `convert_faces_to_polydata_input`, which
+    deduplicates the vertices one by one with a dict."""
+    points, poly_faces = {}, []
+    for face in faces:
+        poly_faces.append(len(face))
+        for vertex in map(tuple, face):
+            poly_faces.append(points.setdefault(vertex, len(points)))
+    return list(points), np.array(poly_faces, dtype=np.int32)
+
+
+def benchmark_cat_meshes(n_per_axis_list) -> pd.DataFrame:
+    rows = []
+    for n_per_axis in n_per_axis_list:
+        axis = np.linspace(-4, 4, n_per_axis)
+        meshes = sphere_grid_meshes(np.array(np.meshgrid(axis, axis, axis)).reshape(3, -1).T)
+        cat_cells = compute_cat_result(compute_cdt(meshes), [mesh.n_points for mesh in meshes]).cat_cells
+        cells = list(cat_cells)
+        for cell, faces, sizes in zip(cells, cat_cells.faces, cat_cells.face_sizes, strict=True):
+            points, poly_faces = convert_faces_dict(cell)
+            res_points, res_poly_faces = convert_faces_to_polydata_input(faces, sizes)
+            assert np.array_equal(points, res_points) and np.array_equal(poly_faces, res_poly_faces)
+        rows.append({
+            "n_objects": len(meshes) - 1,
+            "dict": time_func(lambda cells: [convert_faces_dict(cell) for cell in cells], cells, number=1),
+            "vectorized": time_func(lambda cells: [convert_faces_to_polydata_input(cell) for cell in cells], cells, number=1),
+            "padded": time_func(lambda cat_cells: [
+                convert_faces_to_polydata_input(faces, sizes)
+                for faces, sizes in zip(cat_cells.faces, cat_cells.face_sizes, strict=True)
+            ], cat_cells, number=1),
+        })
+    return pd.DataFrame(rows)
+
+
+@click.command()
+@click.option("--n-cells", "n_cells", multiple=True, type=int, default=[1_000, 10_000, 100_000], help="Number of tetrahedrons")
+@click.option("--n-moved", "n_moved", multiple=True, type=int, default=[1, 4, 16, 64], help="Number of moved objects for the incremental CDT")
+@click.option("--blocks", "n_blocks", multiple=True, type=int, default=[2, 3], help="Number of blocks per axis for the parallel CDT")
+@click.option("--n-per-axis", "n_per_axis", multiple=True, type=int, default=[4, 6, 8], help="Number of objects per axis for the CDT input assembly")
+def run(n_cells, n_moved, n_blocks, n_per_axis):
+    print(benchmark_cell_arrays(n_cells).to_string(index=False))
+    print(benchmark_incremental_cdt(n_moved).to_string(index=False))
+    print(benchmark_parallel_cdt(n_blocks).to_string(index=False))
+    print(benchmark_cdt_input(n_per_axis).to_string(index=False))
+    print(benchmark_cat_meshes(n_per_axis).to_string(index=False))
+
+
+if __name__ == "__main__":
+    run()
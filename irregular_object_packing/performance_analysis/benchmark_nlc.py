@@ -0,0 +1,132 @@
+"""Benchmarks of the NLC optimisation:
+    - the analytic constraint jacobian against the finite difference jacobian of SLSQP.
+    - the batched solver against SLSQP per object, on scenarios of `default_optimizer_config`.
+
+Run from the root of the repository:
+```python3 irregular_object_packing/performance_analysis/benchmark_nlc.py --nsub 1 --nsub 2 --nsub 3```
+```python3 irregular_object_packing/performance_analysis/benchmark_nlc.py --batched -N 8 -N 20```
+"""
+from time import time
+
+import click
+import numpy as np
+import pandas as pd
+import pyvista as pv
+from scipy.optimize import Bounds, minimize
+
+from irregular_object_packing.cat.chordal_axis_transform import (
+    compute_cat_result,
+    compute_cdt,
+)
+from irregular_object_packing.packing import nlc_optimisation as nlc
+from irregular_object_packing.packing.nlc_batched import (
+    compute_optimal_transforms_batched,
+)
+from irregular_object_packing.packing.optimizer import default_optimizer_config
+
+
+def compute_optimal_transform_fd(obj_coord, vertex_fpoint_normal_arr, padding, max_scale, scale_bound, max_angle, max_t, x0_angles=None):
+    """The previous `compute_optimal_transform`, in which SLSQP finite differences the
+    constraints and the objective."""
+    max_angle = max_angle * 0.9
+    max_t = max_t if max_t is not None else np.inf
+    min_f = scale_bound[0]
+    max_f = scale_bound[1] if scale_bound[1] is not None else np.inf
+    x0 = np.array([min_f, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+    x0[1:4] = x0_angles
+    bounds = Bounds(
+        np.array([min_f, -max_angle, -max_angle, -max_angle, -max_t, -max_t, -max_t]),
+        np.array([max_f, max_angle, max_angle, max_angle, max_t, max_t, max_t]),
+        keep_feasible=True,
+    )
+    constraint_dict = {
+        "type": "ineq",
+        "fun": nlc.local_constraint_vertices,
+        "args": (vertex_fpoint_normal_arr, obj_coord, padding),
+    }
+    return minimize(nlc.objective, x0, method="SLSQP", bounds=bounds, constraints=constraint_dict).x
+
+
+def sphere_cat_normals(nsub: int):
+    """The coordinates and CAT normals of 8 spheres in a cube."""
+    grid = np.array([-2.0, 2.0])
+    obj_coords = np.array([(x, y, z) for x in grid for y in grid for z in grid])
+    shape = pv.Icosphere(radius=0.5, nsub=nsub)
+    container = pv.Cube(x_length=8, y_length=8, z_length=8).triangulate().subdivide(2)
+    meshes = [shape.translate(coord, inplace=False) for coord in obj_coords] + [container]
+    cat_result = compute_cat_result(compute_cdt(meshes), [mesh.n_points for mesh in meshes])
+    return obj_coords, [cat_result.obj_normals(i) for i in range(len(obj_coords))]
+
+
+def benchmark_jacobian(nsub_list, seed=0) -> pd.DataFrame:
+    kwargs = {"padding": 0.0, "max_scale": 1.0, "scale_bound": (0.1, None), "max_angle": 1 / 12 * np.pi, "max_t": None}
+    rows = []
+    for nsub in nsub_list:
+        obj_coords, normals = sphere_cat_normals(nsub)
+        x0_angles = np.random.default_rng(seed).uniform(-0.2, 0.2, (len(obj_coords), 3))
+        row = {"nsub": nsub, "n_constraints": int(np.mean([len(n) for n in normals]))}
+        for name, func in (("finite_difference", compute_optimal_transform_fd), ("analytic", nlc.compute_optimal_transform)):
+            # compile the numba functions
+            func(obj_coords[0], normals[0], x0_angles=x0_angles[0], **kwargs)
+            start = time()
+            scales = [func(c, n, x0_angles=x0, **kwargs)[0] for c, n, x0 in zip(obj_coords, normals, x0_angles)]
+            row[name] = (time() - start) / len(obj_coords)
+            row[f"{name}_scale"] = np.mean(scales)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def optimizer_cat_normals(n_objects: int, i_b: int, seed=1):
+    """The optimizer of a `default_optimizer_config` scenario at scale step i_b, and
+    the CAT normals of its initial placement."""
+    optimizer = default_optimizer_config(N=n_objects, mesh_dir="data/mesh/", seed=seed)
+    optimizer.setup()
+    optimizer.i_b = i_b
+    optimizer.resample_meshes()
+    optimizer.objects = optimizer.current_meshes()
+    cat_result = optimizer.compute_cat_cells(compute_cdt(optimizer.objects + [optimizer.container]))
+    return optimizer, cat_result
+
+
+def benchmark_batched(n_objects_list, i_b_list) -> pd.DataFrame:
+    rows = []
+    for n_objects in n_objects_list:
+        for i_b in i_b_list:
+            optimizer, cat_result = optimizer_cat_normals(n_objects, i_b)
+            kwargs = optimizer.nlc_kwargs(optimizer.curr_max_scale)
+            row = {"n_objects": optimizer.n_objs, "i_b": i_b, "n_constraints": len(cat_result.normals) // optimizer.n_objs}
+
+            # compile the numba functions
+            compute_optimal_transforms_batched(optimizer.object_coords, cat_result.normals, cat_result.obj_offsets, **kwargs)
+            start = time()
+            res_tf_arrays = compute_optimal_transforms_batched(
+                optimizer.object_coords, cat_result.normals, cat_result.obj_offsets, **kwargs
+            )
+            row["batched"] = optimizer.n_objs / (time() - start)
+            row["batched_scale"] = np.mean(res_tf_arrays[:, 0])
+
+            start = time()
+            scales = [
+                nlc.compute_optimal_transform(coord, cat_result.obj_normals(obj_id), **kwargs)[0]
+                for obj_id, coord in enumerate(optimizer.object_coords)
+            ]
+            row["slsqp"] = optimizer.n_objs / (time() - start)
+            row["slsqp_scale"] = np.mean(scales)
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+@click.command()
+@click.option("--nsub", "nsub", multiple=True, type=int, default=[1, 2, 3], help="Subdivisions of the icosphere objects")
+@click.option("--batched", is_flag=True, help="Compare the batched solver with SLSQP, in objects per second")
+@click.option("-N", "n_objects", multiple=True, type=int, default=[8, 20], help="Number of objects of the batched scenarios")
+@click.option("--i_b", "i_b", multiple=True, type=int, default=[1, 4, 7], help="Scale steps of the batched scenarios")
+def run(nsub, batched, n_objects, i_b):
+    if batched:
+        print(benchmark_batched(n_objects, i_b).to_string(index=False))
+    else:
+        print(benchmark_jacobian(nsub).to_string(index=False))
+
+
+if __name__ == "__main__":
+    run()
@@ -9,6 +9,7 @@ import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
+from irregular_object_packing.packing.nlc_executor import ProcessNLCExecutor
 from irregular_object_packing.packing.optimizer import default_optimizer_config
 
 # Define the parameters
@@ -17,6 +18,7 @@ n_objects_list = [8, 16, 32, 64, 128, 256]
 stage_list = [0, 8]
 stage_list.reverse()
 n_threads_list = [1, 2, 4, 8, 16, 32, 64, 128]
+executor_list = ["thread", "process"]
 iterations = 20
 NO_NUMBA = bool(os.getenv("NUMBA_DISABLE_JIT")) or False
 
@@ -36,7 +38,7 @@ def prepare_optimizer(n_objects, seed, data_dir):
 @click.option('--input-dir', default='data/mesh/', help='Input file')
 def run(output_dir, input_dir):
     output_file = output_dir + f'collect_nlc_perf_data_numba{NO_NUMBA}.csv'
-    df = pd.DataFrame(columns=['iteration', 'n_objects', 'stage', 'n_threads', 'runtime', 'numba'])
+    df = pd.DataFrame(columns=['iteration', 'n_objects', 'stage', 'n_threads', 'executor', 'runtime', 'numba'])
     df.to_csv(output_file, index=False)
 
     seeds = generate_seeds(iterations)
@@ -50,14 +52,23 @@ def run(output_dir, input_dir):
                     optimizer.resample_meshes()
                     optimizer.executor = PoolExecutor(max_workers=16)
                     optimizer.perform_optimisation_iteration()
-                    optimizer.tf_arrays = optimizer._tf_arrays(-1)
+                    optimizer.tf_arrays = optimizer._tf_arrays(-1).copy()
                     success = True
                 except Exception as e:
                     print(e)
 
-            for n_threads in tqdm(n_threads_list, total=len(n_threads_list), position=2):
+            for executor, n_threads in tqdm(product(executor_list, n_threads_list), total=len(executor_list)*len(n_threads_list), position=2):
+                if executor == "process" and n_threads == 1:
+                    continue
                 optimizer.config.n_threads = n_threads
-                optimizer.executor = PoolExecutor(max_workers=n_threads, initializer=lambda: np.sqrt(2))
+                optimizer.config.executor = executor
+                if executor == "process":
+                    # persistent workers, the first call starts them
+                    optimizer.nlc_executor = ProcessNLCExecutor(n_workers=n_threads)
+                    optimizer.optimize_positions()
+                    optimizer.tf_arrays = optimizer._tf_arrays(-1).copy()
+                else:
+                    optimizer.executor = PoolExecutor(max_workers=n_threads, initializer=lambda: np.sqrt(2))
                 sleep(0.1)
 
                 runtime = time()
@@ -65,9 +76,13 @@ def run(output_dir, input_dir):
                 optimizer.optimize_positions()
                 runtime = time() - runtime
 
+                if optimizer.nlc_executor is not None:
+                    optimizer.nlc_executor.shutdown()
+                    optimizer.nlc_executor = None
+
                 # reset state
-                optimizer.tf_arrays = optimizer._tf_arrays(-1)
-                data = {'iteration':iteration, 'n_objects':n_objects, 'stage':stage, 'n_threads':n_threads, 'runtime':runtime, 'numba':NO_NUMBA}
+                optimizer.tf_arrays = optimizer._tf_arrays(-1).copy()
+                data = {'iteration':iteration, 'n_objects':n_objects, 'stage':stage, 'n_threads':n_threads, 'executor':executor, 'runtime':runtime, 'numba':NO_NUMBA}
                 df = pd.DataFrame([data])
                 df.to_csv(output_file, index=False, mode='a', header=False)
 
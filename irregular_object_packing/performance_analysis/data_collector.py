@@ -191,6 +191,7 @@ class DataCollector:
             max_t=shape_volume**(1 / 3) * 2,
             n_threads=params["n_threads"],
             itn_max=300,
+            lod_cache_dir=path.join(CONFIG["data_dir"], "lod_cache"),
         )
         optimizer = Optimizer(shape, container, config, "performance_tests")
         return optimizer
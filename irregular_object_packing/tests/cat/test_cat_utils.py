@@ -5,12 +5,16 @@ from parameterized import parameterized
 from pyvista import UnstructuredGrid
 
 from irregular_object_packing.cat.utils import (
+    OCCURRENCE_CASES,
+    SINGLE_OBJECT_CASE,
     compute_face_unit_normal,
     create_face_normal,
     get_cell_arrays,
     get_tetmesh_cell_arrays,
     n_related_objects,
+    point_object_ids,
     sort_by_occurrance,
+    sort_cells_by_occurrance,
 )
 
 
@@ -92,6 +96,21 @@ class TestSortByOccurrence(unittest.TestCase):
         self.assertRaises(ValueError, sort_by_occurrance, point_ids, object_ids)
 
 
+class TestSortCellsByOccurrence(unittest.TestCase):
+    def test_same_as_single_cell(self):
+        cells = np.array([[1, 2, 3, 4], [1, 2, 3, 4], [1, 2, 3, 4], [5, 2, 1, 3], [1, 2, 3, 4], [4, 3, 2, 1]])
+        objs = np.array([[6, 6, 6, 1], [1, 1, 2, 2], [1, 2, 2, 3], [2, 1, 2, 4], [1, 1, 1, 1], [1, 2, 3, 4]])
+        s_cells, s_objs, case_codes = sort_cells_by_occurrance(cells, objs)
+        for i in range(len(cells)):
+            expected_points, expected_objs, expected_case = sort_by_occurrance(list(cells[i]), list(objs[i]))
+            self.assertListEqual(s_cells[i].tolist(), expected_points)
+            self.assertListEqual(s_objs[i].tolist(), expected_objs)
+            if expected_case == (4,):
+                self.assertEqual(case_codes[i], SINGLE_OBJECT_CASE)
+            else:
+                self.assertEqual(OCCURRENCE_CASES[case_codes[i]], expected_case)
+
+
 class TestComputeFaceUnitNormal(unittest.TestCase):
     @parameterized.expand([
         # 3 points, with point on the positive z-axis
@@ -198,6 +217,18 @@ class TestMeshFunctions(unittest.TestCase):
         grid = UnstructuredGrid(cells, np.array([10, 10]), np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1], [1, 1, 1], [1, 1, 0], [0, 1, 1], [1, 0, 1]], dtype=np.float64))
         result = get_tetmesh_cell_arrays(grid)
         self.assertTrue(np.array_equal(result, np.array([[0, 1, 2, 3], [4, 5, 6, 7]])))
+        self.assertTrue(np.shares_memory(result, grid.cell_connectivity))
+
+    def test_get_cell_arrays_is_view(self):
+        cells = np.array([4, 1, 2, 3, 4, 4, 5, 6, 7, 8])
+        result = get_cell_arrays(cells)
+        self.assertTrue(np.shares_memory(result, cells))
+        self.assertRaises(ValueError, get_cell_arrays, np.array([4, 1, 2, 3]))
+
+    def test_get_tetmesh_cell_arrays_not_tetrahedrons(self):
+        cells = np.array([3, 0, 1, 2])
+        grid = UnstructuredGrid(cells, np.array([5]), np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=np.float64))
+        self.assertRaises(ValueError, get_tetmesh_cell_arrays, grid)
 
 
 class nRelatedObjects(unittest.TestCase):
@@ -244,6 +275,13 @@ class nRelatedObjects(unittest.TestCase):
         cell = np.array([5, 3, 2, 10])
         result = n_related_objects(objects_npoints, cell)
         self.assertEqual(result.tolist(), [2, 2, 1, 4])
+    def test_same_as_point_object_ids(self):
+        objects_npoints = np.array([1, 2, 3, 4, 5, 6, 7, 8])
+        cells = np.array([[5, 3, 2, 10], [0, 1, 35, 20]])
+        lookup = point_object_ids(objects_npoints)
+        self.assertEqual(len(lookup), objects_npoints.sum())
+        for cell in cells:
+            self.assertEqual(lookup[cell].tolist(), n_related_objects(objects_npoints, cell).tolist())
 
 if __name__ == '__main__':
     unittest.main()
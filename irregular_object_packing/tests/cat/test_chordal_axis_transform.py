@@ -1,9 +1,16 @@
 import unittest
 
 import numpy as np
+import pyvista as pv
 
+from irregular_object_packing.cat.cat_data import CatResult
 from irregular_object_packing.cat.chordal_axis_transform import (
+    assemble_cdt_input,
+    cat_arrays_to_lists,
+    compute_cat_arrays,
+    filter_relevant_cell_ids,
     filter_relevant_cells,
+    process_cells_to_normals,
     split_and_process,
 )
 from irregular_object_packing.cat.tetra_cell import TetraCell
@@ -13,7 +20,8 @@ from irregular_object_packing.cat.tetrahedral_split import (
     split_3,
     split_4,
 )
-from irregular_object_packing.cat.utils import n_related_objects
+from irregular_object_packing.cat.utils import OCCURRENCE_CASES, n_related_objects
+from irregular_object_packing.mesh.transform import TransformedMeshBatch
 from irregular_object_packing.tests.helpers import float_array
 from irregular_object_packing.tests.test_tetrahedral_splits import (
     SPLIT_2_2222_OUTPUT,
@@ -114,6 +122,22 @@ class FilterRelevantCells(unittest.TestCase):
 
         self.assertTrue(relevant[0], expected_cell)
         self.assertTrue(len(skipped), 1)
+    def test_same_as_filter_relevant_cell_ids(self):
+        rng = np.random.default_rng(2)
+        objects_npoints = [3, 5, 2, 6]
+        cells = np.array([rng.choice(sum(objects_npoints), 4, replace=False) for _ in range(200)])
+        relevant, _ = filter_relevant_cells(cells, objects_npoints)
+        rel_ids, s_cells, s_objs, case_codes = filter_relevant_cell_ids(cells, objects_npoints)
+
+        self.assertListEqual(rel_ids.tolist(), [cell.id for cell in relevant])
+        self.assertListEqual(s_cells.tolist(), [list(cell.points) for cell in relevant])
+        self.assertListEqual(s_objs.tolist(), [list(cell.objs) for cell in relevant])
+        self.assertListEqual([OCCURRENCE_CASES[c] for c in case_codes], [cell.case for cell in relevant])
+
+    def test_filter_relevant_cell_ids_empty(self):
+        rel_ids, s_cells, s_objs, case_codes = filter_relevant_cell_ids(np.empty((0, 4)), [4])
+        self.assertEqual(len(rel_ids), 0)
+        self.assertEqual(s_cells.shape, (0, 4))
 
 class SplitCell(unittest.TestCase):
     def test_1111(self):
@@ -152,3 +176,118 @@ class SplitCell(unittest.TestCase):
             cell.case = case
             with self.assertRaises(ValueError):
                 cell.split(reorder_split_input(cell.points))
+
+
+class ComputeCatArrays(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.objects_npoints = [6, 7, 5, 8, 9]
+        n_points = sum(self.objects_npoints)
+        self.points = rng.random((n_points, 3))
+        self.cells = np.array([rng.choice(n_points, 4, replace=False) for _ in range(500)])
+
+    def test_same_as_per_cell_processing(self):
+        rel_cells, _ = filter_relevant_cells(self.cells, self.objects_npoints)
+        expected = process_cells_to_normals(self.points, rel_cells, len(self.objects_npoints))
+
+        cat_arrays = compute_cat_arrays(self.points, self.cells, self.objects_npoints)
+        result = cat_arrays_to_lists(cat_arrays, len(self.objects_npoints), len(self.points))
+
+        for res_lists, exp_lists in zip(result, expected, strict=True):
+            self.assertEqual(len(res_lists), len(exp_lists))
+            for res_list, exp_list in zip(res_lists, exp_lists, strict=True):
+                self.assertEqual(len(res_list), len(exp_list))
+                for res, exp in zip(res_list, exp_list, strict=True):
+                    np.testing.assert_allclose(res, float_array(exp), atol=1e-12)
+
+    def test_single_object_cells(self):
+        cells = np.array([[0, 1, 2, 3], [1, 2, 3, 4]])
+        cat_arrays = compute_cat_arrays(self.points, cells, self.objects_npoints)
+        self.assertEqual(cat_arrays.n_normals, 0)
+        self.assertEqual(cat_arrays.n_faces, 0)
+
+    def test_empty(self):
+        cat_arrays = compute_cat_arrays(self.points, np.empty((0, 4), dtype=np.int64), self.objects_npoints)
+        normals, cat_cells, normals_pp = cat_arrays_to_lists(cat_arrays, len(self.objects_npoints), len(self.points))
+        self.assertEqual(normals, [[]] * len(self.objects_npoints))
+        self.assertEqual(cat_cells, [[]] * len(self.objects_npoints))
+        self.assertEqual(len(normals_pp), len(self.points))
+
+
+class CatResultFromArrays(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.objects_npoints = [6, 7, 5, 8, 9]
+        n_points = sum(self.objects_npoints)
+        self.points = rng.random((n_points, 3))
+        self.cells = np.array([rng.choice(n_points, 4, replace=False) for _ in range(500)])
+        cat_arrays = compute_cat_arrays(self.points, self.cells, self.objects_npoints)
+        self.expected = cat_arrays_to_lists(cat_arrays, len(self.objects_npoints), n_points)
+        self.result = CatResult.from_arrays(cat_arrays, self.objects_npoints)
+
+    def assert_same_rows(self, result, expected):
+        self.assertEqual(len(result), len(expected))
+        if len(expected) == 0:
+            return
+        sort_rows = lambda a: a[np.lexsort(np.reshape(a, (len(a), -1)).T)]  # noqa: E731
+        np.testing.assert_array_equal(sort_rows(np.asarray(result)), sort_rows(np.array(expected)))
+
+    def test_normals_per_obj(self):
+        normals = self.result.normals_per_obj
+        self.assertEqual(len(normals), len(self.objects_npoints))
+        for obj_id, expected in enumerate(self.expected[0]):
+            self.assert_same_rows(normals[obj_id], expected)
+            self.assertTrue(np.shares_memory(normals[obj_id], self.result.normals) or len(expected) == 0)
+
+    def test_normals_per_point(self):
+        normals_pp = self.result.normals_per_point
+        self.assertEqual(len(normals_pp), len(self.points))
+        for p_id, expected in enumerate(self.expected[2]):
+            self.assert_same_rows(normals_pp[p_id], expected)
+
+    def test_cat_cells(self):
+        cat_cells = self.result.cat_cells
+        for obj_id, expected in enumerate(self.expected[1]):
+            self.assertEqual(len(cat_cells[obj_id]), len(expected))
+            for face, expected_face in zip(cat_cells[obj_id], expected, strict=True):
+                np.testing.assert_array_equal(face, expected_face)
+
+    def test_read_only(self):
+        with self.assertRaises(ValueError):
+            self.result.obj_normals(0)[0] = 0.0
+
+
+class AssembleCdtInput(unittest.TestCase):
+    def setUp(self):
+        self.shape = pv.Icosphere(radius=0.5, nsub=1)
+        transforms = np.tile(np.eye(4), (3, 1, 1))
+        transforms[:, :3, 3] = [[-2, 0, 0], [0, 0, 0], [2, 0, 0]]
+        self.objects = TransformedMeshBatch(self.shape, transforms)
+        self.container = pv.Cube(x_length=8, y_length=8, z_length=8).triangulate()
+
+    def test_same_as_merge(self):
+        merged = pv.PolyData()
+        for mesh in list(self.objects) + [self.container]:
+            merged.merge(mesh, merge_points=False, inplace=True)
+
+        cdt_input = assemble_cdt_input([self.objects, self.container])
+        np.testing.assert_array_equal(cdt_input.points, merged.points)
+        np.testing.assert_array_equal(cdt_input.faces, merged.faces.reshape(-1, 4)[:, 1:])
+        self.assertEqual(cdt_input.points.dtype, np.float64)
+
+    def test_point_offsets(self):
+        cdt_input = assemble_cdt_input([self.objects, self.container])
+        n = self.shape.n_points
+        np.testing.assert_array_equal(cdt_input.point_offsets, [0, n, 2 * n, 3 * n, 3 * n + 8])
+        np.testing.assert_array_equal(cdt_input.n_points_per_object, [n, n, n, 8])
+        # the meshes of the batch are not created
+        self.assertTrue(all(mesh is None for mesh in self.objects._meshes))
+
+    def test_batch_same_as_meshes(self):
+        res = assemble_cdt_input([self.objects, self.container])
+        expected = assemble_cdt_input(list(self.objects) + [self.container])
+        np.testing.assert_array_equal(res.points, expected.points)
+        np.testing.assert_array_equal(res.faces, expected.faces)
+
+    def test_non_triangular_mesh(self):
+        self.assertRaises(RuntimeError, assemble_cdt_input, [pv.Cube()])
@@ -0,0 +1,97 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pyvista as pv
+
+from irregular_object_packing.cat import incremental_cdt
+from irregular_object_packing.cat.incremental_cdt import (
+    TETRA_FACES,
+    IncrementalCDT,
+    face_keys,
+    signed_volumes,
+)
+from irregular_object_packing.cat.utils import get_tetmesh_cell_arrays
+
+
+def create_meshes(centers):
+    container = pv.Cube(x_length=10, y_length=10, z_length=10).triangulate().subdivide(1)
+    shape = pv.Icosphere(radius=0.5, nsub=1)
+    return [shape.translate(center, inplace=False) for center in centers] + [container]
+
+
+class TestIncrementalCDT(unittest.TestCase):
+    def setUp(self):
+        grid = np.arange(-3, 4, 3.0)
+        self.centers = np.array([(x, y, z) for x in grid for y in grid for z in grid])
+        self.cdt = IncrementalCDT()
+        self.cdt.update(create_meshes(self.centers))
+
+    def assert_valid_tetmesh(self, tetmesh, meshes):
+        cells = get_tetmesh_cell_arrays(tetmesh)
+        volumes = signed_volumes(np.asarray(tetmesh.points), cells)
+        self.assertTrue(np.all(volumes > 0) or np.all(volumes < 0))
+        self.assertAlmostEqual(np.abs(volumes).sum(), 1000.0)
+        self.assertEqual(tetmesh.n_points, sum(mesh.n_points for mesh in meshes))
+
+        # the surfaces of the objects are faces of the tetmesh
+        tet_faces = face_keys(cells[:, TETRA_FACES].reshape(-1, 3), tetmesh.n_points)
+        offset = 0
+        for mesh in meshes[:-1]:
+            surface = mesh.faces.reshape(-1, 4)[:, 1:] + offset
+            self.assertTrue(np.all(np.isin(face_keys(surface, tetmesh.n_points), tet_faces)))
+            offset += mesh.n_points
+
+    def test_first_update_is_full(self):
+        self.assertTrue(self.cdt.stats["full"])
+
+    def test_move_one_object(self):
+        self.centers[4] += [0.3, -0.2, 0.1]
+        meshes = create_meshes(self.centers)
+        tetmesh = self.cdt.update(meshes)
+
+        self.assertFalse(self.cdt.stats["full"])
+        self.assertEqual(self.cdt.stats["n_moved"], 1)
+        self.assertLess(self.cdt.stats["n_cavity_cells"], tetmesh.n_cells)
+        self.assert_valid_tetmesh(tetmesh, meshes)
+
+    def test_move_below_tolerance(self):
+        self.cdt.move_tol = 0.1
+        self.centers[4] += [0.01, 0, 0]
+        meshes = create_meshes(self.centers)
+        with patch.object(incremental_cdt.tetgen, "TetGen") as tetgen_mock:
+            tetmesh = self.cdt.update(meshes)
+        tetgen_mock.assert_not_called()
+
+        self.assertEqual(self.cdt.stats["n_moved"], 0)
+        self.assert_valid_tetmesh(tetmesh, meshes)
+        np.testing.assert_array_equal(tetmesh.points[:10], meshes[0].points[:10])
+
+    def test_unchanged_reuses_tetmesh(self):
+        cells = self.cdt.cells
+        with patch.object(incremental_cdt.tetgen, "TetGen") as tetgen_mock:
+            self.cdt.update(create_meshes(self.centers))
+        tetgen_mock.assert_not_called()
+        np.testing.assert_array_equal(self.cdt.cells, cells)
+
+    def test_topology_change_is_full(self):
+        self.cdt.update(create_meshes(self.centers), topology_changed=True)
+        self.assertTrue(self.cdt.stats["full"])
+
+    def test_reset(self):
+        self.cdt.reset()
+        self.cdt.update(create_meshes(self.centers))
+        self.assertTrue(self.cdt.stats["full"])
+
+    def test_failed_cavity_falls_back(self):
+        self.centers[4] += [0.3, 0, 0]
+        meshes = create_meshes(self.centers)
+        with patch.object(IncrementalCDT, "_remesh_cavity", side_effect=RuntimeError):
+            tetmesh = self.cdt.update(meshes)
+
+        self.assertTrue(self.cdt.stats["full"])
+        self.assert_valid_tetmesh(tetmesh, meshes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+import pyvista as pv
+
+from irregular_object_packing.cat import parallel_cdt
+from irregular_object_packing.cat.chordal_axis_transform import compute_cdt
+from irregular_object_packing.cat.parallel_cdt import (
+    block_bounds,
+    circumspheres,
+    compute_cdt_parallel,
+    merge_block_cells,
+    unique_rows,
+)
+from irregular_object_packing.cat.utils import get_tetmesh_cell_arrays
+
+
+def sorted_cells(tetmesh):
+    cells = np.sort(get_tetmesh_cell_arrays(tetmesh), axis=1)
+    return cells[np.lexsort(cells.T[::-1])]
+
+
+class TestParallelCDT(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        grid = np.arange(-3, 4, 2.0)
+        centers = np.array([(x, y, z) for x in grid for y in grid for z in grid]) + rng.normal(0, 0.05, (64, 3))
+        container = pv.Cube(x_length=10, y_length=10, z_length=10).triangulate().subdivide(1)
+        shape = pv.Icosphere(radius=0.5, nsub=1)
+        self.meshes = [shape.translate(center, inplace=False) for center in centers] + [container]
+        self.executor = ThreadPoolExecutor(max_workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_equal_to_serial(self):
+        expected = sorted_cells(compute_cdt(self.meshes))
+        with patch.object(parallel_cdt, "compute_cdt", side_effect=AssertionError("fallback")):
+            tetmesh = compute_cdt_parallel(self.meshes, (2, 2, 2), executor=self.executor)
+
+        np.testing.assert_array_equal(sorted_cells(tetmesh), expected)
+        np.testing.assert_array_equal(tetmesh.points, np.concatenate([mesh.points for mesh in self.meshes]))
+        self.assertAlmostEqual(tetmesh.volume, 1000.0)
+
+    def test_single_block_is_serial(self):
+        with patch.object(parallel_cdt, "compute_cdt") as compute_cdt_mock:
+            compute_cdt_parallel(self.meshes, (1, 1, 1), executor=self.executor)
+        compute_cdt_mock.assert_called_once()
+
+    def test_failed_merge_falls_back(self):
+        with patch.object(parallel_cdt, "merge_block_cells", side_effect=RuntimeError):
+            tetmesh = compute_cdt_parallel(self.meshes, (2, 2, 2), executor=self.executor)
+        np.testing.assert_array_equal(sorted_cells(tetmesh), sorted_cells(compute_cdt(self.meshes)))
+
+
+class TestParallelCDTUtils(unittest.TestCase):
+    def test_block_bounds(self):
+        points = np.array([[0, 0, 0], [2, 4, 6]], dtype=float)
+        bounds = block_bounds(points, (2, 1, 3), 0.5)
+        self.assertEqual(len(bounds), 6)
+        core_min, core_max, ext_min, ext_max = bounds[0]
+        np.testing.assert_array_almost_equal(core_min, [0, 0, 0])
+        np.testing.assert_array_almost_equal(core_max, [1, 4, 2])
+        np.testing.assert_array_almost_equal(ext_min, [-0.5, -2, -1])
+        np.testing.assert_array_almost_equal(ext_max, [1.5, 6, 3])
+
+    def test_circumspheres(self):
+        points = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1], [-1, 0, 0], [0, 0, -1]], dtype=float) + 2
+        centers, radii = circumspheres(points, np.array([[0, 1, 2, 3], [0, 1, 3, 4]]))
+        np.testing.assert_array_almost_equal(centers, [[2, 2, 2], [2, 2, 2]])
+        np.testing.assert_array_almost_equal(radii, [1, 1])
+
+    def test_unique_rows(self):
+        rows = np.array([[3, 1, 2], [0, 1, 2], [2, 3, 1], [1, 0, 2], [4, 5, 6]])
+        first, counts = unique_rows(rows)
+        self.assertListEqual(sorted(zip(first.tolist(), counts.tolist())), [(0, 2), (1, 2), (4, 1)])
+
+    def test_merge_overlapping_cells(self):
+        points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1], [0.2, 0.2, 0.2]], dtype=float)
+        cells = np.array([[0, 1, 2, 3], [0, 1, 2, 4]])
+        self.assertRaises(RuntimeError, merge_block_cells, points, [cells])
+
+    def test_merge_duplicate_cells(self):
+        points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=float)
+        cells = merge_block_cells(points, [np.array([[0, 1, 2, 3]]), np.array([[3, 2, 1, 0]])])
+        self.assertEqual(len(cells), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
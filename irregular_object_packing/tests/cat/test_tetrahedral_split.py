@@ -4,10 +4,16 @@ import numpy as np
 
 from irregular_object_packing.cat.tetrahedral_split import (
     split_2_2222,
+    split_2_2222_batch,
     split_2_3331,
+    split_2_3331_batch,
     split_3,
+    split_3_batch,
     split_4,
+    split_4_batch,
+    split_template_layout,
 )
+from irregular_object_packing.cat.utils import create_face_normal
 from irregular_object_packing.tests.helpers import float_array
 from irregular_object_packing.tests.test_tetrahedral_splits import (
     SPLIT_2_2222_OUTPUT,
@@ -53,5 +59,31 @@ class ComputeFaces(unittest.TestCase):
             self.assertRaises(AssertionError, split_2_2222, invalid_array)
 
 
+class ComputeFacesBatched(unittest.TestCase):
+    def assert_same_faces(self, split_func, case, expected_output):
+        points = float_array([SPLIT_INPUT, SPLIT_INPUT])
+        _, sizes, positions, local_ids = split_template_layout(case)
+        faces = np.empty((2, len(sizes), 4, 3))
+        normals = np.empty((2, len(sizes), 3, 3))
+        split_func(points, faces, normals)
+
+        for cell_faces, cell_normals in zip(faces, normals, strict=True):
+            for face, normal, size, position, j in zip(cell_faces, cell_normals, sizes, positions, local_ids, strict=True):
+                expected_face = float_array(expected_output[position][j])
+                np.testing.assert_array_equal(face[:size], expected_face)
+                np.testing.assert_allclose(normal, create_face_normal(expected_face[:3], float_array(SPLIT_INPUT[position])))
+
+    def test_split_4(self):
+        self.assert_same_faces(split_4_batch, (1, 1, 1, 1), SPLIT_4_OUTPUT)
+
+    def test_split_3(self):
+        self.assert_same_faces(split_3_batch, (2, 1, 1), SPLIT_3_OUTPUT)
+
+    def test_split_2_3331(self):
+        self.assert_same_faces(split_2_3331_batch, (3, 1), SPLIT_2_3331_OUTPUT)
+
+    def test_split_2_2222(self):
+        self.assert_same_faces(split_2_2222_batch, (2, 2), SPLIT_2_2222_OUTPUT)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,13 +1,20 @@
 import unittest
+from itertools import combinations
 
+import numpy as np
 import pyvista as pv
 
 from irregular_object_packing.mesh.collision import (
+    broad_phase_pairs,
     compute_cat_violations,
     compute_collision,
     compute_container_violations,
     compute_object_collisions,
+    max_edge_length,
+    meshes_inside_container,
+    sweep_and_prune,
 )
+from irregular_object_packing.mesh.sdf import ContainerSDF
 
 
 class TestComputeCollision(unittest.TestCase):
@@ -44,6 +51,33 @@ class TestComputeObjectCollisions(unittest.TestCase):
         self.meshes[1].translate([-1, -1, -1], inplace=True)  # Move the second cube so it overlaps with the first
         self.assertEqual(len(compute_object_collisions(self.meshes, False)), 1)
 
+class TestBroadPhase(unittest.TestCase):
+    def test_sweep_and_prune(self):
+        lower = np.array([[0, 0, 0], [3, 0, 0], [0.5, 0.5, 0.5], [0.5, 2, 0], [1, 1, 1]], dtype=float)
+        pairs = sweep_and_prune(lower, lower + 1)
+        np.testing.assert_array_equal(pairs, [[0, 2], [0, 4], [2, 4], [3, 4]])
+
+    def test_touching_boxes_are_candidates(self):
+        lower = np.array([[0, 0, 0], [1, 1, 1]], dtype=float)
+        np.testing.assert_array_equal(sweep_and_prune(lower, lower + 1), [[0, 1]])
+
+    def test_equal_to_brute_force(self):
+        rng = np.random.default_rng(0)
+        lower = rng.uniform(0, 10, (200, 3))
+        upper = lower + rng.uniform(0, 2, (200, 3))
+        expected = [
+            (i, j) for i, j in combinations(range(200), 2)
+            if np.all(lower[j] <= upper[i]) and np.all(lower[i] <= upper[j])
+        ]
+        self.assertListEqual([tuple(pair) for pair in sweep_and_prune(lower, upper, 0.0).tolist()], expected)
+
+    def test_culled_pairs(self):
+        meshes = [pv.Cube(center=(2 * i, 0, 0)) for i in range(4)] + [pv.Cube(center=(0.5, 0, 0))]
+        pairs, n_culled = broad_phase_pairs(meshes)
+        np.testing.assert_array_equal(pairs, [[0, 4]])
+        self.assertEqual(n_culled, 9)
+
+
 class TestComputeContainerViolations(unittest.TestCase):
     # Similar structure to TestComputeCollision, but with a list of PolyData objects and a container
     def setUp(self):
@@ -89,6 +123,27 @@ class TestComputeCatViolations(unittest.TestCase):
         self.meshes[0].scale([1.0001, 1.0001, 1.0001], inplace=True)  # Scale the cat_meshes so they do not collide with the cubes
         self.assertEqual(len(compute_cat_violations(self.meshes, self.cat_meshes, False)), 1)
 
+class TestContainerSDFCulling(unittest.TestCase):
+    def setUp(self):
+        self.container = pv.Cube(x_length=6, y_length=6, z_length=6).triangulate()
+        self.container_sdf = ContainerSDF(self.container)
+        centers = [[0, 0, 0], [2, 2, 2], [-2.5, -2.5, -2.5], [-3, 0, 0], [2.4, 0, 0]]
+        self.meshes = [pv.Cube(center=center).triangulate() for center in centers]
+
+    def test_meshes_inside_container(self):
+        # the longest edge of the triangulated cube is the diagonal of a side
+        np.testing.assert_array_equal(
+            meshes_inside_container(self.meshes, self.container_sdf), [True, False, False, False, False]
+        )
+        self.assertAlmostEqual(max_edge_length(self.meshes[0]), np.sqrt(2))
+        self.assertEqual(max_edge_length(pv.Cube()), np.inf)
+
+    def test_equal_to_unculled(self):
+        expected = compute_container_violations(self.meshes, self.container)
+        self.assertListEqual([obj_id for obj_id, _ in expected], [2, 3])
+        self.assertEqual(compute_container_violations(self.meshes, self.container, container_sdf=self.container_sdf), expected)
+
+
 
 if __name__ == '__main__':
     unittest.main()
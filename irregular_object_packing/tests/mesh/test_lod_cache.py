@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pyvista as pv
+
+from irregular_object_packing.mesh.lod_cache import LodCache, mesh_hash
+from irregular_object_packing.mesh.sampling import (
+    resample_mesh_by_triangle_area,
+    resample_pyvista_mesh,
+)
+
+
+class TestLodCache(unittest.TestCase):
+    def setUp(self):
+        self.mesh = pv.Sphere(theta_resolution=30, phi_resolution=30)
+        self.container = pv.Cube(x_length=10, y_length=10, z_length=10).triangulate()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def assertMeshEqual(self, mesh, expected):
+        np.testing.assert_array_equal(mesh.points, expected.points)
+        self.assertEqual(mesh.points.dtype, expected.points.dtype)
+        np.testing.assert_array_equal(mesh.faces, expected.faces)
+
+    def test_mesh_hash(self):
+        self.assertEqual(mesh_hash(self.mesh), mesh_hash(self.mesh.copy()))
+        self.assertNotEqual(mesh_hash(self.mesh), mesh_hash(self.mesh.points_to_double()))
+        self.assertNotEqual(mesh_hash(self.mesh), mesh_hash(self.mesh.translate((0, 0, 1e-3), inplace=False)))
+
+    def test_memory_cache(self):
+        cache = LodCache()
+        for target_faces in [100, 2000]:
+            expected = resample_pyvista_mesh(self.mesh, target_faces)
+            self.assertMeshEqual(cache.resample(self.mesh, target_faces), expected)
+            self.assertMeshEqual(cache.resample(self.mesh, target_faces), expected)
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_disk_cache(self):
+        shape = self.mesh.scale(5, inplace=False)
+        expected = resample_mesh_by_triangle_area(shape, self.container, factor=4)
+        cache = LodCache(self.tmp_dir.name)
+        self.assertMeshEqual(cache.resample_by_triangle_area(shape, self.container, factor=4), expected)
+
+        new_cache = LodCache(self.tmp_dir.name)
+        self.assertMeshEqual(new_cache.resample_by_triangle_area(shape, self.container, factor=4), expected)
+        self.assertEqual((new_cache.hits, new_cache.misses), (1, 0))
+
+    def test_max_entries(self):
+        cache = LodCache(max_entries=2)
+        for target_faces in [100, 200, 100, 300]:
+            cache.resample(self.mesh, target_faces)
+        self.assertEqual([key[1] for key in cache.meshes], [100, 300])
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_returns_copies(self):
+        cache = LodCache()
+        cache.resample(self.mesh, 100).points[:] = 0.0
+        self.assertMeshEqual(cache.resample(self.mesh, 100), resample_pyvista_mesh(self.mesh, 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+import pyvista as pv
+
+from irregular_object_packing.cat.cat_data import CatCells, CsrArray
+from irregular_object_packing.mesh.utils import (
+    cat_cell_mesh,
+    convert_faces_to_polydata_input,
+)
+
+
+class TestConvertFacesToPolydataInput(unittest.TestCase):
+    def setUp(self):
+        # a quad and two triangles that share vertices
+        self.faces = [
+            np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype=float),
+            np.array([[1, 0, 0], [0, 0, 0], [0, 0, 1]], dtype=float),
+            np.array([[0, 0, 1], [1, 1, 0], [-0.0, 1, 0]], dtype=float),
+        ]
+
+    def test_points_in_order_of_occurrence(self):
+        points, poly_faces = convert_faces_to_polydata_input(self.faces)
+        np.testing.assert_array_equal(points, [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0, 0, 1]])
+        np.testing.assert_array_equal(poly_faces, [4, 0, 1, 2, 3, 3, 1, 0, 4, 3, 4, 2, 3])
+        self.assertEqual(poly_faces.dtype, np.int32)
+
+    def test_padded_faces(self):
+        padded = np.zeros((3, 4, 3))
+        for face, padded_face in zip(self.faces, padded, strict=True):
+            padded_face[:len(face)] = face
+        sizes = np.array([4, 3, 3])
+        expected = convert_faces_to_polydata_input(self.faces)
+        for res, exp in zip(convert_faces_to_polydata_input(padded, sizes), expected, strict=True):
+            np.testing.assert_array_equal(res, exp)
+
+        cat_cells = CatCells(CsrArray(padded, np.array([0, 3])), CsrArray(sizes, np.array([0, 3])))
+        mesh = cat_cell_mesh(cat_cells, 0)
+        self.assertEqual(mesh.n_faces, 3)
+        np.testing.assert_array_equal(mesh.faces, expected[1])
+        np.testing.assert_array_equal(cat_cell_mesh([self.faces], 0).points, mesh.points)
+
+    def test_closed_mesh(self):
+        cube = pv.Cube()
+        faces = list(cube.points[cube.faces.reshape(-1, 5)[:, 1:]])
+        mesh = pv.PolyData(*convert_faces_to_polydata_input(faces))
+        self.assertEqual(mesh.n_points, 8)
+        self.assertTrue(mesh.is_manifold)
+        self.assertAlmostEqual(mesh.volume, 1.0)
+
+    def test_no_faces(self):
+        points, poly_faces = convert_faces_to_polydata_input([])
+        self.assertEqual(points.shape, (0, 3))
+        self.assertEqual(len(poly_faces), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+import numpy as np
+import pyvista as pv
+import trimesh
+
+from irregular_object_packing.mesh.sdf import ContainerSDF
+from irregular_object_packing.mesh.utils import pyvista_to_trimesh
+
+
+class TestContainerSDF(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.sphere = pv.Sphere(radius=2)
+        self.sdf = ContainerSDF(self.sphere)
+        self.points = self.rng.uniform(-2.5, 2.5, (2000, 3))
+
+    def test_exact_equal_to_trimesh(self):
+        expected = trimesh.proximity.signed_distance(pyvista_to_trimesh(self.sphere), self.points[:200])
+        np.testing.assert_allclose(self.sdf.exact(self.points[:200]), expected, atol=1e-9)
+
+    def test_signed_distance(self):
+        expected = self.sdf.exact(self.points)
+        distance = self.sdf.signed_distance(self.points)
+        self.assertTrue(np.all(np.abs(distance - expected) <= self.sdf.max_error))
+        # exact outside the grid
+        _, in_grid = self.sdf.interpolate(self.points)
+        np.testing.assert_array_equal(distance[~in_grid], expected[~in_grid])
+        self.assertLess(self.sdf.n_exact, len(self.points))
+
+    def test_clearance(self):
+        expected = self.sdf.exact(self.points)
+        for clearance in [0.0, 0.3, 1.0]:
+            np.testing.assert_array_equal(self.sdf.clearance(self.points, clearance), expected > clearance)
+        clearances = self.rng.uniform(0, 1, len(self.points))
+        np.testing.assert_array_equal(self.sdf.clearance(self.points, clearances), expected > clearances)
+        np.testing.assert_array_equal(self.sdf.contains(self.points), expected > 0)
+
+    def test_inward_normals(self):
+        cube = pv.Cube(x_length=2, y_length=2, z_length=2).triangulate()
+        flipped = ContainerSDF(cube.flip_faces())
+        np.testing.assert_allclose(flipped.exact([[0, 0, 0], [2, 0, 0]]), [1, -1])
+        np.testing.assert_array_equal(flipped.bounds, [[-1, -1, -1], [1, 1, 1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,9 +4,11 @@ import numpy as np
 import pyvista as pv
 
 from irregular_object_packing.mesh.transform import (
+    TransformedMeshBatch,
     scale_and_center_mesh,
     scale_to_volume,
 )
+from irregular_object_packing.packing.nlc_optimisation import construct_transform_matrix
 
 
 class TestMeshScaling(unittest.TestCase):
@@ -35,3 +37,42 @@ class TestMeshScaling(unittest.TestCase):
         mesh = pv.Sphere(radius=2)
         scaled_mesh = scale_to_volume(mesh, target_volume=8)
         self.assertAlmostEqual(scaled_mesh.volume, 8, places=5)
+
+
+class TestTransformedMeshBatch(unittest.TestCase):
+    def setUp(self):
+        self.shape = pv.Sphere(radius=0.5)
+        tf_arrays = np.array([[1.0, 0, 0, 0, 0, 0, 0], [0.5, 0.1, -0.2, 0.3, 1, 2, 3], [2.0, 1, 0, 0, -1, 0, 0]])
+        self.transforms = [construct_transform_matrix(tf[0], tf[1:4], tf[4:]) for tf in tf_arrays]
+        self.batch = TransformedMeshBatch(self.shape, self.transforms)
+
+    def test_equal_to_transform(self):
+        self.assertEqual(len(self.batch), 3)
+        for mesh, transform in zip(self.batch, self.transforms, strict=True):
+            expected = self.shape.transform(transform, inplace=False)
+            np.testing.assert_array_equal(mesh.points, expected.points)
+            np.testing.assert_array_equal(mesh.faces, expected.faces)
+            self.assertAlmostEqual(mesh.volume, expected.volume, places=5)
+
+    def test_lazy_meshes(self):
+        self.assertIs(self.batch[1], self.batch[1])
+        self.assertTrue(np.shares_memory(self.batch[1].points, self.batch.points))
+        self.assertEqual(sum(mesh is not None for mesh in self.batch._meshes), 1)
+
+    def test_own_faces(self):
+        self.batch[0].GetPolys().Initialize()
+        self.assertEqual(self.batch[0].n_faces, 0)
+        np.testing.assert_array_equal(self.batch[1].faces, self.shape.faces)
+        self.assertEqual(self.shape.n_faces, pv.Sphere(radius=0.5).n_faces)
+
+    def test_bounds(self):
+        lower, upper = self.batch.bounds()
+        for mesh, lo, up in zip(self.batch, lower, upper, strict=True):
+            np.testing.assert_array_almost_equal(np.array(mesh.bounds).reshape(3, 2).T, [lo, up])
+
+    def test_list_operations(self):
+        container = pv.Cube()
+        meshes = self.batch + [container]
+        self.assertEqual(len(meshes), 4)
+        self.assertIs(meshes[-1], container)
+        self.assertEqual(len(self.batch[1:]), 2)
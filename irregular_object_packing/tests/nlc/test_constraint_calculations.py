@@ -3,11 +3,15 @@ from dataclasses import astuple, dataclass
 
 import numpy as np
 from parameterized import parameterized
+from scipy.optimize import approx_fprime
 
 from irregular_object_packing.packing.nlc_optimisation import (
     construct_transform_matrix_from_array,
     local_constraint_for_vertex,
+    local_constraint_jacobian,
     local_constraint_vertices,
+    rotation_matrix,
+    rotation_matrix_jacobian,
 )
 from irregular_object_packing.tests.helpers import float_array
 
@@ -190,6 +194,43 @@ class MultipleConstraints(unittest.TestCase):
         self.assertEqual(constraints.shape, (2,))
         self.assertEqual(constraints[0], constraints[1])
 
+
+class ConstraintJacobian(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.arr = rng.normal(size=(20, 3, 3))
+        self.arr[:, 2] /= np.linalg.norm(self.arr[:, 2], axis=1)[:, None]
+        self.obj_coord = rng.normal(size=3)
+        self.tf_arrays = [
+            float_array([1, 0, 0, 0, 0, 0, 0]),
+            float_array([0.3, 0.2, -0.1, 0.25, 0.5, -1, 0.1]),
+            float_array([1.7, -0.25, 0.25, -0.05, 0, 0, 2]),
+        ]
+
+    def test_rotation_matrix_jacobian(self):
+        theta = float_array([0.2, -0.1, 0.25])
+        dR = rotation_matrix_jacobian(theta)
+        for k in range(3):
+            step = np.zeros(3)
+            step[k] = 1e-6
+            expected = (rotation_matrix(theta + step) - rotation_matrix(theta - step)) / 2e-6
+            np.testing.assert_array_almost_equal(dR[k], expected, decimal=6)
+
+    def test_gradient_check(self):
+        for tf_array in self.tf_arrays:
+            jac = local_constraint_jacobian(tf_array, self.arr, self.obj_coord, 0.1)
+            self.assertEqual(jac.shape, (20, 7))
+            for i in range(len(self.arr)):
+                expected = approx_fprime(
+                    tf_array, lambda x, i=i: local_constraint_vertices(x, self.arr, self.obj_coord, 0.1)[i], 1e-7
+                )
+                np.testing.assert_array_almost_equal(jac[i], expected, decimal=5)
+
+    def test_zero_length(self):
+        jac = local_constraint_jacobian(self.tf_arrays[0], float_array([]).reshape(0, 3, 3), float_array([0, 0, 0]))
+        self.assertEqual(jac.shape, (0, 7))
+
+
 class UpdateTransformArray(unittest.TestCase):
     def setUp(self) -> None:
         self.global_tf_array = float_array([1, 0, 0, 0, 2, 2, 2])
@@ -0,0 +1,97 @@
+import unittest
+
+import numpy as np
+import pyvista as pv
+
+from irregular_object_packing.cat.chordal_axis_transform import (
+    compute_cat_result,
+    compute_cdt,
+)
+from irregular_object_packing.packing.nlc_batched import (
+    FEASIBILITY_TOL,
+    compute_optimal_transforms_batched,
+)
+from irregular_object_packing.packing.nlc_optimisation import (
+    compute_optimal_transform,
+    local_constraint_vertices,
+)
+
+NLC_KWARGS = {
+    "max_scale": 1.0,
+    "scale_bound": (0.1, None),
+    "max_angle": 1 / 12 * np.pi,
+    "max_t": None,
+    "padding": 0.0,
+}
+
+
+class TestBatchedNLC(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        grid = np.array([-2.0, 2.0])
+        cls.obj_coords = np.array([(x, y, 0.0) for x in grid for y in grid])
+        shape = pv.Icosphere(radius=0.5, nsub=0)
+        container = pv.Cube(x_length=8, y_length=8, z_length=8).triangulate().subdivide(1)
+        meshes = [shape.translate(coord, inplace=False) for coord in cls.obj_coords] + [container]
+        cls.cat_result = compute_cat_result(compute_cdt(meshes), [mesh.n_points for mesh in meshes])
+        cls.res_tf_arrays = compute_optimal_transforms_batched(
+            cls.obj_coords, cls.cat_result.normals, cls.cat_result.obj_offsets, **NLC_KWARGS
+        )
+
+    def setUp(self):
+        self.random_state = np.random.get_state()
+
+    def tearDown(self):
+        np.random.set_state(self.random_state)
+
+    def test_feasible(self):
+        for obj_id, coord in enumerate(self.obj_coords):
+            constraints = local_constraint_vertices(
+                self.res_tf_arrays[obj_id], self.cat_result.obj_normals(obj_id), coord, NLC_KWARGS["padding"]
+            )
+            self.assertGreaterEqual(np.min(constraints), -FEASIBILITY_TOL)
+
+    def test_equal_scale_to_slsqp(self):
+        np.random.seed(0)
+        expected = [
+            compute_optimal_transform(coord, self.cat_result.obj_normals(obj_id), **NLC_KWARGS)[0]
+            for obj_id, coord in enumerate(self.obj_coords)
+        ]
+        np.testing.assert_allclose(self.res_tf_arrays[:, 0], expected, rtol=1e-3)
+        self.assertTrue(np.all(self.res_tf_arrays[:, 0] > 1.0))
+
+    def test_bounds(self):
+        kwargs = NLC_KWARGS | {"scale_bound": (0.1, 0.5), "max_t": 0.01}
+        res_tf_arrays = compute_optimal_transforms_batched(
+            self.obj_coords, self.cat_result.normals, self.cat_result.obj_offsets, **kwargs
+        )
+        np.testing.assert_array_almost_equal(res_tf_arrays[:, 0], 0.5)
+        self.assertTrue(np.all(np.abs(res_tf_arrays[:, 1:4]) <= 0.9 * kwargs["max_angle"]))
+        self.assertTrue(np.all(np.abs(res_tf_arrays[:, 4:]) <= kwargs["max_t"]))
+
+    def test_object_without_constraints(self):
+        offsets = np.array([0, 0, len(self.cat_result.obj_normals(0))])
+        res_tf_arrays = compute_optimal_transforms_batched(
+            self.obj_coords[[1, 0]], self.cat_result.obj_normals(0), offsets, **NLC_KWARGS
+        )
+        np.testing.assert_array_equal(res_tf_arrays[0], [np.inf, 0, 0, 0, 0, 0, 0])
+        self.assertGreater(res_tf_arrays[1, 0], 1.0)
+
+    def test_object_without_constraints_equal_to_slsqp(self):
+        np.random.seed(0)
+        no_normals = np.empty((0, 3, 3))
+        for scale_bound in [(0.1, None), (0.1, 0.5)]:
+            kwargs = NLC_KWARGS | {"scale_bound": scale_bound}
+            expected = compute_optimal_transform(self.obj_coords[0], no_normals, **kwargs)
+            res_tf_array = compute_optimal_transforms_batched(self.obj_coords[:1], no_normals, np.array([0, 0]), **kwargs)[0]
+            if scale_bound[1] is None:
+                # SLSQP stops at some huge scale, both are capped to max_scale by update_transform_array
+                self.assertEqual(res_tf_array[0], np.inf)
+                self.assertGreater(expected[0], 1e6)
+            else:
+                self.assertAlmostEqual(res_tf_array[0], expected[0])
+            np.testing.assert_array_equal(res_tf_array[1:], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
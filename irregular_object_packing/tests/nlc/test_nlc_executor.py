@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+import pyvista as pv
+
+from irregular_object_packing.cat.chordal_axis_transform import (
+    compute_cat_result,
+    compute_cdt,
+)
+from irregular_object_packing.packing.nlc_executor import ProcessNLCExecutor
+from irregular_object_packing.packing.nlc_optimisation import compute_optimal_transform
+
+NLC_KWARGS = {
+    "max_scale": 1.0,
+    "scale_bound": (0.1, None),
+    "max_angle": 1 / 12 * np.pi,
+    "max_t": None,
+    "padding": 0.0,
+}
+
+
+class TestProcessNLCExecutor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        grid = np.array([-2.0, 2.0])
+        cls.obj_coords = np.array([(x, y, 0.0) for x in grid for y in grid])
+        shape = pv.Icosphere(radius=0.5, nsub=0)
+        container = pv.Cube(x_length=8, y_length=8, z_length=8).triangulate().subdivide(1)
+        meshes = [shape.translate(coord, inplace=False) for coord in cls.obj_coords] + [container]
+        cls.cat_result = compute_cat_result(compute_cdt(meshes), [mesh.n_points for mesh in meshes])
+        cls.executor = ProcessNLCExecutor(n_workers=2, chunks_per_worker=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def setUp(self):
+        self.random_state = np.random.get_state()
+
+    def tearDown(self):
+        np.random.set_state(self.random_state)
+
+    def sequential_transforms(self):
+        return np.array([
+            compute_optimal_transform(
+                obj_coord=coord, vertex_fpoint_normal_arr=self.cat_result.obj_normals(obj_id), **NLC_KWARGS
+            )
+            for obj_id, coord in enumerate(self.obj_coords)
+        ])
+
+    def test_equal_to_sequential(self):
+        np.random.seed(3)
+        expected = self.sequential_transforms()
+        np.random.seed(3)
+        res_tf_arrays = self.executor.compute_optimal_transforms(
+            self.obj_coords, self.cat_result.normals, self.cat_result.obj_offsets, NLC_KWARGS
+        )
+        np.testing.assert_array_almost_equal(res_tf_arrays, expected)
+        self.assertTrue(np.all(res_tf_arrays[:, 0] > 1.0))
+
+    def test_reuses_shared_memory(self):
+        self.executor.compute_optimal_transforms(
+            self.obj_coords, self.cat_result.normals, self.cat_result.obj_offsets, NLC_KWARGS
+        )
+        shm_name = self.executor.shm.name
+        self.executor.compute_optimal_transforms(
+            self.obj_coords[:2], self.cat_result.normals, self.cat_result.obj_offsets, NLC_KWARGS
+        )
+        self.assertEqual(self.executor.shm.name, shm_name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import threading
+import unittest
+
+from irregular_object_packing.packing.background_writer import BackgroundWriter
+
+
+class TestBackgroundWriter(unittest.TestCase):
+    def test_order(self):
+        writer = BackgroundWriter(maxsize=2)
+        results = []
+        for i in range(20):
+            writer.submit(results.append, i)
+        writer.flush()
+        self.assertEqual(results, list(range(20)))
+        writer.close()
+
+    def test_runs_in_background(self):
+        writer = BackgroundWriter()
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait()
+
+        writer.submit(block)
+        writer.submit(lambda: None)
+        self.assertTrue(started.wait(5))
+        release.set()
+        writer.close()
+
+    def test_error(self):
+        writer = BackgroundWriter()
+        results = []
+        writer.submit(int, "not a number")
+        writer.submit(results.append, 1)
+        with self.assertRaises(ValueError):
+            writer.flush()
+        # the calls after the failed call are skipped
+        self.assertEqual(results, [])
+        writer.submit(results.append, 2)
+        writer.close()
+        self.assertEqual(results, [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import tempfile
+import unittest
+from os import path
+
+import numpy as np
+import pyvista as pv
+
+from irregular_object_packing.packing.checkpoint import (
+    Checkpointer,
+    random_state_arrays,
+    read_snapshot,
+    set_random_state,
+    write_snapshot,
+)
+from irregular_object_packing.packing.optimizer import Optimizer
+from irregular_object_packing.packing.optimizer_data import SimConfig
+from irregular_object_packing.packing.run_archive import RunArchive
+from irregular_object_packing.packing.scheduler import ActiveSetScheduler
+from irregular_object_packing.tests.test_scheduler import chain_tetmesh
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = path.join(self.tmp_dir.name, "snapshot.npz")
+        self.random_state = np.random.get_state()
+
+    def tearDown(self):
+        np.random.set_state(self.random_state)
+        self.tmp_dir.cleanup()
+
+    def test_snapshot(self):
+        arrays = {"a": np.arange(5), "b": np.eye(3)}
+        write_snapshot(self.path, arrays)
+        snapshot = read_snapshot(self.path)
+        self.assertEqual(snapshot.keys(), arrays.keys())
+        for key, value in arrays.items():
+            np.testing.assert_array_equal(snapshot[key], value)
+
+    def test_random_state(self):
+        np.random.seed(3)
+        np.random.normal()
+        write_snapshot(self.path, random_state_arrays())
+        expected = np.random.uniform(size=5), np.random.normal()
+        set_random_state(read_snapshot(self.path))
+        self.assertEqual((list(np.random.uniform(size=5)), np.random.normal()), (list(expected[0]), expected[1]))
+
+    def test_due(self):
+        checkpointer = Checkpointer(self.path, every=3)
+        self.assertEqual([checkpointer.due() for _ in range(7)], [False, False, False, True, False, False, True])
+        checkpointer.save({"a": np.arange(3)})
+        checkpointer.shutdown()
+        self.assertEqual(checkpointer.n_written, 1)
+        self.assertTrue(path.exists(self.path))
+
+        checkpointer = Checkpointer(self.path, interval=0.0)
+        self.assertTrue(checkpointer.due())
+        checkpointer.shutdown()
+
+    def test_restore_optimizer(self):
+        config = SimConfig(checkpoint_dir=self.tmp_dir.name, n_scale_steps=3)
+        optimizer = Optimizer(pv.Sphere(radius=0.1), pv.Sphere(), config, seed=4)
+        optimizer.tf_arrays = np.random.uniform(size=(4, 7))
+        optimizer.shape, optimizer.container = pv.Sphere(radius=0.2), pv.Cube().triangulate()
+        optimizer.i_b, optimizer.i, optimizer.curr_sample_rate = 2, 5, 42
+        optimizer.fails_per_step[1] = 3
+        optimizer.snapshot_meshes()
+        write_snapshot(optimizer.checkpoint_path, optimizer.checkpoint_state([0.5, 0.25]))
+        expected = np.random.uniform(size=3)
+
+        restored = Optimizer(pv.Sphere(radius=0.1), pv.Sphere(), config, seed=4)
+        restored.restore_checkpoint()
+        np.testing.assert_array_equal(restored.tf_arrays, optimizer.tf_arrays)
+        self.assertEqual((restored.i_b, restored.i, restored.curr_sample_rate), (2, 5, 42))
+        self.assertEqual((restored.resume_i, restored.resume_times), (5, [0.5, 0.25]))
+        np.testing.assert_array_equal(restored.fails_per_step, optimizer.fails_per_step)
+        np.testing.assert_array_equal(restored.shape.points, optimizer.shape.points)
+        np.testing.assert_array_equal(restored.container.faces, optimizer.container.faces)
+        np.testing.assert_array_equal(np.random.uniform(size=3), expected)
+
+    def test_restore_archive(self):
+        archive_dir = path.join(self.tmp_dir.name, "run")
+        config = SimConfig(checkpoint_dir=self.tmp_dir.name, run_archive_dir=archive_dir, n_scale_steps=3)
+        optimizer = Optimizer(pv.Sphere(radius=0.1), pv.Sphere(), config, seed=4)
+        optimizer.tf_arrays = np.random.uniform(size=(4, 7))
+        optimizer.curr_sample_rate = 42
+        optimizer.snapshot_meshes()
+        optimizer.open_archive()
+        for i in range(3):
+            optimizer.update_data(0, i - 1)
+        write_snapshot(optimizer.checkpoint_path, optimizer.checkpoint_state([]))
+        optimizer.update_data(0, 2)
+        self.assertEqual(len(RunArchive(archive_dir)), 4)
+
+        # the iteration after the snapshot is archived again by the resumed run
+        restored = Optimizer(pv.Sphere(radius=0.1), pv.Sphere(), config, seed=4)
+        restored.restore_checkpoint()
+        self.assertEqual(len(RunArchive(archive_dir)), 3)
+        restored.update_data(0, 5)
+        archive = RunArchive(archive_dir)
+        self.assertEqual([archive.get_iteration_data(i).i for i in range(-1, 3)], [-1, 0, 1, 5])
+        np.testing.assert_array_equal(archive.get_tf_arrays(2), optimizer.tf_arrays)
+
+    def test_restore_scheduler(self):
+        config = SimConfig(checkpoint_dir=self.tmp_dir.name, n_scale_steps=3, active_set=True)
+        optimizer = Optimizer(pv.Sphere(radius=0.1), pv.Sphere(), config, seed=4)
+        optimizer.tf_arrays = np.zeros((3, 7))
+        optimizer.tf_arrays[:, 0] = [0.5, 0.5, 0.4]
+        optimizer.curr_sample_rate = 42
+        optimizer.scheduler = ActiveSetScheduler(3)
+        optimizer.scheduler.set_neighbours(*chain_tetmesh())
+        optimizer.scheduler.schedule(optimizer.tf_arrays, 0.5)
+        optimizer.violating_ids = {2}
+        optimizer.snapshot_meshes()
+        write_snapshot(optimizer.checkpoint_path, optimizer.checkpoint_state([]))
+
+        restored = Optimizer(pv.Sphere(radius=0.1), pv.Sphere(), config, seed=4)
+        restored.restore_checkpoint()
+        restored.scheduler.set_neighbours(*chain_tetmesh())
+        self.assertEqual(restored.violating_ids, {2})
+        np.testing.assert_array_equal(restored.scheduler.previous_tf_arrays, optimizer.tf_arrays)
+        np.testing.assert_array_equal(restored.scheduler.frozen, optimizer.scheduler.frozen)
+        optimizer.tf_arrays[1, 4] += 0.1
+        np.testing.assert_array_equal(
+            restored.scheduler.schedule(optimizer.tf_arrays, 0.5, restored.violating_ids),
+            optimizer.scheduler.schedule(optimizer.tf_arrays, 0.5, optimizer.violating_ids),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
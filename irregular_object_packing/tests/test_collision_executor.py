@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+import pyvista as pv
+
+from irregular_object_packing.mesh.collision import compute_and_add_all_collisions
+from irregular_object_packing.packing.collision_executor import (
+    ProcessCollisionExecutor,
+    mesh_header,
+    read_mesh,
+)
+from irregular_object_packing.packing.violations import IncrementalViolationChecker
+
+
+class TestProcessCollisionExecutor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessCollisionExecutor(n_workers=2, chunks_per_worker=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def setUp(self):
+        # object 0 and 1 collide, object 1 violates its cat cell, object 3 the container
+        centers = np.array([[0, 0, 0], [0.8, 0, 0], [-3, 0, 0], [4.7, 0, 0], [0, 3, 0]], dtype=float)
+        self.p_meshes = [pv.Cube(center=center) for center in centers]
+        self.cat_meshes = [pv.Cube(center=center, x_length=1.3, y_length=1.3, z_length=1.3) for center in centers]
+        self.cat_meshes[1] = pv.Sphere(radius=0.6, center=centers[1])
+        self.container = pv.Cube(x_length=10, y_length=10, z_length=10).triangulate().subdivide(1)
+
+    def test_read_mesh(self):
+        meshes = [pv.Sphere(), pv.Cube().points_to_double()]
+        self.executor._write_shared(meshes)
+        header = mesh_header(meshes)
+        for mesh_id, mesh in enumerate(meshes):
+            res_mesh = read_mesh(self.executor.shm.buf, header, mesh_id)
+            np.testing.assert_array_equal(res_mesh.points, mesh.points)
+            self.assertEqual(res_mesh.points.dtype, mesh.points.dtype)
+            np.testing.assert_array_equal(res_mesh.faces, mesh.faces)
+
+    def test_equal_to_sequential(self):
+        expected = compute_and_add_all_collisions(self.p_meshes, self.cat_meshes, self.container)
+        res = self.executor.compute_all_collisions(self.p_meshes, self.cat_meshes, self.container)
+        self.assertEqual(res, expected)
+        self.assertListEqual([[obj_id for obj_id, _ in viols] for viols in res], [[1], [3], [(0, 1)]])
+
+    def test_incremental_checker(self):
+        checker = IncrementalViolationChecker(pv.Cube(), self.container, self.cat_meshes, executor=self.executor)
+        tf_arrays = np.zeros((5, 7))
+        tf_arrays[:, 0] = 1.0
+        tf_arrays[:, 4:] = [[0, 0, 0], [0.8, 0, 0], [-3, 0, 0], [4.7, 0, 0], [0, 3, 0]]
+        expected = compute_and_add_all_collisions(self.p_meshes, self.cat_meshes, self.container)
+        self.assertEqual(checker.check(tf_arrays), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
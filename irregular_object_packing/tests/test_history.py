@@ -0,0 +1,88 @@
+import gc
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from irregular_object_packing.packing.history import IterationHistory
+from irregular_object_packing.packing.optimizer_data import OptimizerData
+
+
+class TestIterationHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tf_arrays = [np.full((3, 7), i, dtype=float) for i in range(10)]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def fill(self, history: IterationHistory):
+        for i, tf_arrays in enumerate(self.tf_arrays):
+            history.add(tf_arrays, [i], [f"cat {i}"], i)
+
+    def test_grows(self):
+        history = IterationHistory(capacity=2)
+        self.fill(history)
+        self.assertEqual(len(history), 10)
+        self.assertEqual(history.tf_arrays.shape, (10, 3, 7))
+        for i, tf_arrays in enumerate(self.tf_arrays):
+            np.testing.assert_array_equal(history.get_tf_arrays(i - 1), tf_arrays)
+            self.assertEqual(history.get_iteration_data(i - 1), i)
+            self.assertEqual(history.get_cat(i - 1), ([i], [f"cat {i}"]))
+        with self.assertRaises(IndexError):
+            history.get_tf_arrays(9)
+
+    def test_stores_copies(self):
+        history = IterationHistory()
+        tf_arrays = np.zeros((3, 7))
+        history.add(tf_arrays, [], [], None)
+        tf_arrays[:] = 1.0
+        np.testing.assert_array_equal(history.get_tf_arrays(-1), 0.0)
+
+    def test_ring_drops_cat_data(self):
+        history = IterationHistory(cat_ring=3)
+        for i, tf_arrays in enumerate(self.tf_arrays):
+            history.add(tf_arrays, [i], [f"cat {i}"], i)
+            if i == 2:
+                history.pin(1)
+        self.assertEqual([history.has_cat(i - 1) for i in range(10)], [False] * 2 + [True] + [False] * 4 + [True] * 3)
+        self.assertEqual(history.get_cat(0), (None, None))
+        self.assertEqual(history.get_cat(1), ([2], ["cat 2"]))
+        np.testing.assert_array_equal(history.get_tf_arrays(0), self.tf_arrays[1])
+
+    def test_ring_evicts_to_disk(self):
+        history = IterationHistory(cat_ring=3, directory=self.tmp_dir.name)
+        self.fill(history)
+        self.assertEqual(len(history._cat), 3)
+        for i in range(10):
+            self.assertEqual(history.get_cat(i - 1), ([i], [f"cat {i}"]))
+
+    def test_removes_evicted(self):
+        history = IterationHistory(cat_ring=3, directory=self.tmp_dir.name)
+        self.fill(history)
+        evict_dir = Path(history._evict_dir)
+        self.assertTrue(evict_dir.is_dir())
+        history.close()
+        self.assertFalse(evict_dir.exists())
+        self.assertEqual(history.get_cat(0), (None, None))
+
+        history = IterationHistory(cat_ring=3, directory=self.tmp_dir.name)
+        self.fill(history)
+        evict_dir = Path(history._evict_dir)
+        del history
+        gc.collect()
+        self.assertFalse(evict_dir.exists())
+
+    def test_per_instance(self):
+        data_a, data_b = OptimizerData(), OptimizerData()
+        data_a.add(self.tf_arrays[0], [], [], None)
+        self.assertEqual((data_a.idx, data_b.idx), (-1, -2))
+        data_b.add(self.tf_arrays[1], [], [], None)
+        data_b.add(self.tf_arrays[2], [], [], None)
+        np.testing.assert_array_equal(data_a._tf_arrays(-1), self.tf_arrays[0])
+        np.testing.assert_array_equal(data_b[0]["tf_arrays"], self.tf_arrays[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
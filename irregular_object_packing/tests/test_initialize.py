@@ -3,17 +3,22 @@ from itertools import combinations
 
 import numpy as np
 import pyvista as pv
+import trimesh
 
+from irregular_object_packing.mesh.sdf import ContainerSDF
 from irregular_object_packing.mesh.transform import (
     scale_and_center_mesh,
     scale_to_volume,
 )
+from irregular_object_packing.mesh.utils import pyvista_to_trimesh
 from irregular_object_packing.packing.initialize import (
     coord_is_correct,
+    generate_correct_coordinates_batched,
     generate_initial_coordinates,
+    generate_initial_coordinates_batched,
+    generate_initial_coordinates_lattice,
     get_max_radius,
     grid_initialisation,
-    pyvista_to_trimesh,
     random_coordinate_within_bounds,
 )
 
@@ -108,6 +113,54 @@ class TestInitialize(unittest.TestCase):
             descr="cylinder",
         )
 
+    def test_init_coordinates_batched(self):
+        coverage_rate, container_volume, mesh_volume, f_init = 0.3, 10, 0.1, 0.1
+        self.prepare_scale(mesh_volume, container_volume)
+
+        for container, shape in zip(self.containers, self.shapes, strict=True):
+            coords, _ = generate_initial_coordinates_batched(container, shape, coverage_rate, f_init, seed=0)
+            min_distance = get_max_radius(shape) * 2 * f_init ** (1 / 3)
+            self.assertEqual(len(coords), 30)
+            distance_to_container = trimesh.proximity.signed_distance(pyvista_to_trimesh(container), coords)
+            self.assertTrue(np.all(distance_to_container > min_distance / 2))
+            self.assertTrue(all(np.linalg.norm(c1 - c2) > min_distance for c1, c2 in combinations(coords, 2)))
+
+    def test_init_coordinates_batched_seed(self):
+        self.prepare_scale(0.1, 10)
+        coords, skipped = generate_initial_coordinates_batched(self.containers[0], self.shapes[0], seed=1)
+        res_coords, res_skipped = generate_initial_coordinates_batched(self.containers[0], self.shapes[0], seed=1)
+        np.testing.assert_array_equal(res_coords, coords)
+        self.assertEqual(res_skipped, skipped)
+        self.assertFalse(np.array_equal(generate_initial_coordinates_batched(self.containers[0], self.shapes[0], seed=2)[0], coords))
+
+    def test_init_coordinates_batched_impossible(self):
+        rng = np.random.default_rng(0)
+        with self.assertRaises(RuntimeError):
+            generate_correct_coordinates_batched(10, 1.5, ContainerSDF(self.containers[1]), rng, max_blocks=5)
+
+    def test_init_coordinates_lattice(self):
+        container_volume, mesh_volume = 10, 0.1
+        self.prepare_scale(mesh_volume, container_volume)
+
+        # the dense case of the spheres is slow for the rejection sampling
+        cases = [(0.3, 0.1, container, shape) for container, shape in zip(self.containers, self.shapes, strict=True)]
+        cases.append((0.5, 0.5, self.containers[0], self.shapes[0]))
+        for coverage_rate, f_init, container, shape in cases:
+            coords, _ = generate_initial_coordinates_lattice(container, shape, coverage_rate, f_init, seed=0)
+            min_distance = get_max_radius(shape) * 2 * f_init ** (1 / 3)
+            self.assertEqual(len(coords), round(container_volume * coverage_rate / mesh_volume))
+            distance_to_container = trimesh.proximity.signed_distance(pyvista_to_trimesh(container), coords)
+            self.assertTrue(np.all(distance_to_container > min_distance / 2))
+            self.assertTrue(all(np.linalg.norm(c1 - c2) > min_distance for c1, c2 in combinations(coords, 2)))
+
+        res_coords, _ = generate_initial_coordinates_lattice(container, shape, coverage_rate, f_init, seed=0)
+        np.testing.assert_array_equal(res_coords, coords)
+
+    def test_init_coordinates_lattice_impossible(self):
+        self.prepare_scale(1.0, 10)
+        with self.assertRaises(RuntimeError):
+            generate_initial_coordinates_lattice(self.containers[0], self.shapes[0], 0.5, 1.0, seed=0)
+
     def assert_correct_coordinates(
         self,
         coords,
@@ -178,6 +231,16 @@ class TestCoordIsCorrect(unittest.TestCase):
         # Create a container mesh (a simple box)
         self.c_box = pyvista_to_trimesh(pv.Box(bounds=(-2, 2, -2, 2, -2, 2)))
         self.c_sphere = pyvista_to_trimesh(pv.Sphere(radius=2))
+        self.sdf_box = ContainerSDF(pv.Box(bounds=(-2, 2, -2, 2, -2, 2)))
+        self.sdf_sphere = ContainerSDF(pv.Sphere(radius=2))
+
+    def test_container_sdf(self):
+        for coord in [self.coord, np.array([3, 0, 0]), np.array([0.5, 0, 0]), np.array([1.9, 0, 0])]:
+            for c_tri, c_sdf in [(self.c_box, self.sdf_box), (self.c_sphere, self.sdf_sphere)]:
+                self.assertEqual(
+                    coord_is_correct(coord, c_sdf, self.object_coords, self.min_distance),
+                    coord_is_correct(coord, c_tri, self.object_coords, self.min_distance),
+                )
 
     def test_coord_is_inside_and_valid(self):
         self.assertTrue(
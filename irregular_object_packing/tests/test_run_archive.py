@@ -0,0 +1,103 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pyvista as pv
+
+from irregular_object_packing.cat.cat_data import CatCells, CsrArray
+from irregular_object_packing.packing.optimizer_data import (
+    IterationData,
+    OptimizerData,
+    SimConfig,
+)
+from irregular_object_packing.packing.run_archive import RunArchive, RunArchiveWriter
+
+
+def cat_cells(n_faces_per_cell: list[int], value: float) -> CatCells:
+    offsets = np.concatenate([[0], np.cumsum(n_faces_per_cell)])
+    faces = np.full((offsets[-1], 4, 3), value)
+    face_sizes = np.full(offsets[-1], 3)
+    face_sizes[::2] = 4
+    return CatCells(CsrArray(faces, offsets), CsrArray(face_sizes, offsets))
+
+
+class TestRunArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.tmp_dir.name + "/run"
+        self.shape = pv.Sphere(theta_resolution=8, phi_resolution=8)
+        self.container = pv.Cube().triangulate()
+        self.config = SimConfig(itn_max=3)
+        self.writer = RunArchiveWriter(self.directory, self.shape, self.container, self.config, "test")
+
+        self.tf_arrays = [np.full((2, 7), i, dtype=float) for i in range(4)]
+        self.iteration_data = [
+            IterationData(i, 0, 0.1, 0.2, i, 100, [], [(1, 2)] * i, [((0, 1), 3)]) for i in range(4)
+        ]
+        self.cat_cells = [[]] + [cat_cells([i, 2, 3], i) for i in range(1, 4)]
+        for args in zip(self.tf_arrays, self.cat_cells, self.iteration_data, strict=True):
+            self.writer.append(*args)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def assertCellsEqual(self, cells, expected_cells):
+        self.assertEqual(len(cells), len(expected_cells))
+        for cell, expected in zip(cells, expected_cells, strict=True):
+            self.assertEqual(len(cell), len(expected))
+            for face, expected_face in zip(cell, expected, strict=True):
+                np.testing.assert_array_equal(face, expected_face)
+
+    def test_read(self):
+        archive = RunArchive(self.directory)
+        self.assertEqual(len(archive), 4)
+        self.assertEqual(archive.description, "test")
+        self.assertEqual(archive.config(), self.config)
+        np.testing.assert_array_equal(archive.shape0().points, self.shape.points)
+        for i in range(4):
+            np.testing.assert_array_equal(archive.get_tf_arrays(i - 1), self.tf_arrays[i])
+            self.assertEqual(archive.get_iteration_data(i - 1), self.iteration_data[i])
+        self.assertEqual(archive.get_cat(-1), (None, None))
+        for i in range(1, 4):
+            self.assertCellsEqual(archive.get_cat(i - 1)[1], self.cat_cells[i])
+        with self.assertRaises(IndexError):
+            archive.get_tf_arrays(3)
+
+    def test_refresh(self):
+        archive = RunArchive(self.directory)
+        self.writer.append(self.tf_arrays[0], [], self.iteration_data[0])
+        self.assertEqual(len(archive), 4)
+        archive.refresh()
+        self.assertEqual(len(archive), 5)
+        np.testing.assert_array_equal(archive.get_tf_arrays(3), self.tf_arrays[0])
+
+    def test_reopen(self):
+        writer = RunArchiveWriter.reopen(self.directory, 2)
+        self.assertEqual(len(RunArchive(self.directory)), 2)
+        writer.append(self.tf_arrays[3], self.cat_cells[3], self.iteration_data[3])
+        archive = RunArchive(self.directory)
+        self.assertEqual(len(archive), 3)
+        np.testing.assert_array_equal(archive.get_tf_arrays(1), self.tf_arrays[3])
+        self.assertEqual(archive.get_iteration_data(0), self.iteration_data[1])
+        self.assertEqual(archive.get_iteration_data(1), self.iteration_data[3])
+        self.assertCellsEqual(archive.get_cat(0)[1], self.cat_cells[1])
+        self.assertCellsEqual(archive.get_cat(1)[1], self.cat_cells[3])
+        with self.assertRaises(ValueError):
+            RunArchiveWriter.reopen(self.directory, 4)
+
+    def test_existing_archive(self):
+        with self.assertRaises(FileExistsError):
+            RunArchiveWriter(self.directory, self.shape, self.container, self.config)
+
+    def test_load_optimizer_data(self):
+        data = OptimizerData.load_run_archive(self.directory)
+        self.assertEqual(data.idx, 2)
+        np.testing.assert_array_equal(data.tf_arrays, self.tf_arrays[-1])
+        self.assertEqual(data.status(1), self.iteration_data[2])
+        self.assertEqual(len(data.cat_meshes(2)), 2)
+        self.assertEqual(data.cat_meshes(2)[1].n_faces, 2)
+        self.assertEqual(len(data.final_cat_meshes()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+import pyvista as pv
+
+from irregular_object_packing.cat.cat_data import CsrArray
+from irregular_object_packing.packing.scheduler import (
+    ActiveSetScheduler,
+    object_adjacency,
+)
+
+
+def chain_tetmesh():
+    """Two tetrahedrons, one with points of objects 0 and 1 and one with points of
+    objects 1, 2 and the container (3)."""
+    points = np.random.default_rng(0).random((8, 3))
+    cells = np.array([4, 0, 1, 2, 3, 4, 2, 4, 5, 6])
+    return pv.UnstructuredGrid(cells, np.full(2, pv.CellType.TETRA), points), [2, 2, 2, 2]
+
+
+class TestActiveSetScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = ActiveSetScheduler(3, move_tol=1e-3)
+        self.scheduler.set_neighbours(*chain_tetmesh())
+        self.tf_arrays = np.zeros((3, 7))
+        self.tf_arrays[:, 0] = [0.5, 0.3, 0.4]
+
+    def test_object_adjacency(self):
+        adjacency = object_adjacency(*chain_tetmesh(), 3).toarray()
+        np.testing.assert_array_equal(adjacency, [[0, 1, 0], [1, 0, 1], [0, 1, 0]])
+
+    def test_ordered_by_scale(self):
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.5), [1, 2, 0])
+
+    def test_freeze_until_neighbour_moves(self):
+        # object 0 is at the barrier, but its neighbour 1 moved in the first iteration
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.5), [1, 2, 0])
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.5), [1, 2])
+        self.tf_arrays[2, 4] += 0.1
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.5), [1, 2])
+        self.tf_arrays[1, 4] += 1e-4
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.5), [1, 2])
+        self.tf_arrays[1, 4] += 0.1
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.5), [1, 2, 0])
+        self.assertEqual(self.scheduler.active_sizes, [3, 2, 2, 2, 3])
+
+    def test_neighbours_at_barrier_freeze_together(self):
+        self.tf_arrays[:, 0] = 0.5
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.5), [0, 1, 2])
+        self.assertEqual(len(self.scheduler.schedule(self.tf_arrays, 0.5)), 0)
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.6), [0, 1, 2])
+
+    def test_neighbour_at_barrier_moves(self):
+        self.tf_arrays[:, 0] = [0.5, 0.5, 0.4]
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.5), [2, 0, 1])
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.5), [2])
+        # object 1 moved at the barrier, so its neighbour 0 is activated
+        self.tf_arrays[1, 4] += 0.1
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.5), [2, 0])
+
+    def test_violations(self):
+        self.tf_arrays[:, 0] = 0.5
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.5, {2}), [0, 1, 2])
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.5, {2}), [2])
+        self.tf_arrays[2, 4] += 0.1
+        np.testing.assert_array_equal(self.scheduler.schedule(self.tf_arrays, 0.5, {2}), [1, 2])
+
+
+class TestCsrArray(unittest.TestCase):
+    def test_take(self):
+        csr = CsrArray(np.arange(10), np.array([0, 3, 3, 7, 10]))
+        taken = csr.take([3, 1, 0])
+        np.testing.assert_array_equal(taken.offsets, [0, 3, 3, 6])
+        np.testing.assert_array_equal(taken.data, [7, 8, 9, 0, 1, 2])
+        self.assertEqual(len(csr.take([])), 0)
+
+    def test_copy(self):
+        csr = CsrArray(np.arange(10), np.array([0, 3, 3, 7, 10]))
+        taken = csr.take([3, 1])
+        taken.copy().data[:] = -1
+        np.testing.assert_array_equal(taken.data, [7, 8, 9])
+
+        csr.data.flags.writeable = False
+        csr.offsets.flags.writeable = False
+        self.assertIs(csr.copy(), csr)
+
+
+if __name__ == "__main__":
+    unittest.main()
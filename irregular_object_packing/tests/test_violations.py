@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+import pyvista as pv
+
+from irregular_object_packing.mesh.collision import compute_and_add_all_collisions
+from irregular_object_packing.mesh.sdf import ContainerSDF
+from irregular_object_packing.packing.nlc_optimisation import construct_transform_matrix
+from irregular_object_packing.packing.violations import IncrementalViolationChecker
+
+
+class TestIncrementalViolationChecker(unittest.TestCase):
+    def setUp(self):
+        self.shape = pv.Cube()
+        self.container = pv.Cube(x_length=10, y_length=10, z_length=10)
+        # objects 0 and 1 collide, object 1 sticks out of its cat cell and object 3 out of the container
+        self.tf_arrays = np.array([
+            [1.0, 0, 0, 0, 0, 0, 0],
+            [1.0, 0, 0, 0.3, 1.05, 0, 0],
+            [1.0, 0, 0, 0, -3, 0, 0],
+            [1.0, 0, 0, 0, 4.7, 0, 0],
+            [1.0, 0, 0, 0, 0, 3, 0],
+        ])
+        self.cat_meshes = [self.transform(tf_array * [1.3, 1, 1, 1, 1, 1, 1]) for tf_array in self.tf_arrays]
+        self.cat_meshes[1] = self.transform(np.array([1.0, 0, 0, 0, 1.05, 0, 0]))
+        self.checker = IncrementalViolationChecker(self.shape, self.container, self.cat_meshes)
+
+    def transform(self, tf_array):
+        return self.shape.transform(
+            construct_transform_matrix(tf_array[0], tf_array[1:4], tf_array[4:7]), inplace=False,
+        )
+
+    def full_recompute(self):
+        meshes = [self.transform(tf_array) for tf_array in self.tf_arrays]
+        return compute_and_add_all_collisions(meshes, self.cat_meshes, self.container)
+
+    def test_equal_to_full_recompute(self):
+        expected = self.full_recompute()
+        cat_viols, con_viols, collisions = self.checker.check(self.tf_arrays)
+        self.assertEqual(self.checker.check(self.tf_arrays), expected)
+        self.assertListEqual([obj_id for obj_id, _ in cat_viols], [1])
+        self.assertListEqual([obj_id for obj_id, _ in con_viols], [3])
+        self.assertListEqual([pair for pair, _ in collisions], [(0, 1)])
+
+        self.tf_arrays[[1, 3], 0] = 0.5
+        self.assertEqual(self.checker.check(self.tf_arrays), self.full_recompute())
+
+    def test_container_sdf(self):
+        shape, container = self.shape.triangulate(), self.container.triangulate()
+        checker = IncrementalViolationChecker(shape, container, self.cat_meshes, container_sdf=ContainerSDF(container))
+        expected = IncrementalViolationChecker(shape, container, self.cat_meshes).check(self.tf_arrays)
+        self.assertEqual(checker.check(self.tf_arrays), expected)
+        # the cat cells, the container of object 3 only and the pair (0, 1)
+        self.assertEqual(checker.n_tested, 5 + 1 + 1)
+
+    def test_only_changed_objects_are_tested(self):
+        self.checker.check(self.tf_arrays)
+        self.checker.check(self.tf_arrays)
+        self.assertEqual(self.checker.n_tested, 0)
+
+        self.tf_arrays[1, 0] = 0.5
+        cat_viols, _, collisions = self.checker.check(self.tf_arrays)
+        # the cat cell and container of object 1, the pair (0, 1) is culled now
+        self.assertEqual(self.checker.n_tested, 2)
+        self.assertListEqual(cat_viols, [])
+        self.assertListEqual(collisions, [])
+        self.assertEqual(self.checker.n_culled, 10)
+
+        self.tf_arrays[0, 0] = 1.5
+        self.checker.check(self.tf_arrays)
+        # the cat cell and container of object 0 and the pair (0, 1)
+        self.assertEqual(self.checker.n_tested, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()